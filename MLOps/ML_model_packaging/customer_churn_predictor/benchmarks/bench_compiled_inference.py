@@ -0,0 +1,67 @@
+"""
+Benchmark of the compiled models: prediction latency at increasing batch sizes.
+
+The logistic regression, decision tree and random forest of the pipeline are trained on
+synthetic data and compiled with `compile_model`. For each batch size, the median time of
+scikit-learn's `predict_proba` and of the compiled model's is reported, and the predictions
+are checked to be identical.
+
+Usage (from the package root):
+    python benchmarks/bench_compiled_inference.py --sizes 1 100 10000 [--rows 50000] [--repeats 20]
+"""
+import argparse
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from customer_churn_predictor.data.preprocess import ChurnPreprocessor
+from customer_churn_predictor.data.synthetic import make_synthetic_telco_data
+from customer_churn_predictor.features.build_features import feature_engineering
+from customer_churn_predictor.models.model_artifact import compile_model
+
+
+def median_time(function, X, repeats):
+    """Median wall time of `function(X)` in milliseconds."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(X)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the compiled models.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 10_000], help="Batch sizes to benchmark.")
+    parser.add_argument('--rows', type=int, default=50_000, help="Number of training rows.")
+    parser.add_argument('--repeats', type=int, default=20, help="Number of timed predictions per batch size.")
+    args = parser.parse_args()
+
+    data = make_synthetic_telco_data(args.rows + max(args.sizes))
+    X = feature_engineering(ChurnPreprocessor().fit(data).transform(data))
+    y = X.pop('Churn_encoded')
+    X_train, y_train, X_test = X.iloc[:args.rows], y.iloc[:args.rows], X.iloc[args.rows:]
+
+    models = {
+        'Logistic regression': LogisticRegression(max_iter=1000),
+        'Decision tree': DecisionTreeClassifier(random_state=42),
+        'Random forest': RandomForestClassifier(n_estimators=100, random_state=42),
+    }
+    print(f"{'model':>20} {'batch':>7} {'sklearn (ms)':>13} {'compiled (ms)':>14} {'speedup':>8} {'identical':>10}")
+    for name, model in models.items():
+        model.fit(X_train, y_train)
+        compiled = compile_model(model)
+        for batch_size in args.sizes:
+            batch = X_test.iloc[:batch_size]
+            identical = np.array_equal(compiled.predict_proba(batch), model.predict_proba(batch))
+            sklearn_time = median_time(model.predict_proba, batch, args.repeats)
+            compiled_time = median_time(compiled.predict_proba, batch, args.repeats)
+            print(f"{name:>20} {batch_size:>7} {sklearn_time:>13.3f} {compiled_time:>14.3f} "
+                  f"{sklearn_time / compiled_time:>7.1f}x {str(identical):>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark of feature_engineering: time and peak memory at increasing numbers of rows.
+
+The legacy implementation (PolynomialFeatures, a new DataFrame, a concat and a deduplication
+pass) is measured as well for comparison. Peak memory is the peak of the allocations traced by
+tracemalloc during the call, which include NumPy arrays, not counting the input frame.
+
+Usage (from the package root):
+    python benchmarks/bench_feature_engineering.py --sizes 1000000 10000000 50000000 [--no-legacy]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import PolynomialFeatures
+
+from customer_churn_predictor.data.preprocess import ORDINAL_CATEGORICAL_FEATURES, NUMERICAL_FEATURES
+from customer_churn_predictor.features.build_features import feature_engineering
+
+
+def legacy_feature_engineering(preprocessed_data):
+    """The implementation before the preallocated feature block, for comparison."""
+    preprocessed_data['Tenure_MonthlyCharges_interaction'] = preprocessed_data['tenure'] * preprocessed_data['MonthlyCharges']
+    poly = PolynomialFeatures(degree=2, include_bias=False)
+    poly_features = poly.fit_transform(preprocessed_data[['tenure', 'MonthlyCharges']])
+    poly_df = pd.DataFrame(poly_features, columns=poly.get_feature_names_out(['tenure', 'MonthlyCharges']))
+    preprocessed_data = pd.concat([preprocessed_data, poly_df], axis=1)
+    return preprocessed_data.loc[:, ~preprocessed_data.columns.duplicated()]
+
+
+def make_preprocessed_data(n_rows, random_state=0):
+    """Random data with the columns and dtypes of the preprocessed Telco data."""
+    rng = np.random.default_rng(random_state)
+    columns = ([f'binary_{i}' for i in range(5)] + [f'{feature}_encoded' for feature in ORDINAL_CATEGORICAL_FEATURES]
+               + NUMERICAL_FEATURES)
+    return pd.DataFrame(rng.standard_normal((n_rows, len(columns))), columns=columns)
+
+
+def measure(function, data):
+    """Time and trace the peak memory of one call."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(data)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark feature_engineering.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000_000, 10_000_000, 50_000_000],
+                        help="Numbers of rows to benchmark.")
+    parser.add_argument('--no-legacy', action='store_true', help="Skip the legacy implementation.")
+    args = parser.parse_args()
+
+    implementations = [('feature_engineering', feature_engineering)]
+    if not args.no_legacy:
+        implementations.append(('legacy', legacy_feature_engineering))
+
+    print(f"{'rows':>12} {'implementation':>20} {'time (s)':>10} {'peak (MB)':>10}")
+    for n_rows in args.sizes:
+        data = make_preprocessed_data(n_rows)
+        for name, function in implementations:
+            # The legacy implementation modifies its input, so each run gets its own copy
+            elapsed, peak = measure(function, data.copy())
+            print(f"{n_rows:>12} {name:>20} {elapsed:>10.3f} {peak / 1e6:>10.1f}")
+        del data
+
+
+if __name__ == '__main__':
+    main()
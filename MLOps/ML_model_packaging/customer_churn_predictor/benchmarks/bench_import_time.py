@@ -0,0 +1,72 @@
+"""
+Benchmark of the import time of the package and of its serving path, with `python -X importtime`.
+
+Each module is imported in a fresh interpreter. The cumulative import time of the module, the
+peak resident memory of the interpreter and the slowest imported top-level packages are reported.
+As a regression check, the script exits with status 1 if a module takes longer than `--max-ms`
+or imports one of the `--forbid` packages.
+
+Usage (from the package root):
+    python benchmarks/bench_import_time.py [--modules customer_churn_predictor ...] [--max-ms 1000] [--repeats 3]
+"""
+import argparse
+import subprocess
+import sys
+
+DEFAULT_MODULES = [
+    'customer_churn_predictor',
+    'customer_churn_predictor.customer_churn_predictor',
+    'customer_churn_predictor.serving.warm_state',
+    'customer_churn_predictor.pipeline',
+]
+
+
+def import_time(module):
+    """Import a module in a fresh interpreter and return its import times and peak RSS."""
+    code = f"import {module}, resource; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, check=True)
+    # Lines of stderr: "import time: <self us> | <cumulative us> | <indented module name>"
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = max(times.get(name.strip(), 0), int(cumulative))
+    return times, int(result.stdout.split()[-1]) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the import time of the package.")
+    parser.add_argument('--modules', nargs='+', default=DEFAULT_MODULES, help="Modules to import.")
+    parser.add_argument('--repeats', type=int, default=3, help="Imports per module, the fastest is reported.")
+    parser.add_argument('--top', type=int, default=5, help="Number of slowest top-level packages to list.")
+    parser.add_argument('--max-ms', type=float, help="Fail if a module other than the pipeline takes longer to import.")
+    parser.add_argument('--forbid', nargs='*', default=['sklearn', 'matplotlib', 'seaborn'],
+                        help="Fail if a module other than the pipeline imports one of these packages.")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'module':>50} {'import (ms)':>12} {'peak RSS (MB)':>14}  slowest packages (ms)")
+    for module in args.modules:
+        runs = [import_time(module) for _ in range(args.repeats)]
+        times, rss = min(runs, key=lambda run: run[0][module])
+        total_ms = times[module] / 1000
+        packages = sorted(((name, time) for name, time in times.items() if '.' not in name and name != module.split('.')[0]),
+                          key=lambda item: -item[1])[:args.top]
+        print(f"{module:>50} {total_ms:>12.1f} {rss:>14.1f}  " +
+              ', '.join(f"{name} {time / 1000:.0f}" for name, time in packages))
+
+        # The pipeline trains and plots, so it is expected to import everything
+        if module.endswith('.pipeline'):
+            continue
+        if args.max_ms is not None and total_ms > args.max_ms:
+            failures.append(f"{module} took {total_ms:.0f} ms to import (max {args.max_ms:.0f} ms)")
+        failures.extend(f"{module} imports {package}" for package in args.forbid if package in times)
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
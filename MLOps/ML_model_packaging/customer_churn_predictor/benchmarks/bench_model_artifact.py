@@ -0,0 +1,93 @@
+"""
+Benchmark of the memory-mapped model artifacts: load time and memory per serving worker.
+
+A random forest is trained on synthetic data and saved both as a regular pickle and as a model
+artifact. For each file, several worker processes load the model at the same time, as the
+workers of a web server would, predict a batch, and report their load time and the memory the
+model added to the process: resident (RSS), proportional (PSS, shared pages divided among the
+processes sharing them) and private. The artifact's node arrays are memory-mapped, so they are
+shared page cache rather than a private copy in every worker.
+
+Usage (from the package root):
+    python benchmarks/bench_model_artifact.py --rows 100000 --n-estimators 100 --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from customer_churn_predictor.data.preprocess import ChurnPreprocessor
+from customer_churn_predictor.data.synthetic import make_synthetic_telco_data
+
+
+def memory_usage():
+    """Rss, Pss and private memory of the current process in MB, from /proc (Linux only)."""
+    usage = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            fields = line.split()
+            if fields[0] in ('Rss:', 'Pss:', 'Private_Clean:', 'Private_Dirty:'):
+                usage[fields[0][:-1]] = int(fields[1]) / 1024
+    return {'rss': usage['Rss'], 'pss': usage['Pss'], 'private': usage['Private_Clean'] + usage['Private_Dirty']}
+
+
+def worker(model_path, mmap_mode, X, barrier, results):
+    """Load the model, predict once, and report the memory it added once all the workers loaded it."""
+    from customer_churn_predictor.models.model_serialization import load_model
+    before = memory_usage()
+    start = time.perf_counter()
+    model = load_model(model_path, mmap_mode=mmap_mode)
+    load_time = time.perf_counter() - start
+    model.predict_proba(X)
+    # Measure while every worker holds the model, so shared pages are divided among them
+    barrier.wait()
+    after = memory_usage()
+    barrier.wait()
+    results.put({'load_time': load_time, **{key: after[key] - before[key] for key in after}})
+
+
+def run_workers(model_path, mmap_mode, X, n_workers):
+    """Run the workers on one model file and average their measurements."""
+    context = multiprocessing.get_context('spawn')
+    barrier, results = context.Barrier(n_workers), context.Queue()
+    processes = [context.Process(target=worker, args=(model_path, mmap_mode, X, barrier, results)) for _ in range(n_workers)]
+    for process in processes:
+        process.start()
+    measurements = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return {key: sum(measurement[key] for measurement in measurements) / n_workers for key in measurements[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the memory-mapped model artifacts.")
+    parser.add_argument('--rows', type=int, default=100_000, help="Number of training rows.")
+    parser.add_argument('--n-estimators', type=int, default=100, help="Number of trees of the forest.")
+    parser.add_argument('--workers', type=int, default=4, help="Number of worker processes loading the model.")
+    parser.add_argument('--batch', type=int, default=100, help="Number of rows predicted by each worker.")
+    args = parser.parse_args()
+
+    from sklearn.ensemble import RandomForestClassifier
+    from customer_churn_predictor.models.model_serialization import save_model
+
+    data = make_synthetic_telco_data(args.rows)
+    preprocessor = ChurnPreprocessor().fit(data)
+    X = preprocessor.transform(data)
+    y = X.pop('Churn_encoded')
+    model = RandomForestClassifier(n_estimators=args.n_estimators, n_jobs=-1, random_state=42).fit(X, y)
+    n_nodes = sum(tree.tree_.node_count for tree in model.estimators_)
+    print(f"Random forest: {args.n_estimators} trees, {n_nodes} nodes, {args.workers} workers")
+
+    print(f"{'format':>10} {'size (MB)':>10} {'load (ms)':>10} {'RSS (MB)':>9} {'PSS (MB)':>9} {'private (MB)':>13}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, artifact, mmap_mode in [('pickle', False, None), ('artifact', True, 'r')]:
+            model_path = os.path.join(tmp_dir, f'{name}.pkl')
+            save_model(model, model_path, artifact=artifact)
+            result = run_workers(model_path, mmap_mode, X.iloc[:args.batch], args.workers)
+            print(f"{name:>10} {os.path.getsize(model_path) / 2**20:>10.1f} {result['load_time'] * 1000:>10.1f} "
+                  f"{result['rss']:>9.1f} {result['pss']:>9.1f} {result['private']:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,287 @@
+"""
+Benchmark of every stage of the pipeline on synthetic data, with results stored per commit.
+
+The stages are `load_data`, `preprocess_data`, `feature_engineering`, `perform_train_test_split`,
+`train_models`, `evaluate_models`, `predict_models`, and the serialization of the trained models
+(`save_model` and `load_model`), run in sequence on synthetic Telco CSV files of each size. The
+files are generated once into `--data-dir` and reused. Each stage is repeated up to `--repeats`
+times, or until it took `--max-seconds`, and its fastest run is kept, with its CPU time, the
+resident memory of the process and its rows per second (see `utils.profiling.StageProfiler`).
+
+Training scales worse than linearly, so the models are trained on at most `--max-train-rows`
+rows of the training set; the cap is part of the results, so comparisons stay like for like.
+
+The default sizes (10k and 100k rows) run in about a minute on one CPU. Larger sizes are opt-in:
+training on 1M rows takes about 5 minutes and peaks at 2.6 GB, and 10M rows need a large machine.
+
+The results are written to `--results-dir`/<machine>/<commit>.json ('-dirty' is appended when the
+package has uncommitted changes) and compared with the results of `--baseline`, by default the
+latest results of another commit on the same machine. A stage slower than the baseline by more
+than `--threshold` (and 10 ms) is flagged, and the script then exits with status 1.
+
+The results directory is not versioned, so by default regressions are only found between commits
+benchmarked in the same checkout. To compare across checkouts, e.g. in CI, write the results of
+the reference commit to a file with `--export`, commit it or keep it as a CI artifact, and pass
+its path as `--baseline`. Timings are only comparable on the same kind of machine.
+
+Usage (from the package root):
+    python benchmarks/bench_pipeline_stages.py [--sizes 10000 100000 1000000] [--stages train_models ...]
+        [--baseline <commit or results file>] [--export <results file>] [--threshold 0.2] [--no-save]
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+import numpy as np
+
+from customer_churn_predictor.config.config import Config
+from customer_churn_predictor.data.load_data import load_data
+from customer_churn_predictor.data.preprocess import preprocess_data
+from customer_churn_predictor.data.split_data import perform_train_test_split
+from customer_churn_predictor.data.synthetic import make_synthetic_telco_data
+from customer_churn_predictor.features.build_features import feature_engineering
+from customer_churn_predictor.models.define_models import define_models
+from customer_churn_predictor.models.evaluate_model import evaluate_models
+from customer_churn_predictor.models.model_serialization import load_model, save_model
+from customer_churn_predictor.models.predict_model import predict_models
+from customer_churn_predictor.models.train_model import train_models
+from customer_churn_predictor.utils.logging import set_echo
+from customer_churn_predictor.utils.profiling import StageProfiler
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGES = ['load_data', 'preprocess_data', 'feature_engineering', 'perform_train_test_split', 'train_models',
+          'evaluate_models', 'predict_models', 'save_model', 'load_model']
+# Rows generated at once when writing a synthetic CSV file
+GENERATION_CHUNK = 1_000_000
+# Slowdowns below this many seconds are considered noise
+MIN_REGRESSION_SECONDS = 0.01
+
+
+def synthetic_csv(data_dir, n_rows, random_state=42):
+    """Path of a synthetic Telco CSV file of n_rows rows, generated in chunks on first use."""
+    path = os.path.join(data_dir, f'telco_{n_rows}_{random_state}.csv')
+    if os.path.exists(path):
+        return path
+    os.makedirs(data_dir, exist_ok=True)
+    print(f"Generating {path}")
+    with open(f"{path}.tmp", 'w') as file:
+        for i, start in enumerate(range(0, n_rows, GENERATION_CHUNK)):
+            chunk = make_synthetic_telco_data(min(GENERATION_CHUNK, n_rows - start), random_state=random_state + i)
+            chunk['customerID'] = np.char.add('C', np.arange(start, start + len(chunk)).astype(str))
+            chunk.to_csv(file, index=False, header=i == 0)
+    os.replace(f"{path}.tmp", path)
+    return path
+
+
+def git_commit():
+    """The commit of the package, with '-dirty' if it has uncommitted changes, or 'unknown' outside git."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=PACKAGE_ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'diff', '--quiet', 'HEAD', '--', '.'], cwd=PACKAGE_ROOT).returncode != 0
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return commit + ('-dirty' if dirty else '')
+
+
+def resolve_commit(ref):
+    """The full commit id of a git reference, or the reference itself if git cannot resolve it."""
+    result = subprocess.run(['git', 'rev-parse', ref], cwd=PACKAGE_ROOT, capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else ref
+
+
+def run_stages(csv_path, n_rows, stages, args, work_dir):
+    """
+    Run the stages in sequence on a CSV file, measuring the selected ones.
+
+    Returns:
+    - results (list): The record of the fastest run of each measured stage.
+    """
+    config = Config()
+    results = []
+    last_stage = max(STAGES.index(stage) for stage in stages)
+
+    def measure(stage, func, rows):
+        """Run a stage, repeated if it is measured, and return the output of its first run."""
+        if stage not in stages:
+            return func()
+        profiler = StageProfiler()
+        output = None
+        while len(profiler.stages) < args.repeats and sum(r['wall_seconds'] for r in profiler.stages) < args.max_seconds:
+            with profiler.stage(stage, rows=rows):
+                result = func()
+            output = result if output is None else output
+        best = min(profiler.stages, key=lambda record: record['wall_seconds'])
+        best.update(rows=rows, size=n_rows, repeats=len(profiler.stages),
+                    median_seconds=float(np.median([record['wall_seconds'] for record in profiler.stages])))
+        results.append(best)
+        print(f"{n_rows:>10} {stage:>25} {best['wall_seconds']:>10.3f} {best['median_seconds']:>10.3f} "
+              f"{best['rows_per_second'] if best.get('rows_per_second') else float('nan'):>14.0f} "
+              f"{best['peak_rss_mb'] or float('nan'):>14.0f}")
+        return output
+
+    data = measure('load_data', lambda: load_data(csv_path), n_rows)
+    if last_stage == 0:
+        return results
+    preprocessed = measure('preprocess_data', lambda: preprocess_data(data), n_rows)
+    del data
+    processed = measure('feature_engineering', lambda: feature_engineering(preprocessed), n_rows)
+    del preprocessed
+    X_train, X_test, y_train, y_test = measure(
+        'perform_train_test_split', lambda: perform_train_test_split(processed, test_size=config.get('test_size'),
+                                                                     random_state=config.get('random_state')), n_rows)
+    del processed
+    if last_stage <= STAGES.index('perform_train_test_split'):
+        return results
+    X_train, y_train = X_train.iloc[:args.max_train_rows], y_train.iloc[:args.max_train_rows]
+    # Fresh models for each run, as training fits them in place
+    trained_models = measure('train_models', lambda: train_models(define_models(config), X_train, y_train), len(X_train))
+    measure('evaluate_models', lambda: evaluate_models(trained_models, X_test, y_test, verbose=False), len(X_test))
+    measure('predict_models', lambda: predict_models(trained_models, X_test), len(X_test))
+
+    artifact = (config.get('serialization') or {}).get('artifact', False)
+    paths = {name: os.path.join(work_dir, f'{name}_model.pkl') for name in trained_models}
+    measure('save_model', lambda: [save_model(model, paths[name], artifact=artifact)
+                                   for name, model in trained_models.items()], None)
+    if 'save_model' not in stages and 'load_model' in stages:
+        for name, model in trained_models.items():
+            save_model(model, paths[name], artifact=artifact)
+    measure('load_model', lambda: [load_model(path) for path in paths.values()], None)
+    return results
+
+
+def load_results(results_dir, machine, commit=None, exclude=None):
+    """The stored results of a commit on a machine, or the latest results of another commit if commit is None."""
+    if commit is not None:
+        matches = sorted(glob.glob(os.path.join(results_dir, machine, f'{commit}*.json')))
+        paths = [path for path in matches if os.path.basename(path) == f'{commit}.json'] or matches
+    else:
+        paths = [path for path in glob.glob(os.path.join(results_dir, machine, '*.json'))
+                 if not os.path.basename(path).startswith(exclude.split('-')[0])]
+    runs = []
+    for path in paths:
+        with open(path) as file:
+            runs.append(json.load(file))
+    return max(runs, key=lambda run: run['created_at']) if runs else None
+
+
+def load_baseline(results_dir, machine, commit, baseline=None):
+    """
+    The results to compare with.
+
+    Args:
+    - results_dir (str): Directory of the stored results.
+    - machine (str): Name of this machine.
+    - commit (str): The current commit, excluded from the default baseline.
+    - baseline (str, optional): A results file, or a commit (or git reference) with stored results on
+      this machine. Defaults to the latest results of another commit on this machine.
+
+    Returns:
+    - baseline (dict): The baseline results, or None if there are none.
+    """
+    if baseline is None:
+        return load_results(results_dir, machine, exclude=commit)
+    if os.path.isfile(baseline):
+        with open(baseline) as file:
+            return json.load(file)
+    return load_results(results_dir, machine, commit=resolve_commit(baseline))
+
+
+def compare(current, baseline, threshold):
+    """Print the change of each stage against the baseline and return the regressions."""
+    previous = {(record['stage'], record['size']): record for record in baseline['results']}
+    regressions = []
+    compared = 0
+    print(f"\nCompared with {baseline['commit'][:12]} ({baseline['created_at']}):")
+    if baseline['machine']['name'] != current['machine']['name']:
+        print(f"Note: the baseline ran on another machine ({baseline['machine']['name']}, "
+              f"{baseline['machine']['cpu_count']} CPUs), so the timings may differ for other reasons.")
+    print(f"{'rows':>10} {'stage':>25} {'baseline (s)':>13} {'current (s)':>12} {'ratio':>7}")
+    for record in current['results']:
+        before = previous.get((record['stage'], record['size']))
+        if before is None or before.get('rows') != record.get('rows'):
+            continue
+        compared += 1
+        ratio = record['wall_seconds'] / before['wall_seconds'] if before['wall_seconds'] > 0 else float('inf')
+        regressed = (ratio > 1 + threshold and
+                     record['wall_seconds'] - before['wall_seconds'] > MIN_REGRESSION_SECONDS)
+        print(f"{record['size']:>10} {record['stage']:>25} {before['wall_seconds']:>13.3f} "
+              f"{record['wall_seconds']:>12.3f} {ratio:>7.2f}" + ("  REGRESSION" if regressed else ""))
+        if regressed:
+            regressions.append(f"{record['stage']} at {record['size']} rows: {before['wall_seconds']:.3f} s -> "
+                               f"{record['wall_seconds']:.3f} s ({ratio:.2f}x)")
+    if not compared:
+        print("The baseline has no results for these stages and sizes.")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the stages of the pipeline and flag regressions.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000],
+                        help="Numbers of rows of the synthetic data, e.g. add 1000000 and 10000000 on large machines.")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES, help="Stages to measure.")
+    parser.add_argument('--repeats', type=int, default=3, help="Maximum runs per stage, the fastest is kept.")
+    parser.add_argument('--max-seconds', type=float, default=30.0,
+                        help="Stop repeating a stage once its runs took this long.")
+    parser.add_argument('--max-train-rows', type=int, default=1_000_000, help="Training rows cap.")
+    parser.add_argument('--data-dir', default=os.path.join(PACKAGE_ROOT, 'benchmarks', '.data'),
+                        help="Directory of the generated synthetic CSV files.")
+    parser.add_argument('--results-dir', default=os.path.join(PACKAGE_ROOT, 'benchmarks', 'results'),
+                        help="Directory of the stored results.")
+    parser.add_argument('--baseline', help="Commit (or git reference) to compare with, or a results file.")
+    parser.add_argument('--export', help="Also write the results to this file, e.g. to use it as a baseline elsewhere.")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Relative slowdown flagged as a regression, e.g. 0.2 for 20%%.")
+    parser.add_argument('--no-save', action='store_true', help="Do not store the results.")
+    args = parser.parse_args()
+
+    set_echo(False)
+    machine = platform.node() or 'unknown'
+    commit = git_commit()
+    print(f"{'rows':>10} {'stage':>25} {'best (s)':>10} {'median (s)':>10} {'rows/s':>14} {'peak RSS (MB)':>14}")
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for n_rows in args.sizes:
+            results.extend(run_stages(synthetic_csv(args.data_dir, n_rows), n_rows, args.stages, args, work_dir))
+
+    import pandas
+    import sklearn
+    current = {
+        'commit': commit,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'machine': {'name': machine, 'platform': platform.platform(), 'cpu_count': os.cpu_count(),
+                    'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pandas.__version__,
+                    'scikit-learn': sklearn.__version__},
+        'settings': {'repeats': args.repeats, 'max_seconds': args.max_seconds, 'max_train_rows': args.max_train_rows},
+        'results': results,
+    }
+    if not args.no_save:
+        path = os.path.join(args.results_dir, machine, f'{commit}.json')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            json.dump(current, file, indent=2)
+        print(f"\nResults saved to {path}")
+    if args.export:
+        os.makedirs(os.path.dirname(os.path.abspath(args.export)), exist_ok=True)
+        with open(args.export, 'w') as file:
+            json.dump(current, file, indent=2)
+        print(f"Results exported to {args.export}")
+
+    baseline = load_baseline(args.results_dir, machine, commit, args.baseline)
+    if baseline is None:
+        print("No baseline results to compare with.")
+        sys.exit(0)
+    regressions = compare(current, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
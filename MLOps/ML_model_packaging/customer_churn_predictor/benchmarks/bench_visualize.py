@@ -0,0 +1,62 @@
+"""
+Benchmark of the distribution plots: time to aggregate and to render at increasing numbers of rows.
+
+The plots aggregate the data with NumPy/pandas and only draw the aggregates, so the rendering
+time should stay flat as the number of rows grows. Seaborn's `histplot(kde=True)` and
+`countplot` over the raw rows are measured as well for comparison.
+
+Usage (from the package root):
+    python benchmarks/bench_visualize.py --sizes 10000 1000000 10000000 [--no-legacy]
+"""
+import argparse
+import time
+
+import seaborn as sns
+from matplotlib.figure import Figure
+
+from customer_churn_predictor.data.synthetic import make_synthetic_telco_data
+from customer_churn_predictor.visualization.visualize import (aggregate_distributions, visualize_categorical_distribution,
+                                                              visualize_numerical_distribution)
+
+
+def legacy_plots(data):
+    """Seaborn plots over the raw rows, as before the aggregation."""
+    fig = Figure(figsize=(10, 6))
+    sns.countplot(x='Contract', hue='Churn', data=data, ax=fig.subplots())
+    fig.savefig('/dev/null', format='png')
+    fig = Figure(figsize=(10, 6))
+    sns.histplot(data=data, x='MonthlyCharges', hue='Churn', kde=True, bins=30, ax=fig.subplots())
+    fig.savefig('/dev/null', format='png')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the distribution plots.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000],
+                        help="Numbers of rows to benchmark.")
+    parser.add_argument('--no-legacy', action='store_true', help="Skip the seaborn plots over the raw rows.")
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'aggregate (s)':>14} {'render (s)':>11} {'legacy (s)':>11}")
+    for n_rows in args.sizes:
+        data = make_synthetic_telco_data(n_rows)
+
+        start = time.perf_counter()
+        aggregates = aggregate_distributions(data, ['Contract'], ['MonthlyCharges'])
+        aggregate_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        visualize_categorical_distribution(None, 'Contract', counts=aggregates['Contract']).savefig('/dev/null', format='png')
+        visualize_numerical_distribution(None, 'MonthlyCharges', histogram=aggregates['MonthlyCharges']).savefig('/dev/null', format='png')
+        render_time = time.perf_counter() - start
+
+        legacy_time = float('nan')
+        if not args.no_legacy:
+            start = time.perf_counter()
+            legacy_plots(data)
+            legacy_time = time.perf_counter() - start
+        print(f"{n_rows:>12} {aggregate_time:>14.3f} {render_time:>11.3f} {legacy_time:>11.3f}")
+        del data
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,16 @@
-# Import modules or functions to be directly accessible when importing the package
-from .data import load_data, preprocess
-from .models import train_model, evaluate_model
-from .pipeline import run_pipeline
-from .config import config
+# Import modules or functions to be directly accessible when importing the package.
+# They are imported on first access (PEP 562), so importing the package, e.g. in a serving
+# worker, does not import the pipeline and its plotting and training dependencies.
+from customer_churn_predictor.utils.lazy_imports import lazy_attributes
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'load_data': ('.data', 'load_data'),
+    'preprocess': ('.data.preprocess', None),
+    'train_model': ('.models.train_model', None),
+    'evaluate_model': ('.models.evaluate_model', None),
+    'run_pipeline': ('.pipeline', 'run_pipeline'),
+    'config': ('.config', None),
+})
 
 # Define package version
-__version__ = '0.1.0'
\ No newline at end of file
+__version__ = '0.1.0'
@@ -0,0 +1,7 @@
+from customer_churn_predictor.utils.lazy_imports import lazy_attributes
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'Config': ('.config', 'Config'),
+    'config': ('.config', None),
+})
+__all__ = ['Config']
@@ -1,42 +1,197 @@
-import yaml
+from collections.abc import Mapping
+import os
+import pickle
 from pathlib import Path
 
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parent / 'default_config.yaml'
+
+# Parsed configuration files, keyed by path, with the (mtime, size) of the file when it was parsed.
+# A configuration is built from the cache, and a file is only parsed again once it changed. The
+# values are cached pickled, as unpickling them is the cheapest way to get a private deep copy.
+_PARSED_CONFIGS = {}
+
+# Environment variables overriding configuration values, e.g. CHURN_CONFIG__TEST_SIZE=0.3 or
+# CHURN_CONFIG__MODELS__RandomForestClassifier__N_ESTIMATORS=50. Nested keys are separated by
+# '__' and matched case-insensitively, and the values are parsed as YAML.
+ENV_PREFIX = 'CHURN_CONFIG__'
+
+# Output directories of the configuration, relative to the project root
+OUTPUT_DIRECTORIES = {
+    'proj_root': (),
+    'data_dir': ('data',),
+    'processed_data_dir': ('data', 'processed'),
+    'pipeline_cache_dir': ('data', 'pipeline_cache'),
+    'models_dir': ('models',),
+    'reports_dir': ('reports',),
+    'figures_dir': ('reports', 'figures'),
+}
+
+def _copy_tree(value):
+    """Copy the nested dicts and lists of a parsed configuration, sharing the immutable leaves."""
+    if isinstance(value, (dict, FrozenConfig)):
+        return {key: _copy_tree(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_copy_tree(item) for item in value]
+    return value
+
+def _parse_yaml(text, source):
+    """Parse YAML, importing PyYAML only when a file or value actually has to be parsed."""
+    import yaml
+    try:
+        return yaml.safe_load(text)
+    except yaml.YAMLError as e:
+        raise Exception(f"Error parsing YAML file {source}: {e}")
+
+def read_config_file(config_path):
+    """
+    Read a YAML configuration file, from the cache of parsed files while it is unchanged.
+
+    Args:
+    - config_path (str or Path): Path to the file.
+
+    Returns:
+    - values (dict): A copy of the parsed configuration, which the caller may modify.
+    """
+    config_path = os.fspath(config_path)
+    try:
+        stat = os.stat(config_path)
+    except FileNotFoundError:
+        raise Exception(f"Configuration file {config_path} not found.")
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _PARSED_CONFIGS.get(config_path)
+    if cached is None or cached[0] != version:
+        with open(config_path, 'r') as file:
+            values = _parse_yaml(file, config_path) or {}
+        cached = _PARSED_CONFIGS[config_path] = (version, pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL))
+    return pickle.loads(cached[1])
+
+def apply_environment_overrides(values, environ=None):
+    """
+    Override configuration values with the `ENV_PREFIX` environment variables.
+
+    Args:
+    - values (dict): The configuration values, modified in place.
+    - environ (Mapping, optional): The environment. Defaults to `os.environ`.
+
+    Returns:
+    - overridden (list): The overridden keys, as tuples of nested keys.
+    """
+    environ = os.environ if environ is None else environ
+    overridden = []
+    # Only the names are scanned, as reading every value of `os.environ` costs more
+    for name in [name for name in environ if name.startswith(ENV_PREFIX)]:
+        text = environ[name]
+        keys = name[len(ENV_PREFIX):].split('__')
+        node = values
+        for i, key in enumerate(keys):
+            # Use the existing key of any case, e.g. 'models' for MODELS
+            key = next((existing for existing in node if str(existing).lower() == key.lower()), key.lower())
+            keys[i] = key
+            if i == len(keys) - 1:
+                node[key] = _parse_yaml(text, name)
+            else:
+                if not isinstance(node.get(key), dict):
+                    node[key] = {}
+                node = node[key]
+        overridden.append(tuple(keys))
+    return overridden
+
+def ensure_output_directory(config, key):
+    """
+    Create an output directory of the configuration, if it does not exist, before it is written to.
+
+    It is checked on every call, so a directory deleted while the process runs is created again.
+
+    Args:
+    - config (Config, FrozenConfig or dict): The configuration.
+    - key (str): One of `OUTPUT_DIRECTORIES`, e.g. 'figures_dir'.
+
+    Returns:
+    - directory (str): The path of the directory.
+    """
+    directory = config.get(key)
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+class FrozenConfig(Mapping):
+    """
+    Immutable snapshot of a configuration.
+
+    Nested blocks are frozen as well, and lists become tuples. It pickles as the plain nested
+    values, so it is cheap to send to worker processes, and has the `get` of `Config`.
+    """
+
+    def __init__(self, values):
+        """
+        Freeze configuration values.
+
+        Args:
+        - values (Mapping): The configuration values.
+        """
+        self._values = {key: self._freeze(value) for key, value in values.items()}
+
+    @classmethod
+    def _freeze(cls, value):
+        if isinstance(value, Mapping):
+            return value if isinstance(value, FrozenConfig) else cls(value)
+        if isinstance(value, (list, tuple)):
+            return tuple(cls._freeze(item) for item in value)
+        return value
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return f"FrozenConfig({self.to_dict()!r})"
+
+    def __reduce__(self):
+        return (FrozenConfig, (self.to_dict(),))
+
+    def to_dict(self):
+        """Return the configuration as plain nested dicts and lists."""
+        return _copy_tree(self._values)
+
 class Config:
+    """
+    Configuration of the package: the default configuration, updated with an optional custom
+    configuration file and the `ENV_PREFIX` environment variables.
+
+    Building a configuration does no I/O beyond checking the modification time of its files:
+    the parsed files are cached, and the output directories are only created when they are
+    first written to (see `ensure_output_directory`).
+    """
+
     def __init__(self, default_config_path=None, custom_config_path=None):
-        # Determine the path to the default_config.yaml relative to this module's location
+        # The default_config.yaml next to this module, unless another default is given
         if default_config_path is None:
-            default_config_path = Path(__file__).resolve().parent / 'default_config.yaml'
-        
+            default_config_path = DEFAULT_CONFIG_PATH
+
         # Load the default configuration
         self.config = self.load_config(default_config_path)
-        
+
         # If a custom configuration path is provided, load and update the configuration
         if custom_config_path:
             self.update_config(custom_config_path)
-        
+
+        # Environment variables take precedence over the files
+        apply_environment_overrides(self.config)
+
         # Setup directories
         self.setup_directories()
 
     def load_config(self, config_path):
         """Load the configuration file."""
-        try:
-            with open(config_path, 'r') as file:
-                return yaml.safe_load(file)
-        except FileNotFoundError:
-            raise Exception(f"Configuration file {config_path} not found.")
-        except yaml.YAMLError as e:
-            raise Exception(f"Error parsing YAML file {config_path}: {e}")
+        return read_config_file(config_path)
 
     def update_config(self, config_path):
         """Update the configuration with values from a custom config file."""
-        try:
-            with open(config_path, 'r') as file:
-                custom_config = yaml.safe_load(file)
-            self.config.update(custom_config)
-        except FileNotFoundError:
-            raise Exception(f"Configuration file {config_path} not found.")
-        except yaml.YAMLError as e:
-            raise Exception(f"Error parsing YAML file {config_path}: {e}")
+        self.config.update(read_config_file(config_path))
 
     def get(self, key, default=None):
         """Retrieve a value from the configuration."""
@@ -46,8 +201,17 @@ class Config:
         """Set a value in the configuration."""
         self.config[key] = value
 
+    def snapshot(self):
+        """Return an immutable `FrozenConfig` of the current values."""
+        return FrozenConfig(self.config)
+
+    def to_dict(self):
+        """Return a copy of the configuration as plain nested dicts and lists."""
+        return _copy_tree(self.config)
+
     def save_config(self, config_path):
         """Save the configuration to a file."""
+        import yaml
         try:
             with open(config_path, 'w') as file:
                 yaml.safe_dump(self.config, file)
@@ -55,27 +219,13 @@ class Config:
             raise Exception(f"Error saving configuration to file {config_path}: {e}")
 
     def setup_directories(self):
-        """Set up the directory structure for outputs."""
+        """
+        Set the paths of the output directories in the configuration.
+
+        The directories are not created here, but by `ensure_output_directory` when something is
+        first written to them.
+        """
         # Root directory for all outputs
-        proj_root = Path.cwd() / 'churn_predictor_outputs'
-        proj_root.mkdir(parents=True, exist_ok=True)
-
-        # Define the directory paths
-        data_dir = proj_root / 'data'
-        processed_data_dir = data_dir / 'processed'
-        models_dir = proj_root / 'models'
-        reports_dir = proj_root / 'reports'
-        figures_dir = reports_dir / 'figures'
-
-        # Create the directories if they don't exist
-        for directory in [data_dir, processed_data_dir, models_dir, reports_dir, figures_dir]:
-            print(f"Creating directory: {directory}")  # Debug statement
-            directory.mkdir(parents=True, exist_ok=True)
-
-        # Store the paths in the configuration
-        self.set('proj_root', str(proj_root))
-        self.set('data_dir', str(data_dir))
-        self.set('processed_data_dir', str(processed_data_dir))
-        self.set('models_dir', str(models_dir))
-        self.set('reports_dir', str(reports_dir))
-        self.set('figures_dir', str(figures_dir))
\ No newline at end of file
+        proj_root = os.path.join(os.getcwd(), 'churn_predictor_outputs')
+        for key, parts in OUTPUT_DIRECTORIES.items():
+            self.set(key, os.path.join(proj_root, *parts))
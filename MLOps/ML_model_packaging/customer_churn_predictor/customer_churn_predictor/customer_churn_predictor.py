@@ -11,7 +11,10 @@ class CustomerChurnPredictor:
         """
         self.config = Config(custom_config_path=custom_config_path)
         # Setup logging using the project root from config
-        setup_logging(self.config.get('proj_root'))
+        logging_config = self.config.get('logging') or {}
+        setup_logging(self.config.get('proj_root'), level=logging_config.get('level', 'INFO'),
+                      json_format=logging_config.get('format', 'text') == 'json',
+                      rate_limit=logging_config.get('rate_limit'), echo_enabled=logging_config.get('echo'))
 
     def get_config(self):
         """
@@ -1,7 +1,14 @@
 # When we import modules or functions from a package,
 # Python looks for the __init__.py file in that package directory.
 # By including the import statement in __init__.py,
-# we're effectively exposing the load_data, preprocess_data and perform_train_test_split functions at the package level
-from .load_data import load_data
-from .preprocess import preprocess_data
-from .split_data import perform_train_test_split
\ No newline at end of file
+# we're effectively exposing the load_data, load_data_in_chunks, preprocess_data and perform_train_test_split functions at the package level.
+# load_data is imported eagerly, as the function would otherwise be shadowed by its module once the module
+# is imported. The other functions are imported on first access (PEP 562).
+from customer_churn_predictor.utils.lazy_imports import lazy_attributes
+from .load_data import load_data, load_data_in_chunks
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'preprocess_data': ('.preprocess', 'preprocess_data'),
+    'perform_train_test_split': ('.split_data', 'perform_train_test_split'),
+})
+__all__ = ['load_data', 'load_data_in_chunks', 'preprocess_data', 'perform_train_test_split']
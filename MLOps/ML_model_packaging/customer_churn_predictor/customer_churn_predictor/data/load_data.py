@@ -1,5 +1,11 @@
+import numpy as np
 import pandas as pd
 import logging
+import os
+from customer_churn_predictor.data.schema import TELCO_DTYPES, TELCO_NA_VALUES
+from customer_churn_predictor.utils.logging import echo
+
+logger = logging.getLogger(__name__)
 
 def load_data(file_path):
     """
@@ -13,21 +19,134 @@ def load_data(file_path):
     """
     try:
         data = pd.read_csv(file_path)
-        print("Data loaded successfully")
-        logging.info("Data loaded successfully from %s", file_path)
+        echo("Data loaded successfully")
+        logger.info("Data loaded successfully from %s", file_path)
         return data
     except FileNotFoundError:
-        logging.error(f"File not found at path: {file_path}")
-        print(f"File not found at path: {file_path}")
+        logger.error("File not found at path: %s", file_path)
+        echo("File not found at path: %s", file_path)
         return None
     except pd.errors.EmptyDataError:
-        logging.error("No data: File is empty")
-        print("No data: File is empty")
+        logger.error("No data: File is empty")
+        echo("No data: File is empty")
         return None
     except pd.errors.ParserError:
-        logging.error("Error parsing data")
-        print("Error parsing data")
+        logger.error("Error parsing data")
+        echo("Error parsing data")
+        return None
+    except Exception as e:
+        logger.error("An unexpected error occurred while loading data: %s", e)
         return None
+
+def _estimate_row_bytes(file_path, sample_bytes=1 << 16):
+    """Estimate the average size of a CSV row in bytes from the beginning of the file."""
+    with open(file_path, 'rb') as file:
+        file.readline()  # Skip the header
+        sample = file.read(sample_bytes)
+    n_rows = sample.count(b'\n')
+    return max(1, len(sample) // n_rows) if n_rows else max(1, len(sample))
+
+def _free_categories(dtype):
+    """The column types with the categorical columns read without fixed levels, which are applied after parsing."""
+    return {column: 'category' if isinstance(column_dtype, pd.CategoricalDtype) and column_dtype.categories is not None
+            else column_dtype for column, column_dtype in dtype.items()}
+
+def _apply_category_levels(chunk, dtype, on_unknown):
+    """
+    Set the fixed levels of the categorical columns of a chunk, reporting the values outside them.
+
+    Args:
+    - chunk (DataFrame): A chunk read with `_free_categories`.
+    - dtype (dict): The column types, with the fixed levels of the categorical columns.
+    - on_unknown (str): 'warn' to log the values outside the levels, which become missing, or 'raise'.
+
+    Returns:
+    - chunk (DataFrame): The chunk, with the categorical columns on their fixed levels.
+    """
+    unknown_counts = {}
+    for column in chunk.columns:
+        column_dtype = dtype.get(column)
+        if not isinstance(column_dtype, pd.CategoricalDtype) or column_dtype.categories is None:
+            continue
+        values = chunk[column]
+        unknown = ~values.cat.categories.isin(column_dtype.categories)
+        if unknown.any():
+            # Only the few categories are compared, then the rows are counted from their codes
+            count = int(np.isin(values.cat.codes, np.flatnonzero(unknown)).sum())
+            unknown_counts[column] = (count, values.cat.categories[unknown].tolist())
+        chunk[column] = values.cat.set_categories(column_dtype.categories)
+    if unknown_counts:
+        details = '; '.join(f"{column}: {count} rows with {values}" for column, (count, values) in unknown_counts.items())
+        if on_unknown == 'raise':
+            raise ValueError(f"Values outside the known categories: {details}")
+        logger.warning("Values outside the known categories were read as missing: %s", details)
+    return chunk
+
+def _read_chunks_pyarrow(file_path, chunksize, usecols, dtype):
+    """Stream a CSV file with pyarrow's incremental reader, yielding DataFrames with the given dtypes."""
+    from pyarrow import csv
+
+    # pyarrow reads blocks of bytes, so the block size is derived from the requested number of rows
+    block_size = max(1 << 16, chunksize * _estimate_row_bytes(file_path))
+    reader = csv.open_csv(file_path,
+                          read_options=csv.ReadOptions(block_size=block_size),
+                          convert_options=csv.ConvertOptions(include_columns=usecols,
+                                                             null_values=TELCO_NA_VALUES,
+                                                             strings_can_be_null=True))
+    for batch in reader:
+        chunk = batch.to_pandas()
+        yield chunk.astype({column: dtype[column] for column in chunk.columns if column in dtype})
+
+def load_data_in_chunks(file_path, chunksize=100_000, usecols=None, engine='c', dtype=None, on_unknown='warn'):
+    """
+    Stream a dataset from a CSV file in typed chunks, for datasets larger than memory.
+
+    Columns are parsed straight into compact types (see `schema.TELCO_DTYPES`): categories for
+    the categorical columns, float32 for the charges and small integers for the counts.
+    Blank 'TotalCharges' values are parsed as NaN. Only one chunk is held in memory at a time,
+    so the memory use is bounded by `chunksize` and the selected columns. Every chunk gets the
+    fixed levels of the categorical columns; values outside them (e.g. a new payment method)
+    are read as missing and logged as a warning with their count per column, or raise.
+
+    Args:
+    - file_path (str): The path to the CSV file.
+    - chunksize (int): The number of rows per chunk (approximate with the 'pyarrow' engine).
+    - usecols (list, optional): The columns to read. All columns are read if None.
+    - engine (str): 'c' for the pandas C parser, or 'pyarrow' for pyarrow's multithreaded
+      streaming reader (requires pyarrow).
+    - dtype (dict, optional): The column types. Defaults to the Telco schema.
+    - on_unknown (str): 'warn' to read the values outside the levels of a categorical column as
+      missing and log them, or 'raise' to raise a ValueError.
+
+    Yields:
+    - chunk (DataFrame): The next chunk of the dataset.
+    """
+    dtype = TELCO_DTYPES if dtype is None else dtype
+    if on_unknown not in ('warn', 'raise'):
+        raise ValueError(f"Unknown on_unknown '{on_unknown}'. Expected 'warn' or 'raise'.")
+    if not os.path.exists(file_path):
+        logger.error("File not found at path: %s", file_path)
+        echo("File not found at path: %s", file_path)
+        raise FileNotFoundError(file_path)
+
+    try:
+        read_dtype = _free_categories(dtype)
+        if engine == 'pyarrow':
+            chunks = _read_chunks_pyarrow(file_path, chunksize, usecols, read_dtype)
+        elif engine == 'c':
+            selected_dtype = read_dtype if usecols is None else {column: read_dtype[column] for column in usecols
+                                                                 if column in read_dtype}
+            chunks = pd.read_csv(file_path, chunksize=chunksize, usecols=usecols, dtype=selected_dtype,
+                                 na_values=TELCO_NA_VALUES, engine='c')
+        else:
+            raise ValueError(f"Unknown engine '{engine}'. Expected 'c' or 'pyarrow'.")
+
+        n_rows = 0
+        for chunk in chunks:
+            n_rows += len(chunk)
+            yield _apply_category_levels(chunk, dtype, on_unknown)
+        logger.info("Data streamed successfully from %s: %d rows", file_path, n_rows)
     except Exception as e:
-        logging.error(f"An unexpected error occurred while loading data: {e}")
-        return None
\ No newline at end of file
+        logger.error("An unexpected error occurred while streaming data from %s: %s", file_path, e)
+        echo("An unexpected error occurred while streaming data from %s: %s", file_path, e)
+        raise
\ No newline at end of file
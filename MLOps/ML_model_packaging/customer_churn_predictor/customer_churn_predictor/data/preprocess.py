@@ -1,6 +1,257 @@
-from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler, LabelEncoder
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 import logging
+from customer_churn_predictor.utils.logging import echo
+
+logger = logging.getLogger(__name__)
+
+BINARY_CATEGORICAL_FEATURES = ['gender', 'Partner', 'Dependents', 'PhoneService', 'PaperlessBilling']
+ORDINAL_CATEGORICAL_FEATURES = ['MultipleLines', 'InternetService', 'OnlineSecurity', 'OnlineBackup',
+                                'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies',
+                                'Contract', 'PaymentMethod']
+CATEGORICAL_FEATURES = BINARY_CATEGORICAL_FEATURES + ORDINAL_CATEGORICAL_FEATURES
+NUMERICAL_FEATURES = ['tenure', 'MonthlyCharges', 'TotalCharges']
+TARGET = 'Churn'
+
+
+def _column(data, column):
+    """
+    Extract a column as a 1D array-like without copying its values.
+
+    Args:
+    - data (DataFrame or dict): Raw records, either as a DataFrame or as a mapping from column
+      name to a value (a single record) or to an array-like of values.
+    - column (str): Name of the column to extract.
+
+    Returns:
+    - values (Series or ndarray): The values of the column.
+    """
+    if isinstance(data, pd.DataFrame):
+        return data[column]
+    values = data[column]
+    if np.ndim(values) == 0:
+        # A single record
+        return np.array([values], dtype=object)
+    return values if isinstance(values, pd.Series) else np.asarray(values, dtype=object)
+
+
+def _factorize(values):
+    """
+    Factorize a categorical column into integer codes and the string labels of its distinct values.
+
+    Only the distinct values are converted to strings, so the column is never copied into a
+    string array. Categorical columns are factorized from their codes. Missing values get the
+    label 'nan', as in `astype(str)`.
+
+    Args:
+    - values (Series or ndarray): The values of the column.
+
+    Returns:
+    - codes (ndarray): Integer array of the position of each value in labels.
+    - labels (ndarray): String array of the distinct values.
+    """
+    codes, uniques = pd.factorize(values)
+    labels = np.asarray(uniques, dtype=object).astype(str)
+    missing = codes < 0
+    if missing.any():
+        codes[missing] = len(labels)
+        labels = np.append(labels, 'nan')
+    return codes, labels
+
+
+def _to_numeric(values):
+    """Convert a column to float64, coercing unparsable values (e.g. ' ') to NaN."""
+    values = pd.Series(values) if not isinstance(values, pd.Series) else values
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        return values.to_numpy(dtype=np.float64, na_value=np.nan)
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _numerical_columns(data):
+    """The numerical features as a float64 array of shape (n_rows, len(NUMERICAL_FEATURES))."""
+    return np.column_stack([_to_numeric(_column(data, column)) for column in NUMERICAL_FEATURES])
+
+
+class ChurnPreprocessor:
+    """
+    Preprocessing of raw Telco records that is fitted once and reused for any number of transforms.
+
+    `fit` learns the categories of the binary and ordinal features, the medians used to fill
+    missing numerical values, the scaling statistics and the target classes. `transform` only
+    applies them with vectorized NumPy operations, so new records (e.g. a single customer at
+    serving time) are encoded exactly like the training data, without refitting anything.
+    Each categorical column is factorized on its own and only its distinct values are compared
+    with the fitted categories, so the memory used is a few integer codes per row.
+    The encoding matches scikit-learn's `OneHotEncoder(drop='first')`, `OrdinalEncoder`,
+    `StandardScaler` and `LabelEncoder`. Unknown categories are one-hot encoded as all zeros
+    and ordinal encoded as -1.
+    """
+
+    def __init__(self):
+        self.binary_categories_ = None
+        self.ordinal_categories_ = None
+        self.numerical_medians_ = None
+        self.mean_ = None
+        self.scale_ = None
+        self.classes_ = None
+        self.one_hot_features_ = None
+        self.one_hot_codes_ = None
+        self.feature_names_out_ = None
+
+    def fit(self, data):
+        """
+        Fit the preprocessor on the raw data.
+
+        Args:
+        - data (DataFrame): The raw data to fit on.
+
+        Returns:
+        - self (ChurnPreprocessor): The fitted preprocessor.
+        """
+        categories = []
+        for feature in CATEGORICAL_FEATURES:
+            codes, labels = _factorize(_column(data, feature))
+            # Only the values present in the data, e.g. not the unused levels of a categorical column
+            categories.append(np.unique(labels[np.bincount(codes, minlength=len(labels)) > 0]))
+        self.binary_categories_ = categories[:len(BINARY_CATEGORICAL_FEATURES)]
+        self.ordinal_categories_ = categories[len(BINARY_CATEGORICAL_FEATURES):]
+
+        # One-hot columns, as (feature index, category code) pairs, with the first category dropped
+        self.one_hot_features_ = np.array([i for i, c in enumerate(self.binary_categories_) for _ in c[1:]], dtype=np.int64)
+        self.one_hot_codes_ = np.array([code for c in self.binary_categories_ for code in range(1, len(c))], dtype=np.int64)
+
+        numerical_data = _numerical_columns(data)
+        self.numerical_medians_ = np.nanmedian(numerical_data, axis=0)
+        numerical_data = np.where(np.isnan(numerical_data), self.numerical_medians_, numerical_data)
+        self.mean_ = numerical_data.mean(axis=0)
+        scale = numerical_data.std(axis=0)
+        # Constant features are left unscaled, as in StandardScaler
+        scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0
+        self.scale_ = scale
+
+        self.classes_ = np.unique(_factorize(_column(data, TARGET))[1]) if TARGET in data else None
+
+        binary_encoded_columns = [f'{feature}_{category}'
+                                  for feature, categories in zip(BINARY_CATEGORICAL_FEATURES, self.binary_categories_)
+                                  for category in categories[1:]]
+        ordinal_encoded_columns = [f'{feature}_encoded' for feature in ORDINAL_CATEGORICAL_FEATURES]
+        self.feature_names_out_ = binary_encoded_columns + ordinal_encoded_columns + NUMERICAL_FEATURES
+        return self
+
+    def _encode(self, data):
+        """
+        Encode the categorical features to the code of their category within their feature.
+
+        Args:
+        - data (DataFrame or dict): The raw data.
+
+        Returns:
+        - codes (ndarray): int16 array with one column per categorical feature, -1 for unknown categories.
+        """
+        categories = list(self.binary_categories_) + list(self.ordinal_categories_)
+        codes = np.empty((len(_column(data, CATEGORICAL_FEATURES[0])), len(CATEGORICAL_FEATURES)), dtype=np.int16)
+        for i, (feature, feature_categories) in enumerate(zip(CATEGORICAL_FEATURES, categories)):
+            value_codes, labels = _factorize(_column(data, feature))
+            # Map the distinct values to their category code, -1 when they are not a category
+            positions = np.searchsorted(feature_categories, labels)
+            known = feature_categories[np.minimum(positions, len(feature_categories) - 1)] == labels
+            codes[:, i] = np.where(known, positions, -1)[value_codes]
+        return codes
+
+    def _transform_blocks(self, data):
+        """
+        Transform raw data into its three feature blocks, each in its most compact type.
+
+        Args:
+        - data (DataFrame or dict): The raw data to transform.
+
+        Returns:
+        - one_hot (ndarray): uint8 array of the one-hot encoded binary features.
+        - ordinal (ndarray): Signed integer array of the ordinal encoded features (int8 unless a
+          feature has more than 127 categories).
+        - numerical (ndarray): float32 array of the imputed and scaled numerical features.
+        """
+        if self.scale_ is None:
+            raise ValueError("ChurnPreprocessor is not fitted yet. Call 'fit' before 'transform'.")
+
+        codes = self._encode(data)
+        # One-hot encoding with the first category dropped
+        one_hot = np.equal(codes[:, self.one_hot_features_], self.one_hot_codes_).view(np.uint8)
+        # Ordinal encoding
+        max_code = max(len(categories) for categories in self.ordinal_categories_)
+        ordinal = codes[:, len(BINARY_CATEGORICAL_FEATURES):].astype(np.min_scalar_type(-max_code))
+        # Median imputation and standard scaling, computed in float64 and stored in float32
+        numerical_data = _numerical_columns(data)
+        numerical_data = np.where(np.isnan(numerical_data), self.numerical_medians_, numerical_data)
+        numerical = ((numerical_data - self.mean_) / self.scale_).astype(np.float32)
+        return one_hot, ordinal, numerical
+
+    def transform_array(self, data, dtype=np.float32, sparse_output=False):
+        """
+        Transform raw data into a feature array, without the target.
+
+        Args:
+        - data (DataFrame or dict): The raw data to transform, as a DataFrame or as a mapping from
+          column name to a value (a single record) or to an array-like of values.
+        - dtype (type): The data type of the array.
+        - sparse_output (bool): Return a sparse CSR matrix, which only stores the non-zero values.
+          It is smaller than the dense array when the encodings are wide and mostly zeros, and
+          can be passed directly to the scikit-learn estimators.
+
+        Returns:
+        - features (ndarray or csr_matrix): Array of shape (n_rows, len(feature_names_out_)).
+        """
+        blocks = self._transform_blocks(data)
+        if sparse_output:
+            return sp.hstack([sp.csr_matrix(block) for block in blocks], format='csr', dtype=dtype)
+        features = np.empty((len(blocks[0]), len(self.feature_names_out_)), dtype=dtype)
+        start = 0
+        for block in blocks:
+            features[:, start:start + block.shape[1]] = block
+            start += block.shape[1]
+        return features
+
+    def transform(self, data):
+        """
+        Transform raw data with the fitted preprocessor. The input is not modified.
+
+        Each feature block keeps its compact type: uint8 for the one-hot encoded features, int8
+        for the ordinal encoded features and float32 for the scaled numerical features.
+
+        Args:
+        - data (DataFrame or dict): The raw data to transform, as a DataFrame or as a mapping from
+          column name to a value (a single record) or to an array-like of values.
+
+        Returns:
+        - preprocessed_data (DataFrame): The preprocessed data, with the index of the input
+          DataFrame or a RangeIndex for a mapping. It includes the encoded target
+          'Churn_encoded' (int8) only if the input has a 'Churn' column.
+        """
+        blocks = self._transform_blocks(data)
+        columns = np.split(np.array(self.feature_names_out_, dtype=object),
+                           np.cumsum([block.shape[1] for block in blocks[:-1]]))
+        index = data.index if isinstance(data, pd.DataFrame) else pd.RangeIndex(len(blocks[0]))
+        # Each block is wrapped without a copy and the frame is not consolidated into a single type
+        preprocessed_data = pd.concat([pd.DataFrame(block, columns=list(block_columns), index=index, copy=False)
+                                       for block, block_columns in zip(blocks, columns)], axis=1)
+        if TARGET in data and self.classes_ is not None:
+            target_codes, labels = _factorize(_column(data, TARGET))
+            preprocessed_data['Churn_encoded'] = np.searchsorted(self.classes_, labels).astype(np.int8)[target_codes]
+        return preprocessed_data
+
+    def fit_transform(self, data):
+        """
+        Fit the preprocessor on the raw data and transform it.
+
+        Args:
+        - data (DataFrame): The raw data.
+
+        Returns:
+        - preprocessed_data (DataFrame): The preprocessed data.
+        """
+        return self.fit(data).transform(data)
+
 
 def preprocess_data(data):
     """
@@ -16,69 +267,24 @@ def preprocess_data(data):
     - preprocessed_data (DataFrame): The preprocessed data ready for modeling.
     """
     try:
-        logging.info("Starting data preprocessing.")
-        # Encoding categorical variables
-        binary_categorical_features = ['gender', 'Partner', 'Dependents', 'PhoneService', 'PaperlessBilling']
-        ordinal_categorical_features = ['MultipleLines', 'InternetService', 'OnlineSecurity', 'OnlineBackup',
-                                        'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies',
-                                        'Contract', 'PaymentMethod']
-
-        # Perform one-hot encoding for binary features
-        binary_encoder = OneHotEncoder(drop='first')
-        binary_encoded_data = binary_encoder.fit_transform(data[binary_categorical_features])
-        binary_encoded_columns = binary_encoder.get_feature_names_out(binary_categorical_features)
-        logging.info("Binary categorical features encoded.")
-
-        # Perform ordinal encoding for ordinal features
-        ordinal_encoder = OrdinalEncoder()
-        ordinal_encoded_data = ordinal_encoder.fit_transform(data[ordinal_categorical_features])
-        ordinal_encoded_columns = [f'{feature}_encoded' for feature in ordinal_categorical_features]
-        logging.info("Ordinal categorical features encoded.")
-
-        # Concatenate encoded binary and ordinal categorical features
-        encoded_data = pd.concat([pd.DataFrame(binary_encoded_data.toarray(), columns=binary_encoded_columns),
-                                  pd.DataFrame(ordinal_encoded_data, columns=ordinal_encoded_columns)], axis=1)
-
-        # Scale numerical features
-        numerical_features = ['tenure', 'MonthlyCharges', 'TotalCharges']
-
-        # Ensure numerical features are numeric
-        data[numerical_features] = data[numerical_features].apply(pd.to_numeric, errors='coerce')
-
-        # Handle missing values in numerical features
-        data[numerical_features] = data[numerical_features].fillna(data[numerical_features].median())
-
-        scaler = StandardScaler()
-        scaled_numerical_features = scaler.fit_transform(data[numerical_features])
-
-        # Replace original numerical features with scaled ones
-        for i, feature in enumerate(numerical_features):
-            data[feature] = scaled_numerical_features[:, i]
-        logging.info("Numerical features scaled.")
-
-        # Encoding the target variable 'Churn'
-        label_encoder = LabelEncoder()
-        data['Churn_encoded'] = label_encoder.fit_transform(data['Churn'])
-        logging.info("Target variable 'Churn' encoded.")
-
-        # Concatenate encoded categorical features and numerical features
-        preprocessed_data = pd.concat([encoded_data, data[numerical_features], data['Churn_encoded']], axis=1)
-        logging.info("Data preprocessing completed successfully.")
+        logger.info("Starting data preprocessing.")
+        preprocessed_data = ChurnPreprocessor().fit_transform(data)
+        logger.info("Data preprocessing completed successfully.")
 
         return preprocessed_data
     except ValueError as ve:
-        logging.error(f"ValueError occurred during preprocessing: {ve}")
-        print(f"ValueError occurred: {ve}")
+        logger.error("ValueError occurred during preprocessing: %s", ve)
+        echo("ValueError occurred: %s", ve)
         return None
     except KeyError as ke:
-        logging.error(f"KeyError occurred during preprocessing: {ke}")
-        print(f"KeyError occurred: {ke}")
+        logger.error("KeyError occurred during preprocessing: %s", ke)
+        echo("KeyError occurred: %s", ke)
         return None
     except TypeError as te:
-        logging.error(f"TypeError occurred during preprocessing: {te}")
-        print(f"TypeError occurred: {te}")
+        logger.error("TypeError occurred during preprocessing: %s", te)
+        echo("TypeError occurred: %s", te)
         return None
     except Exception as e:
-        logging.error(f"An unexpected error occurred during preprocessing: {e}")
-        print(f"An unexpected error occurred: {e}")
-        return None
\ No newline at end of file
+        logger.error("An unexpected error occurred during preprocessing: %s", e)
+        echo("An unexpected error occurred: %s", e)
+        return None
@@ -0,0 +1,196 @@
+import importlib
+import logging
+import os
+
+import joblib
+
+from customer_churn_predictor.config.config import ensure_output_directory
+from customer_churn_predictor.data.load_data import load_data
+from customer_churn_predictor.data.preprocess import ChurnPreprocessor
+from customer_churn_predictor.features.build_features import feature_engineering
+from customer_churn_predictor.utils.hashing import file_hash
+from customer_churn_predictor.utils.logging import echo
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMATS = ('feather', 'parquet')
+# Modules whose code produces the processed feature matrix. Editing any of them invalidates the cache.
+PROCESSING_MODULES = ('customer_churn_predictor.data.schema', 'customer_churn_predictor.data.load_data',
+                      'customer_churn_predictor.data.preprocess', 'customer_churn_predictor.features.build_features')
+# Configuration keys read by the processing code, and so part of the cache key. None are read today:
+# the encodings are fitted on the data or given as a preprocessor, and the engineered features are
+# defined in `build_features`, whose code is hashed. Other settings, e.g. the train-test split, the
+# model hyperparameters or the logging, do not invalidate the cache.
+PROCESSING_CONFIG_KEYS = ()
+
+_code_version = None
+
+
+def processing_code_version():
+    """
+    Version of the preprocessing and feature engineering code, as a hash of its source files.
+
+    Returns:
+    - version (str): The hexadecimal digest of the source of `PROCESSING_MODULES`.
+    """
+    global _code_version
+    if _code_version is None:
+        _code_version = joblib.hash([file_hash(importlib.import_module(module).__file__)
+                                    for module in PROCESSING_MODULES])
+    return _code_version
+
+
+def processed_cache_key(data_path, config, preprocessor=None, data_hash=None):
+    """
+    Content-addressed key of the processed data built from a raw CSV file.
+
+    The key changes whenever the content of the file, the preprocessing code, the
+    `PROCESSING_CONFIG_KEYS` settings of the configuration or the given preprocessor change.
+
+    Args:
+    - data_path (str): Path to the raw CSV data file.
+    - config (Config, FrozenConfig or dict): Configuration object.
+    - preprocessor (ChurnPreprocessor, optional): Fitted preprocessor used instead of fitting one on the data.
+    - data_hash (str, optional): The `file_hash` of the data file, if the caller already computed it,
+      so that the file is not read again.
+
+    Returns:
+    - key (str): The hexadecimal cache key.
+    """
+    config_values = {name: config.get(name) for name in PROCESSING_CONFIG_KEYS}
+    return joblib.hash([data_hash or file_hash(data_path), processing_code_version(), config_values,
+                        joblib.hash(preprocessor) if preprocessor is not None else None])
+
+
+def _cache_paths(config, key):
+    """Paths of the feature matrix and preprocessor files of a cache entry."""
+    cache_config = config.get('processed_cache') or {}
+    cache_format = cache_config.get('format', 'feather')
+    if cache_format not in CACHE_FORMATS:
+        raise ValueError(f"Unknown processed cache format '{cache_format}'. Expected one of {CACHE_FORMATS}.")
+    root = os.path.join(config.get('processed_data_dir'), key)
+    return f"{root}.{cache_format}", f"{root}_preprocessor.pkl"
+
+
+def _cache_enabled(config):
+    """Whether the processed data cache is enabled and pyarrow, which reads and writes it, is installed."""
+    if not (config.get('processed_cache') or {}).get('enabled', True) or not config.get('processed_data_dir'):
+        return False
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        logger.warning("pyarrow is not installed, the processed data cache is disabled.")
+        return False
+    return True
+
+
+def read_processed_cache(config, key):
+    """
+    Read a cache entry written by `write_processed_cache`.
+
+    Feather files are memory-mapped, so the columns of the feature matrix are backed by the
+    page cache instead of being read and copied into memory.
+
+    Args:
+    - config (Config): Configuration object providing 'processed_data_dir' and the 'processed_cache' block.
+    - key (str): The cache key, from `processed_cache_key`.
+
+    Returns:
+    - processed_data (DataFrame): The processed data, or None if the entry does not exist.
+    - preprocessor (ChurnPreprocessor): The preprocessor the data was built with, or None.
+    """
+    if not _cache_enabled(config):
+        return None, None
+    data_path, preprocessor_path = _cache_paths(config, key)
+    if not (os.path.exists(data_path) and os.path.exists(preprocessor_path)):
+        return None, None
+    try:
+        if data_path.endswith('.feather'):
+            from pyarrow import feather
+            table = feather.read_table(data_path, memory_map=True)
+        else:
+            from pyarrow import parquet
+            table = parquet.read_table(data_path, memory_map=True)
+        # Each column keeps its own block, so columns without missing values stay zero-copy views
+        processed_data = table.to_pandas(split_blocks=True)
+        preprocessor = joblib.load(preprocessor_path)
+        logger.info("Processed data loaded from the cache at %s", data_path)
+        return processed_data, preprocessor
+    except Exception as e:
+        logger.error("An unexpected error occurred while reading the processed data cache: %s", e)
+        echo("An unexpected error occurred while reading the processed data cache: %s", e)
+        return None, None
+
+
+def write_processed_cache(config, key, processed_data, preprocessor):
+    """
+    Write the processed data and its preprocessor to the cache.
+
+    Files are written under a temporary name and renamed, so concurrent readers never see a partial entry.
+
+    Args:
+    - config (Config): Configuration object providing 'processed_data_dir' and the 'processed_cache' block.
+    - key (str): The cache key, from `processed_cache_key`.
+    - processed_data (DataFrame): The processed data.
+    - preprocessor (ChurnPreprocessor): The preprocessor the data was built with.
+
+    Returns:
+    - None
+    """
+    if not _cache_enabled(config):
+        return
+    data_path, preprocessor_path = _cache_paths(config, key)
+    try:
+        ensure_output_directory(config, 'processed_data_dir')
+        processed_data = processed_data.reset_index(drop=True)
+        joblib.dump(preprocessor, f"{preprocessor_path}.tmp")
+        if data_path.endswith('.feather'):
+            # Uncompressed, so that the file can be memory-mapped without decoding it
+            processed_data.to_feather(f"{data_path}.tmp", compression='uncompressed')
+        else:
+            processed_data.to_parquet(f"{data_path}.tmp", index=False)
+        # The preprocessor is moved first, as an entry is only read when its data file exists
+        os.replace(f"{preprocessor_path}.tmp", preprocessor_path)
+        os.replace(f"{data_path}.tmp", data_path)
+        logger.info("Processed data written to the cache at %s", data_path)
+    except Exception as e:
+        logger.error("An unexpected error occurred while writing the processed data cache: %s", e)
+        echo("An unexpected error occurred while writing the processed data cache: %s", e)
+
+
+def load_processed_data(data_path, config, preprocessor=None, data_hash=None):
+    """
+    Load the processed feature matrix of a raw CSV file, from the cache when possible.
+
+    On a cache miss the CSV is loaded, preprocessed and feature engineered, and the result
+    is cached in 'processed_data_dir' for the next runs.
+
+    Args:
+    - data_path (str): Path to the raw CSV data file.
+    - config (Config): Configuration object.
+    - preprocessor (ChurnPreprocessor, optional): Fitted preprocessor to transform the data with.
+      A new preprocessor is fitted on the data if None.
+    - data_hash (str, optional): The `file_hash` of the data file, if the caller already computed it.
+
+    Returns:
+    - processed_data (DataFrame): The processed data, with the encoded target if the CSV has a 'Churn' column.
+    - preprocessor (ChurnPreprocessor): The fitted preprocessor.
+    """
+    key = processed_cache_key(data_path, config, preprocessor, data_hash) if _cache_enabled(config) else None
+    if key is not None:
+        processed_data, cached_preprocessor = read_processed_cache(config, key)
+        if processed_data is not None:
+            return processed_data, cached_preprocessor
+
+    data = load_data(data_path)
+    if data is None:
+        raise RuntimeError(f"Failed to load the data from {data_path}")
+    if preprocessor is None:
+        preprocessor = ChurnPreprocessor().fit(data)
+    processed_data = feature_engineering(preprocessor.transform(data))
+    if processed_data is None:
+        raise RuntimeError(f"Failed to build the features of {data_path}")
+
+    if key is not None:
+        write_processed_cache(config, key, processed_data, preprocessor)
+    return processed_data, preprocessor
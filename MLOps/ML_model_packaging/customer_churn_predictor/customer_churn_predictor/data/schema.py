@@ -0,0 +1,72 @@
+import pandas as pd
+
+# Category levels of the Telco Customer Churn dataset
+YES_NO = ['No', 'Yes']
+INTERNET_ADDON = ['No', 'Yes', 'No internet service']
+CATEGORY_LEVELS = {
+    'gender': ['Female', 'Male'],
+    'Partner': YES_NO,
+    'Dependents': YES_NO,
+    'PhoneService': YES_NO,
+    'MultipleLines': ['No', 'Yes', 'No phone service'],
+    'InternetService': ['DSL', 'Fiber optic', 'No'],
+    'OnlineSecurity': INTERNET_ADDON,
+    'OnlineBackup': INTERNET_ADDON,
+    'DeviceProtection': INTERNET_ADDON,
+    'TechSupport': INTERNET_ADDON,
+    'StreamingTV': INTERNET_ADDON,
+    'StreamingMovies': INTERNET_ADDON,
+    'Contract': ['Month-to-month', 'One year', 'Two year'],
+    'PaperlessBilling': YES_NO,
+    'PaymentMethod': ['Electronic check', 'Mailed check', 'Bank transfer (automatic)', 'Credit card (automatic)'],
+}
+
+# Column order of the raw CSV file
+TELCO_COLUMNS = ['customerID', 'gender', 'SeniorCitizen', 'Partner', 'Dependents', 'tenure', 'PhoneService',
+                 'MultipleLines', 'InternetService', 'OnlineSecurity', 'OnlineBackup', 'DeviceProtection',
+                 'TechSupport', 'StreamingTV', 'StreamingMovies', 'Contract', 'PaperlessBilling', 'PaymentMethod',
+                 'MonthlyCharges', 'TotalCharges', 'Churn']
+
+# Data types of the raw CSV columns. Categorical columns use fixed levels, so every chunk of a
+# streamed file gets the same categories (values outside the levels are read as missing and
+# reported by `load_data_in_chunks`).
+# 'TotalCharges' holds ' ' for new customers, which is parsed as NaN.
+TELCO_DTYPES = {
+    'customerID': 'string',
+    'SeniorCitizen': 'int8',
+    'tenure': 'int16',
+    'MonthlyCharges': 'float32',
+    'TotalCharges': 'float32',
+    'Churn': pd.CategoricalDtype(YES_NO),
+    **{column: pd.CategoricalDtype(levels) for column, levels in CATEGORY_LEVELS.items()},
+}
+TELCO_NA_VALUES = ['', ' ']
+
+# Columns of a raw record needed to score it, and the numerical ones that must hold a number
+# ('TotalCharges' may be blank for new customers and is imputed)
+RECORD_COLUMNS = list(CATEGORY_LEVELS) + ['tenure', 'MonthlyCharges', 'TotalCharges']
+RECORD_NUMERIC_COLUMNS = ['tenure', 'MonthlyCharges']
+
+
+def validate_records(records):
+    """
+    Check that raw records can be scored, before they are batched with the records of other requests.
+
+    Categorical values outside the known categories are accepted, as the preprocessor encodes
+    them as unknown.
+
+    Args:
+    - records (DataFrame): Raw records with the Telco schema.
+
+    Raises:
+    - ValueError: If there are no records, a column is missing or a numerical value is not a number.
+    """
+    if len(records) == 0:
+        raise ValueError("No records provided")
+    missing = [column for column in RECORD_COLUMNS if column not in records.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    for column in RECORD_NUMERIC_COLUMNS:
+        invalid = pd.to_numeric(records[column], errors='coerce').isna()
+        if invalid.any():
+            raise ValueError(f"Column {column} must be a number (records {invalid.to_numpy().nonzero()[0].tolist()})")
@@ -1,5 +1,8 @@
-from sklearn.model_selection import train_test_split
+import numpy as np
 import logging
+from customer_churn_predictor.utils.logging import echo
+
+logger = logging.getLogger(__name__)
 
 def perform_train_test_split(data, test_size=0.2, random_state=42):
     """
@@ -16,8 +19,11 @@ def perform_train_test_split(data, test_size=0.2, random_state=42):
     - y_train (Series): Training target variable.
     - y_test (Series): Testing target variable.
     """
+    # Imported here rather than with the module, as scikit-learn is slow to import and the
+    # module is also used by serving workers that may never split data
+    from sklearn.model_selection import train_test_split
     try:
-        logging.info("Performing train-test split with test_size=%s and random_state=%s", test_size, random_state)
+        logger.info("Performing train-test split with test_size=%s and random_state=%s", test_size, random_state)
 
         # Split the dataset into features (X) and target variable (y)
         X = data.drop(columns=['Churn_encoded'])  # Features
@@ -25,13 +31,55 @@ def perform_train_test_split(data, test_size=0.2, random_state=42):
         # Split the dataset into training and testing sets
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
         
-        logging.info("Train-test split completed successfully.")
+        logger.info("Train-test split completed successfully.")
         return X_train, X_test, y_train, y_test
     except ValueError as ve:
-        logging.error(f"ValueError occurred during train-test split: {ve}")
-        print(f"ValueError occurred during train-test split: {ve}")
+        logger.error("ValueError occurred during train-test split: %s", ve)
+        echo("ValueError occurred during train-test split: %s", ve)
+        return None, None, None, None
+    except Exception as e:
+        logger.error("An unexpected error occurred during train-test split: %s", e)
+        echo("An unexpected error occurred during train-test split: %s", e)
         return None, None, None, None
+
+def make_cv_folds(y, n_splits=5, stratified=True, groups=None, shuffle=True, random_state=42):
+    """
+    Build cross-validation folds as index arrays, without copying the data.
+
+    Args:
+    - y (array-like): The target variable, used to stratify the folds.
+    - n_splits (int): Number of folds.
+    - stratified (bool): Keep the proportion of each class in every fold.
+    - groups (array-like, optional): Group of each row (e.g. the customer ID). All the rows of a
+      group are kept in the same fold, so that a customer is never in both the training and the
+      validation rows of a fold.
+    - shuffle (bool): Shuffle the rows before building the folds.
+    - random_state (int): Controls the shuffling.
+
+    Returns:
+    - folds (list): A list of (train_indices, test_indices) pairs of integer position arrays.
+    """
+    from sklearn.model_selection import KFold, StratifiedKFold, GroupKFold, StratifiedGroupKFold
+    try:
+        y = np.asarray(y)
+        random_state = random_state if shuffle else None
+        if groups is not None:
+            splitter = (StratifiedGroupKFold(n_splits=n_splits, shuffle=shuffle, random_state=random_state)
+                        if stratified else GroupKFold(n_splits=n_splits))
+        elif stratified:
+            splitter = StratifiedKFold(n_splits=n_splits, shuffle=shuffle, random_state=random_state)
+        else:
+            splitter = KFold(n_splits=n_splits, shuffle=shuffle, random_state=random_state)
+
+        # The splitters only need the number of rows, the labels and the groups
+        folds = list(splitter.split(np.empty((len(y), 0)), y, groups))
+        logger.info("%d cross-validation folds created (stratified=%s, grouped=%s).", n_splits, stratified, groups is not None)
+        return folds
+    except ValueError as ve:
+        logger.error("ValueError occurred while creating cross-validation folds: %s", ve)
+        echo("ValueError occurred while creating cross-validation folds: %s", ve)
+        return None
     except Exception as e:
-        logging.error(f"An unexpected error occurred during train-test split: {e}")
-        print(f"An unexpected error occurred during train-test split: {e}")
-        return None, None, None, None
\ No newline at end of file
+        logger.error("An unexpected error occurred while creating cross-validation folds: %s", e)
+        echo("An unexpected error occurred while creating cross-validation folds: %s", e)
+        return None
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+from customer_churn_predictor.data.schema import CATEGORY_LEVELS, TELCO_COLUMNS
+
+
+def make_synthetic_telco_data(n_rows=1000, random_state=42, missing_total_charges=0.001):
+    """
+    Generate a synthetic dataset with the same schema as the Telco Customer Churn dataset.
+
+    The churn label depends on contract type, tenure and monthly charges, so models trained
+    on the synthetic data learn a non-trivial signal. Useful for tests and benchmarks where
+    the raw CSV is not available or a larger dataset is needed.
+
+    Args:
+    - n_rows (int): Number of customer records to generate.
+    - random_state (int): Seed for the random number generator.
+    - missing_total_charges (float): Fraction of rows with a missing 'TotalCharges' value.
+
+    Returns:
+    - data (DataFrame): The generated dataset as a pandas DataFrame.
+    """
+    rng = np.random.default_rng(random_state)
+
+    data = {'customerID': np.char.add('C', np.arange(n_rows).astype(str))}
+    for column, levels in CATEGORY_LEVELS.items():
+        data[column] = np.asarray(levels, dtype=object)[rng.integers(0, len(levels), n_rows)]
+
+    data['SeniorCitizen'] = (rng.random(n_rows) < 0.16).astype(np.int64)
+    tenure = rng.integers(0, 73, n_rows)
+    monthly_charges = np.round(rng.uniform(18.25, 118.75, n_rows), 2)
+    total_charges = np.round(tenure * monthly_charges * rng.uniform(0.9, 1.1, n_rows), 2)
+    total_charges[rng.random(n_rows) < missing_total_charges] = np.nan
+    data['tenure'] = tenure
+    data['MonthlyCharges'] = monthly_charges
+    data['TotalCharges'] = total_charges
+
+    # Churn is more likely for month-to-month contracts, short tenure and high charges
+    logit = (-1.0 + 1.5 * (data['Contract'] == 'Month-to-month') - 0.04 * tenure
+             + 0.02 * (monthly_charges - 65.0) + rng.normal(0.0, 0.5, n_rows))
+    churn = rng.random(n_rows) < 1.0 / (1.0 + np.exp(-logit))
+    data['Churn'] = np.where(churn, 'Yes', 'No')
+
+    return pd.DataFrame(data, columns=TELCO_COLUMNS)
@@ -2,4 +2,10 @@
 # Python looks for the __init__.py file in that package directory.
 # By including the import statement in __init__.py,
 # we're effectively exposing the feature_engineering function at the package level.
-from .build_features import feature_engineering
\ No newline at end of file
+# It is imported on first access (PEP 562).
+from customer_churn_predictor.utils.lazy_imports import lazy_attributes
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'feature_engineering': ('.build_features', 'feature_engineering'),
+})
+__all__ = ['feature_engineering']
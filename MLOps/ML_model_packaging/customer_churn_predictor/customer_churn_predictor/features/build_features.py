@@ -1,51 +1,88 @@
-from sklearn.preprocessing import PolynomialFeatures
+import numpy as np
 import pandas as pd
 import logging
+from customer_churn_predictor.data.load_data import load_data_in_chunks
+from customer_churn_predictor.utils.logging import echo
 
-def feature_engineering(preprocessed_data):
+logger = logging.getLogger(__name__)
+
+# Engineered features, as (name, NumPy ufunc, input columns). Each feature is computed by applying
+# the ufunc to the input columns, directly into its column of the engineered feature block.
+# The degree 2 terms keep the names given to them by scikit-learn's PolynomialFeatures.
+ENGINEERED_FEATURES = (
+    ('Tenure_MonthlyCharges_interaction', np.multiply, ('tenure', 'MonthlyCharges')),
+    ('tenure^2', np.square, ('tenure',)),
+    ('tenure MonthlyCharges', np.multiply, ('tenure', 'MonthlyCharges')),
+    ('MonthlyCharges^2', np.square, ('MonthlyCharges',)),
+)
+
+def feature_engineering(preprocessed_data, features=ENGINEERED_FEATURES, dtype=np.float32):
     """
     Perform feature engineering on preprocessed data.
 
-    This includes creating interaction features, generating polynomial features,
-    and removing duplicate columns.
+    This includes creating interaction features and degree 2 polynomial features. The engineered
+    features are computed into a single preallocated block, without intermediate DataFrames,
+    and appended to the preprocessed columns. The input is not modified.
 
     Args:
     - preprocessed_data (DataFrame): The preprocessed data on which feature engineering will be applied.
+    - features (tuple): The engineered features, as (name, ufunc, input columns). Features whose name
+      is already a column of the preprocessed data are skipped.
+    - dtype (type): The data type of the engineered features.
 
     Returns:
-    - preprocessed_data (DataFrame): The data with newly engineered features.
+    - engineered_data (DataFrame): The data with newly engineered features.
     """
     try:
-        logging.info("Starting feature engineering.")
-
-        # Feature interaction
-        preprocessed_data['Tenure_MonthlyCharges_interaction'] = preprocessed_data['tenure'] * preprocessed_data['MonthlyCharges']
-        logging.info("Feature interaction created.")
-
-        # Polynomial features
-        poly = PolynomialFeatures(degree=2, include_bias=False)
-        poly_features = poly.fit_transform(preprocessed_data[['tenure', 'MonthlyCharges']])
-        poly_feature_names = poly.get_feature_names_out(['tenure', 'MonthlyCharges'])
-        poly_df = pd.DataFrame(poly_features, columns=poly_feature_names)
-        # Concatenate the polynomial features with the preprocessed data
-        preprocessed_data = pd.concat([preprocessed_data, poly_df], axis=1)
-        logging.info("Polynomial features created and concatenated.")
-
-        # Remove duplicate columns, if any
-        preprocessed_data = preprocessed_data.loc[:, ~preprocessed_data.columns.duplicated()]
-        logging.info("Duplicate columns removed, if any.")
-
-        logging.info("Feature engineering completed successfully.")
-        return preprocessed_data
+        logger.info("Starting feature engineering.")
+
+        features = [feature for feature in features if feature[0] not in preprocessed_data.columns]
+        input_columns = {column for _, _, inputs in features for column in inputs}
+        inputs = {column: preprocessed_data[column].to_numpy() for column in input_columns}
+
+        # Column-major, so every feature is written to a contiguous column and the block is
+        # wrapped by the DataFrame without a copy
+        block = np.empty((len(preprocessed_data), len(features)), dtype=dtype, order='F')
+        for i, (_, function, columns) in enumerate(features):
+            function(*(inputs[column] for column in columns), out=block[:, i], casting='same_kind')
+        logger.info("Interaction and polynomial features created.")
+
+        engineered_features = pd.DataFrame(block, columns=[name for name, _, _ in features],
+                                           index=preprocessed_data.index, copy=False)
+        engineered_data = pd.concat([preprocessed_data, engineered_features], axis=1)
+
+        logger.info("Feature engineering completed successfully.")
+        return engineered_data
     except ValueError as ve:
-        logging.error(f"ValueError occurred during feature engineering: {ve}")
-        print(f"ValueError occurred during feature engineering: {ve}")
+        logger.error("ValueError occurred during feature engineering: %s", ve)
+        echo("ValueError occurred during feature engineering: %s", ve)
         return None
     except KeyError as ke:
-        logging.error(f"KeyError occurred during feature engineering: {ke}")
-        print(f"KeyError occurred during feature engineering: {ke}")
+        logger.error("KeyError occurred during feature engineering: %s", ke)
+        echo("KeyError occurred during feature engineering: %s", ke)
         return None
     except Exception as e:
-        logging.error(f"An unexpected error occurred during feature engineering: {e}")
-        print(f"An unexpected error occurred during feature engineering: {e}")
-        return None
\ No newline at end of file
+        logger.error("An unexpected error occurred during feature engineering: %s", e)
+        echo("An unexpected error occurred during feature engineering: %s", e)
+        return None
+
+def stream_features(data_path, preprocessor, chunksize=100_000, engine='c'):
+    """
+    Stream the engineered features and the encoded target of a CSV file, one chunk at a time.
+
+    Args:
+    - data_path (str): Path to the raw CSV data file.
+    - preprocessor (ChurnPreprocessor): The fitted preprocessor to transform the chunks with.
+    - chunksize (int): The number of rows per chunk.
+    - engine (str): The CSV parser, 'c' or 'pyarrow' (see `load_data_in_chunks`).
+
+    Yields:
+    - X (DataFrame): The engineered features of the chunk.
+    - y (Series): The encoded target of the chunk, or None if the CSV has no 'Churn' column.
+    """
+    for chunk in load_data_in_chunks(data_path, chunksize=chunksize, engine=engine):
+        processed_data = feature_engineering(preprocessor.transform(chunk))
+        if processed_data is None:
+            raise ValueError(f"Feature engineering failed for a chunk of {data_path}")
+        y = processed_data.pop('Churn_encoded') if 'Churn_encoded' in processed_data else None
+        yield processed_data, y
@@ -1,6 +1,19 @@
+# The functions are imported on first access (PEP 562), so that e.g. loading a compiled model
+# does not import scikit-learn. define_models is imported eagerly, as the function would otherwise
+# be shadowed by its module once the module is imported; it only imports the estimators when called.
+from customer_churn_predictor.utils.lazy_imports import lazy_attributes
 from .define_models import define_models
-from .evaluate_model import evaluate_models
-from .feature_importance import calculate_feature_importance
-from .model_serialization import save_model, load_model
-from .predict_model import predict_models
-from .train_model import train_models
\ No newline at end of file
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'evaluate_models': ('.evaluate_model', 'evaluate_models'),
+    'roc_auc': ('.evaluate_model', 'roc_auc'),
+    'calculate_feature_importance': ('.feature_importance', 'calculate_feature_importance'),
+    'compile_model': ('.model_artifact', 'compile_model'),
+    'save_model': ('.model_serialization', 'save_model'),
+    'load_model': ('.model_serialization', 'load_model'),
+    'load_preprocessor': ('.model_serialization', 'load_preprocessor'),
+    'predict_models': ('.predict_model', 'predict_models'),
+    'train_models': ('.train_model', 'train_models'),
+})
+__all__ = ['define_models', 'evaluate_models', 'roc_auc', 'calculate_feature_importance', 'compile_model', 'save_model',
+           'load_model', 'load_preprocessor', 'predict_models', 'train_models']
@@ -0,0 +1,95 @@
+from sklearn.base import clone
+from joblib import Parallel, delayed
+import joblib
+import numpy as np
+import pandas as pd
+import logging
+import os
+import tempfile
+import time
+from customer_churn_predictor.models.evaluate_model import compute_metrics
+from customer_churn_predictor.utils.logging import echo
+
+logger = logging.getLogger(__name__)
+
+def _fit_and_score_fold(name, model, X, y, fold, train_indices, test_indices):
+    """
+    Fit a copy of a model on the training rows of a fold and score it on its validation rows.
+
+    Args:
+    - name (str): The model name.
+    - model: The untrained model instance.
+    - X (ndarray): The features, usually a read-only memory-mapped array shared by all the tasks.
+    - y (ndarray): The target variable.
+    - fold (int): The fold number.
+    - train_indices (ndarray): Positions of the training rows.
+    - test_indices (ndarray): Positions of the validation rows.
+
+    Returns:
+    - scores (dict): The model name, fold number, evaluation metrics and fit time of the fold.
+    """
+    model = clone(model)
+    start = time.perf_counter()
+    model.fit(X[train_indices], y[train_indices])
+    fit_time = time.perf_counter() - start
+
+    X_test = X[test_indices]
+    if hasattr(model, 'predict_proba'):
+        probabilities = model.predict_proba(X_test)
+        y_pred = model.classes_[np.argmax(probabilities, axis=1)]
+        y_score = probabilities[:, -1] if len(model.classes_) == 2 else None
+    else:
+        y_pred, y_score = model.predict(X_test), None
+    result = compute_metrics(y[test_indices], y_pred, y_score, classes=np.union1d(model.classes_, y))
+    return {'model': name, 'fold': fold, **result.metrics(), 'fit_time': fit_time}
+
+def cross_validate_models(models, X, y, folds, n_jobs=-1, temp_folder=None):
+    """
+    Cross-validate a set of models, training all the models x folds in a process pool.
+
+    The features and the target are written once to a temporary folder and memory-mapped by
+    the workers, so the feature matrix is shared between them instead of being pickled for every
+    task. Each task only receives the index arrays of its fold.
+
+    Args:
+    - models (dict): A dictionary of model names and their corresponding untrained model instances.
+    - X (DataFrame or ndarray): The features.
+    - y (Series or ndarray): The target variable.
+    - folds (list): (train_indices, test_indices) pairs, e.g. from `make_cv_folds`.
+    - n_jobs (int): Number of worker processes, -1 to use all cores.
+    - temp_folder (str, optional): Folder of the memory-mapped arrays. Defaults to the system temporary folder.
+
+    Returns:
+    - cv_results (DataFrame): One row per model and fold with the 'accuracy', 'precision', 'recall',
+      'f1', 'roc_auc' and 'fit_time' of the fold.
+    """
+    try:
+        with tempfile.TemporaryDirectory(dir=temp_folder) as memmap_folder:
+            # float32 is the type the tree models train on, and halves the shared matrix
+            X_path = os.path.join(memmap_folder, 'X.mmap')
+            y_path = os.path.join(memmap_folder, 'y.mmap')
+            joblib.dump(np.ascontiguousarray(X, dtype=np.float32), X_path)
+            joblib.dump(np.asarray(y), y_path)
+            X_shared = joblib.load(X_path, mmap_mode='r')
+            y_shared = joblib.load(y_path, mmap_mode='r')
+
+            scores = Parallel(n_jobs=n_jobs, backend='loky')(
+                delayed(_fit_and_score_fold)(name, model, X_shared, y_shared, fold, train_indices, test_indices)
+                for name, model in models.items()
+                for fold, (train_indices, test_indices) in enumerate(folds))
+            del X_shared, y_shared
+
+        cv_results = pd.DataFrame(scores)
+        summary = cv_results.drop(columns='fold').groupby('model', sort=False).agg(['mean', 'std'])
+        for name, row in summary.iterrows():
+            logger.info("Cross-validation of %s over %d folds: accuracy %.4f (+/- %.4f), ROC AUC %.4f (+/- %.4f)",
+                         name, len(folds), row[('accuracy', 'mean')], row[('accuracy', 'std')],
+                         row[('roc_auc', 'mean')], row[('roc_auc', 'std')])
+            echo("%s cross-validation: accuracy %.3f (+/- %.3f), ROC AUC %.3f (+/- %.3f)",
+                 name, row[('accuracy', 'mean')], row[('accuracy', 'std')],
+                 row[('roc_auc', 'mean')], row[('roc_auc', 'std')])
+        return cv_results
+    except Exception as e:
+        logger.error("An unexpected error occurred during cross-validation: %s", e)
+        echo("An unexpected error occurred during cross-validation: %s", e)
+        return None
@@ -1,24 +1,82 @@
-from sklearn.linear_model import LogisticRegression
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.ensemble import RandomForestClassifier
+import importlib
 import logging
+from customer_churn_predictor.utils.logging import echo
 
-def define_models():
+logger = logging.getLogger(__name__)
+
+# Model names and the estimator classes they are built from, as 'module:class' paths imported
+# when the models are defined, so importing this module does not import scikit-learn. The
+# 'models' block of the configuration holds the hyperparameters of each estimator, keyed by class name.
+MODEL_CLASSES = {
+    'Logistic regression': 'sklearn.linear_model:LogisticRegression',
+    'Decision tree': 'sklearn.tree:DecisionTreeClassifier',
+    'Random forest': 'sklearn.ensemble:RandomForestClassifier',
+}
+# Models that support `partial_fit`, for incremental training on a stream of chunks. Their
+# hyperparameters are read from the 'models' block of the 'incremental' configuration block.
+INCREMENTAL_MODEL_CLASSES = {
+    'SGD logistic regression': 'sklearn.linear_model:SGDClassifier',
+    'Naive Bayes': 'sklearn.naive_bayes:GaussianNB',
+}
+# Default hyperparameters of the incremental models, making the SGD classifier a logistic regression
+INCREMENTAL_MODEL_DEFAULTS = {
+    'SGDClassifier': {'loss': 'log_loss'},
+}
+
+def _import_class(path):
+    """Import a class from its 'module:class' path."""
+    module_name, class_name = path.split(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
+def parse_hyperparameters(params):
+    """
+    Normalize hyperparameters read from a YAML configuration.
+
+    YAML reads an unquoted `None` as the string 'None', so it is converted to Python None.
+
+    Args:
+    - params (dict): Hyperparameter names and values.
+
+    Returns:
+    - params (dict): The normalized hyperparameters.
+    """
+    def parse(value):
+        if isinstance(value, list):
+            return [parse(item) for item in value]
+        return None if value == 'None' else value
+    return {name: parse(value) for name, value in (params or {}).items()}
+
+def define_models(config=None, incremental=False):
     """
     Define a set of machine learning models to be used for training.
 
+    Args:
+    - config (Config, optional): Configuration object. The hyperparameters of each model are read
+      from its 'models' block, keyed by estimator class name (e.g. 'RandomForestClassifier').
+      Models missing from the block, or all models if no configuration is given, use the
+      estimator defaults.
+    - incremental (bool): Define the models of `INCREMENTAL_MODEL_CLASSES`, which support
+      `partial_fit`, with the hyperparameters of the 'models' block of the 'incremental' block.
+
     Returns:
     - models (dict): A dictionary containing the model names as keys and model instances as values.
     """
     try:
-        models = {
-            'Logistic regression': LogisticRegression(),
-            'Decision tree': DecisionTreeClassifier(),
-            'Random forest': RandomForestClassifier()
-        }
-        logging.info("Models defined successfully.")
+        if config is not None and incremental:
+            config = config.get('incremental') or {}
+        models_config = (config.get('models') if config is not None else None) or {}
+        model_classes = INCREMENTAL_MODEL_CLASSES if incremental else MODEL_CLASSES
+        models = {}
+        for name, class_path in model_classes.items():
+            model_class = _import_class(class_path)
+            params = parse_hyperparameters(models_config.get(model_class.__name__))
+            if incremental:
+                params = {**INCREMENTAL_MODEL_DEFAULTS.get(model_class.__name__, {}), **params}
+            models[name] = model_class(**params)
+            logger.info("Model %s defined with hyperparameters %s", name, params)
+        logger.info("Models defined successfully.")
         return models
     except Exception as e:
-        logging.error(f"An unexpected error occurred while defining models: {e}")
-        print(f"An unexpected error occurred while defining models: {e}")
+        logger.error("An unexpected error occurred while defining models: %s", e)
+        echo("An unexpected error occurred while defining models: %s", e)
         return None
\ No newline at end of file
@@ -1,51 +1,308 @@
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Optional
+from joblib import Parallel, delayed
+import numpy as np
+from scipy.stats import rankdata
 import logging
+import os
+from customer_churn_predictor.utils.logging import echo
 
-def evaluate_models(trained_models, X_test, y_test):
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class EvaluationResult:
     """
-    Evaluate trained machine learning models on the test data.
+    Evaluation metrics of a model on the test data.
+
+    The summary metrics are those of the positive class (the last class, 'Churn' = 'Yes').
+    The per-class arrays follow the order of `classes`.
+    """
+    accuracy: float
+    precision: float
+    recall: float
+    f1: float
+    roc_auc: float
+    confusion_matrix: np.ndarray
+    classes: np.ndarray
+    per_class_precision: np.ndarray
+    per_class_recall: np.ndarray
+    per_class_f1: np.ndarray
+    support: np.ndarray
+    # Bootstrap confidence intervals of the accuracy, recall and ROC AUC, as {metric: (lower, upper)}
+    confidence_intervals: Optional[dict] = None
+
+    def metrics(self):
+        """
+        Summary metrics, e.g. to log them to an experiment tracker.
+
+        Returns:
+        - metrics (dict): The accuracy, precision, recall, F1 score and ROC AUC.
+        """
+        return {'accuracy': self.accuracy, 'precision': self.precision, 'recall': self.recall,
+                'f1': self.f1, 'roc_auc': self.roc_auc}
+
+    def classification_report(self, digits=2):
+        """
+        Format the per-class metrics as a text report, like scikit-learn's `classification_report`.
+
+        Args:
+        - digits (int): Number of digits of the metrics.
+
+        Returns:
+        - report (str): The text report.
+        """
+        width = max(len('weighted avg'), *(len(str(label)) for label in self.classes))
+        lines = [f"{'':>{width}} {'precision':>9} {'recall':>9} {'f1-score':>9} {'support':>9}", '']
+        for label, precision, recall, f1, support in zip(self.classes, self.per_class_precision, self.per_class_recall,
+                                                         self.per_class_f1, self.support):
+            lines.append(f"{str(label):>{width}} {precision:>9.{digits}f} {recall:>9.{digits}f} {f1:>9.{digits}f} {support:>9}")
+        total = self.support.sum()
+        lines.append('')
+        lines.append(f"{'accuracy':>{width}} {'':>9} {'':>9} {self.accuracy:>9.{digits}f} {total:>9}")
+        for name, weights in (('macro avg', None), ('weighted avg', self.support)):
+            averages = [np.average(values, weights=weights) for values in
+                        (self.per_class_precision, self.per_class_recall, self.per_class_f1)]
+            lines.append(f"{name:>{width}} " + ' '.join(f"{value:>9.{digits}f}" for value in averages) + f" {total:>9}")
+        return '\n'.join(lines)
+
+def roc_auc(y_true, scores):
+    """
+    ROC AUC of binary labels from the Mann-Whitney U statistic of the scores.
 
     Args:
-    - trained_models (dict): A dictionary of trained models.
-    - X_test (DataFrame): The test features.
-    - y_test (Series): The true labels for the test data.
+    - y_true (ndarray): The binary labels, 1 or True for the positive class.
+    - scores (ndarray): The scores of the positive class, e.g. its predicted probability.
 
     Returns:
-    - evaluation_results (dict): A dictionary containing the evaluation metrics for each model.
+    - roc_auc (float): The ROC AUC, or NaN if the labels hold a single class.
     """
-    evaluation_results = {}
+    n_positive = int(y_true.sum())
+    n_negative = len(y_true) - n_positive
+    if n_positive == 0 or n_negative == 0:
+        return float('nan')
+    # Average ranks, so that tied scores count as half
+    ranks = rankdata(scores)
+    return float((ranks[y_true == 1].sum() - n_positive * (n_positive + 1) / 2) / (n_positive * n_negative))
 
-    try:
-        for name, model in trained_models.items():
-            # Predict
-            y_pred = model.predict(X_test)
+def compute_metrics(y_true, y_pred, y_score=None, classes=None):
+    """
+    Compute all the evaluation metrics in a single pass over the labels.
+
+    The confusion matrix is counted once with `np.bincount` and every other metric
+    except the ROC AUC is derived from it.
+
+    Args:
+    - y_true (array-like): The true labels.
+    - y_pred (array-like): The predicted labels.
+    - y_score (ndarray, optional): The predicted probability of the positive class, for the ROC AUC.
+    - classes (array-like, optional): The class labels, sorted. Defaults to the labels found in
+      `y_true` and `y_pred`.
+
+    Returns:
+    - result (EvaluationResult): The evaluation metrics.
+    """
+    y_true = np.asarray(y_true)
+    y_pred = np.asarray(y_pred)
+    if classes is None:
+        classes = np.union1d(y_true, y_pred)
+    classes = np.asarray(classes)
+    n_classes = len(classes)
+
+    true_index = np.searchsorted(classes, y_true)
+    pred_index = np.searchsorted(classes, y_pred)
+    conf_matrix = np.bincount(true_index * n_classes + pred_index, minlength=n_classes ** 2).reshape(n_classes, n_classes)
+
+    true_positives = np.diag(conf_matrix)
+    support = conf_matrix.sum(axis=1)
+    predicted = conf_matrix.sum(axis=0)
+    # Metrics without any predicted or true sample are 0, as in scikit-learn
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(predicted > 0, true_positives / predicted, 0.0)
+        recall = np.where(support > 0, true_positives / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+    auc = float('nan')
+    if y_score is not None and n_classes == 2:
+        auc = roc_auc(true_index, y_score)
+
+    return EvaluationResult(accuracy=float(true_positives.sum() / max(len(y_true), 1)),
+                            precision=float(precision[-1]), recall=float(recall[-1]), f1=float(f1[-1]),
+                            roc_auc=auc, confusion_matrix=conf_matrix, classes=classes,
+                            per_class_precision=precision, per_class_recall=recall, per_class_f1=f1,
+                            support=support)
+
+BOOTSTRAP_METRICS = ('accuracy', 'recall', 'roc_auc')
+
+def _bootstrap_chunk(outcome, score_level, n_levels, n_resamples, seed):
+    """
+    Compute the bootstrap metrics of a chunk of resamples at once.
+
+    The resamples are drawn as a single (n_resamples, n_rows) index matrix. Every metric is then
+    derived from counts of the drawn rows per resample, made with a single `np.bincount` each.
+
+    Args:
+    - outcome (ndarray): Outcome of each row: 2 * (prediction is correct) + (label is positive).
+    - score_level (ndarray): Rank of the score of each row among the distinct scores, or None without scores.
+    - n_levels (int): Number of distinct scores.
+    - n_resamples (int): Number of resamples in the chunk.
+    - seed (SeedSequence): Seed of the chunk.
 
-            # Evaluate
-            accuracy = accuracy_score(y_test, y_pred)
-            class_report = classification_report(y_test, y_pred, output_dict=True)
-            conf_matrix = confusion_matrix(y_test, y_pred)
+    Returns:
+    - metrics (ndarray): Array of shape (n_resamples, len(BOOTSTRAP_METRICS)).
+    """
+    n_rows = len(outcome)
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, n_rows, size=(n_resamples, n_rows))
+    resample = np.arange(n_resamples)[:, None]
+
+    # Number of drawn rows per resample and outcome
+    outcomes = np.bincount((resample * 4 + outcome[indices]).ravel(), minlength=n_resamples * 4).reshape(n_resamples, 4)
+    n_correct = outcomes[:, 2] + outcomes[:, 3]
+    n_positive = outcomes[:, 1] + outcomes[:, 3]
+    metrics = np.full((n_resamples, len(BOOTSTRAP_METRICS)), np.nan)
+    metrics[:, 0] = n_correct / n_rows
+    with np.errstate(divide='ignore', invalid='ignore'):
+        metrics[:, 1] = outcomes[:, 3] / n_positive
+
+        if score_level is not None:
+            # Number of drawn negative and positive rows per resample and score, in increasing score order
+            keys = (resample * n_levels + score_level[indices]) * 2 + (outcome[indices] & 1)
+            levels = np.bincount(keys.ravel(), minlength=n_resamples * n_levels * 2).reshape(n_resamples, n_levels, 2)
+            negative_counts, positive_counts = levels[:, :, 0], levels[:, :, 1]
+            # Weighted Mann-Whitney U: every positive row counts the negative rows with a lower
+            # score, and half of those with the same score
+            negatives_below = np.cumsum(negative_counts, axis=1) - negative_counts
+            u_statistic = (positive_counts * (negatives_below + 0.5 * negative_counts)).sum(axis=1)
+            metrics[:, 2] = u_statistic / (n_positive * (n_rows - n_positive))
+    return metrics
+
+def bootstrap_confidence_intervals(y_true, y_pred, y_score=None, positive_label=1, n_resamples=2000,
+                                   confidence=0.95, max_chunk_elements=1 << 24, n_jobs=None, random_state=None):
+    """
+    Percentile bootstrap confidence intervals of the accuracy, recall and ROC AUC.
+
+    The resamples are processed in chunks of resamples, each computed at once with NumPy, and
+    the chunks run in parallel on `n_jobs` workers for large holdouts.
+
+    Args:
+    - y_true (array-like): The true labels.
+    - y_pred (array-like): The predicted labels.
+    - y_score (array-like, optional): The predicted probability of the positive class, for the ROC AUC.
+    - positive_label: The label of the positive class.
+    - n_resamples (int): Number of bootstrap resamples.
+    - confidence (float): Confidence level of the intervals.
+    - max_chunk_elements (int): Maximum size of the index matrix of a chunk, which bounds its memory use.
+    - n_jobs (int, optional): Number of parallel jobs, -1 to use all cores. Chunks run sequentially if None.
+    - random_state (int, optional): Seed of the resamples.
+
+    Returns:
+    - confidence_intervals (dict): {metric: (lower, upper)} for 'accuracy', 'recall' and 'roc_auc'
+      (NaN bounds for the ROC AUC without scores).
+    """
+    y_true = np.asarray(y_true)
+    outcome = 2 * (np.asarray(y_pred) == y_true).astype(np.int8) + (y_true == positive_label).astype(np.int8)
+    score_level, n_levels = None, 0
+    if y_score is not None:
+        distinct_scores, score_level = np.unique(np.asarray(y_score), return_inverse=True)
+        n_levels = len(distinct_scores)
+
+    chunk_size = max(1, min(n_resamples, max_chunk_elements // max(len(y_true), 1)))
+    chunk_sizes = [min(chunk_size, n_resamples - start) for start in range(0, n_resamples, chunk_size)]
+    seeds = np.random.SeedSequence(random_state).spawn(len(chunk_sizes))
+    chunks = Parallel(n_jobs=n_jobs)(delayed(_bootstrap_chunk)(outcome, score_level, n_levels, size, seed)
+                                     for size, seed in zip(chunk_sizes, seeds))
+    metrics = np.concatenate(chunks)
+
+    alpha = (1 - confidence) / 2
+    confidence_intervals = {}
+    for i, name in enumerate(BOOTSTRAP_METRICS):
+        # Resamples without any positive row have no recall nor ROC AUC
+        values = metrics[:, i][np.isfinite(metrics[:, i])]
+        lower, upper = np.quantile(values, [alpha, 1 - alpha]) if len(values) else (np.nan, np.nan)
+        confidence_intervals[name] = (float(lower), float(upper))
+    return confidence_intervals
+
+def _evaluate_model(model, X_test, y_test, bootstrap=None):
+    """
+    Evaluate a model with a single prediction call.
 
+    Args:
+    - model: The trained model.
+    - X_test (DataFrame): The test features.
+    - y_test (Series): The true labels for the test data.
+    - bootstrap (dict, optional): Keyword arguments of `bootstrap_confidence_intervals`, to add
+      confidence intervals to the result.
+
+    Returns:
+    - result (EvaluationResult): The evaluation metrics.
+    """
+    classes = np.union1d(model.classes_, np.unique(y_test))
+    if hasattr(model, 'predict_proba'):
+        # The predicted label is the most probable class, as in the models' own `predict`
+        probabilities = model.predict_proba(X_test)
+        y_pred = model.classes_[np.argmax(probabilities, axis=1)]
+        y_score = probabilities[:, -1] if len(model.classes_) == 2 else None
+    else:
+        y_pred = model.predict(X_test)
+        y_score = model.decision_function(X_test) if hasattr(model, 'decision_function') else None
+    result = compute_metrics(y_test, y_pred, y_score, classes=classes)
+    if bootstrap:
+        confidence_intervals = bootstrap_confidence_intervals(y_test, y_pred, y_score if len(classes) == 2 else None,
+                                                              positive_label=classes[-1], **bootstrap)
+        result = replace(result, confidence_intervals=confidence_intervals)
+    return result
+
+def evaluate_models(trained_models, X_test, y_test, n_jobs=None, verbose=True, bootstrap_resamples=0,
+                    confidence=0.95, bootstrap_n_jobs=None, random_state=None):
+    """
+    Evaluate trained machine learning models on the test data.
 
-            # Log to console and to logging
-            print(f'{name} Model accuracy: {accuracy:.2f}')
-            logging.info(f'{name} Model accuracy: {accuracy:.2f}')
+    Each model makes a single prediction call and all its metrics are derived from it in one
+    pass. The models are evaluated concurrently in a thread pool, as predictions mostly run in
+    NumPy and scikit-learn code that releases the GIL. With `bootstrap_resamples`, bootstrap
+    confidence intervals of the accuracy, recall and ROC AUC are computed as well.
 
-            print(f'Classification report for {name} model:')
-            print(classification_report(y_test, y_pred))
-            logging.info(f'Classification report for {name} model:\n{classification_report(y_test, y_pred)}')
+    Args:
+    - trained_models (dict): A dictionary of trained models.
+    - X_test (DataFrame): The test features.
+    - y_test (Series): The true labels for the test data.
+    - n_jobs (int, optional): Number of threads. Defaults to one per model, up to the number of CPUs.
+    - verbose (bool): Print the metrics and confusion matrix of each model.
+    - bootstrap_resamples (int): Number of bootstrap resamples for the confidence intervals, 0 to skip them.
+    - confidence (float): Confidence level of the intervals.
+    - bootstrap_n_jobs (int, optional): Number of parallel jobs computing the chunks of resamples of each model.
+    - random_state (int, optional): Seed of the bootstrap resamples.
 
-            print(f'Confusion matrix for {name} model:')
-            print(confusion_matrix(y_test, y_pred))
-            logging.info(f'Confusion matrix for {name} model:\n{confusion_matrix(y_test, y_pred)}')
+    Returns:
+    - evaluation_results (dict): A dictionary of model names and their EvaluationResult.
+    """
+    try:
+        y_test = np.asarray(y_test)
+        bootstrap = None
+        if bootstrap_resamples:
+            bootstrap = {'n_resamples': bootstrap_resamples, 'confidence': confidence, 'n_jobs': bootstrap_n_jobs,
+                         'random_state': random_state}
+        max_workers = n_jobs or max(1, min(len(trained_models), os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {name: executor.submit(_evaluate_model, model, X_test, y_test, bootstrap)
+                       for name, model in trained_models.items()}
+            evaluation_results = {name: future.result() for name, future in futures.items()}
 
-            # Store metrics in the dictionary
-            evaluation_results[name] = {
-                "accuracy": accuracy,
-                "classification_report": class_report,
-                "confusion_matrix": conf_matrix
-            }
+        for name, result in evaluation_results.items():
+            # Formatted lazily by the logger, only if the record is emitted
+            summary = "%s Model accuracy: %.2f, precision: %.2f, recall: %.2f, F1: %.2f, ROC AUC: %.3f"
+            args = [name, result.accuracy, result.precision, result.recall, result.f1, result.roc_auc]
+            for metric, (lower, upper) in (result.confidence_intervals or {}).items():
+                summary += "\n  %s %.0f%% CI: [%.3f, %.3f]"
+                args += [metric, confidence * 100, lower, upper]
+            logger.info(summary, *args)
+            if verbose:
+                echo(summary, *args)
+                echo("Confusion matrix for %s model:\n%s", name, result.confusion_matrix)
 
-            return evaluation_results
+        return evaluation_results
     except Exception as e:
-        logging.error(f"An unexpected error occurred while evaluating models: {e}")
-        print(f"An unexpected error occurred while evaluating models: {e}")
\ No newline at end of file
+        logger.error("An unexpected error occurred while evaluating models: %s", e)
+        echo("An unexpected error occurred while evaluating models: %s", e)
+        return None
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+def _positive_probabilities(tree):
+    """Probability of the positive (last) class at every node of a fitted scikit-learn tree."""
+    values = tree.value[:, 0, :]
+    return values[:, -1] / values.sum(axis=1)
+
+def _leaf_contributions(tree, n_features):
+    """
+    Path contributions of every leaf of a tree, as a sparse (n_nodes, n_features) matrix.
+
+    Going down from the root, every split moves the positive class probability from the
+    parent's value to the child's value, and the change is credited to the split feature.
+    The row of a leaf holds the sum of the changes along its path, so the root value plus the
+    row is the probability predicted at the leaf. The rows of the internal nodes are empty.
+
+    Args:
+    - tree (Tree): The `tree_` attribute of a fitted decision tree.
+    - n_features (int): Number of features the tree was fitted on.
+
+    Returns:
+    - contributions (csr_matrix): The contributions of each leaf, indexed by node id.
+    - base_value (float): The positive class probability at the root.
+    """
+    probabilities = _positive_probabilities(tree)
+    left, right, feature = tree.children_left, tree.children_right, tree.feature
+    cumulative = np.zeros((tree.node_count, n_features))
+
+    # One vectorized step per depth level, from the root down to the deepest leaves
+    nodes = np.array([0])
+    while len(nodes):
+        nodes = nodes[left[nodes] != -1]
+        for children in (left[nodes], right[nodes]):
+            cumulative[children] = cumulative[nodes]
+            cumulative[children, feature[nodes]] += probabilities[children] - probabilities[nodes]
+        nodes = np.concatenate([left[nodes], right[nodes]])
+
+    cumulative[left != -1] = 0
+    return sparse.csr_matrix(cumulative), float(probabilities[0])
+
+class ModelExplainer:
+    """
+    Per-prediction explanations of a trained churn model, as one contribution per feature.
+
+    - Logistic regression: exact linear contributions `coef * x` to the log-odds of churn. The
+      base value is the intercept, and the base value plus the contributions is the log-odds.
+    - Decision tree and random forest: path contributions to the churn probability, computed
+      for every leaf when the explainer is built. Explaining a batch only looks up the leaf of
+      each row in each tree (`apply`) and sums the precomputed contributions with one sparse
+      product, so the base value plus the contributions is exactly the predicted probability.
+
+    The explainer is built once per model and reused for every batch.
+    """
+
+    def __init__(self, model):
+        """
+        Precompute the explanation arrays of a model.
+
+        Args:
+        - model: A trained binary LogisticRegression, DecisionTreeClassifier or RandomForestClassifier.
+        """
+        self.model = model
+        self.feature_names = getattr(model, 'feature_names_in_', None)
+        if len(getattr(model, 'classes_', ())) != 2:
+            raise ValueError("Explanations are only supported for trained binary classifiers.")
+
+        if hasattr(model, 'coef_'):
+            self.output = 'log_odds'
+            self.base_value = float(model.intercept_[0])
+            self._coefficients = model.coef_[0]
+        elif hasattr(model, 'tree_') or hasattr(model, 'estimators_'):
+            self.output = 'probability'
+            trees = [model] if hasattr(model, 'tree_') else model.estimators_
+            leaves = [_leaf_contributions(estimator.tree_, model.n_features_in_) for estimator in trees]
+            # The contributions of all the trees stacked in the node order of `apply`, averaged like
+            # the probabilities of the forest
+            self._leaf_contributions = sparse.vstack([contributions for contributions, _ in leaves]).tocsr() / len(trees)
+            self._node_offsets = np.cumsum([0] + [estimator.tree_.node_count for estimator in trees[:-1]])
+            self.base_value = float(np.mean([base_value for _, base_value in leaves]))
+        else:
+            raise TypeError(f"Explanations are not supported for {type(model).__name__} models.")
+
+    def explain(self, X):
+        """
+        Compute the contribution of every feature to the prediction of every row.
+
+        Args:
+        - X (DataFrame): The processed features, with the columns the model was trained on.
+
+        Returns:
+        - contributions (DataFrame): One row per row of X and one column per feature.
+        """
+        if self.feature_names is not None:
+            X = X[self.feature_names]
+        if self.output == 'log_odds':
+            contributions = np.asarray(X, dtype=np.float64) * self._coefficients
+        else:
+            leaves = self.model.apply(X)
+            n_rows, n_trees = (len(leaves), 1) if leaves.ndim == 1 else leaves.shape
+            # One entry per row and tree, selecting the contributions of the leaf the row falls in
+            indicator = sparse.csr_matrix((np.ones(n_rows * n_trees), (leaves.reshape(n_rows, n_trees) + self._node_offsets).ravel(),
+                                           np.arange(0, n_rows * n_trees + 1, n_trees)),
+                                          shape=(n_rows, self._leaf_contributions.shape[0]))
+            contributions = (indicator @ self._leaf_contributions).toarray()
+        columns = self.feature_names if self.feature_names is not None else X.columns
+        return pd.DataFrame(contributions, columns=columns, index=X.index)
+
+def top_contributions(contributions, k=3):
+    """
+    The k features with the largest absolute contribution of each row.
+
+    Args:
+    - contributions (DataFrame): Contributions, as returned by `ModelExplainer.explain`.
+    - k (int): Number of features per row.
+
+    Returns:
+    - top (list): One {feature: contribution} dict per row, by decreasing absolute contribution.
+    """
+    if k < 1:
+        raise ValueError(f"k must be at least 1, got {k}")
+    values = contributions.to_numpy()
+    k = min(k, values.shape[1])
+    # Select the top k of every row at once, then only sort those k
+    top = np.argpartition(-np.abs(values), k - 1, axis=1)[:, :k]
+    top_values = np.take_along_axis(values, top, axis=1)
+    order = np.argsort(-np.abs(top_values), axis=1)
+    top, top_values = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_values, order, axis=1)
+    features = np.asarray(contributions.columns)[top]
+    return [dict(zip(row_features, row_values.tolist())) for row_features, row_values in zip(features, top_values)]
+
+def format_explanations(explanations, top_k=None):
+    """
+    Convert the explanations of several models to JSON-serializable records.
+
+    Args:
+    - explanations (DataFrame): Columns (model name, feature) with the contributions of each model,
+      and (model name, 'base_value') with its base value, as returned by `WarmModelState.explain`.
+    - top_k (int, optional): Only keep the k features with the largest absolute contribution of each row.
+
+    Returns:
+    - records (dict): Model names mapped to one {'base_value', 'contributions'} dict per row.
+    """
+    records = {}
+    for model_name in explanations.columns.unique(level=0):
+        model_explanations = explanations[model_name]
+        contributions = model_explanations.drop(columns='base_value')
+        if top_k is not None:
+            contributions = top_contributions(contributions, top_k)
+        else:
+            contributions = contributions.to_dict(orient='records')
+        records[model_name] = [{'base_value': base_value, 'contributions': row_contributions} for base_value, row_contributions
+                               in zip(model_explanations['base_value'].tolist(), contributions)]
+    return records
@@ -1,59 +1,176 @@
+from joblib import Parallel, delayed, effective_n_jobs
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import logging
+from customer_churn_predictor.models.evaluate_model import roc_auc
+from customer_churn_predictor.visualization.visualize import visualize_feature_importance
+from customer_churn_predictor.utils.logging import echo
 
-def calculate_feature_importance(trained_model, feature_names, save_path=None):
+logger = logging.getLogger(__name__)
+
+PERMUTATION_SCORINGS = ('accuracy', 'roc_auc')
+
+def _score(model, X, y, scoring):
+    """Score a model on features and encoded labels with one prediction call."""
+    if hasattr(model, 'predict_proba'):
+        probabilities = model.predict_proba(X)
+        if scoring == 'roc_auc':
+            return roc_auc(y == model.classes_[-1], probabilities[:, -1])
+        return float(np.mean(model.classes_[np.argmax(probabilities, axis=1)] == y))
+    if scoring == 'roc_auc':
+        return roc_auc(y == model.classes_[-1], model.decision_function(X))
+    return float(np.mean(model.predict(X) == y))
+
+def _permutation_scores(model, X, y, columns, tasks, scoring):
+    """
+    Score a model with the features of `tasks` permuted, one (feature, repeat) at a time.
+
+    All the permutations of a call are applied in place to a single copy of the features:
+    the permuted values are written to the column, and the column is restored from the
+    original features once all the repeats of its feature are scored.
+
+    Args:
+    - model: The trained model.
+    - X (ndarray): The features, left unmodified.
+    - y (ndarray): The target variable.
+    - columns (Index): The feature names the model was fitted with, or None.
+    - tasks (list): (feature position, repeat, seed) triples, grouped by feature.
+    - scoring (str): 'accuracy' or 'roc_auc'.
+
+    Returns:
+    - scores (list): The score of each task.
+    """
+    # Column-major, so that each permuted column is written contiguously
+    buffer = np.array(X, order='F')
+    # Keep the feature names, so the model does not warn about predicting on an array
+    X_permuted = pd.DataFrame(buffer, columns=columns, copy=False) if columns is not None else buffer
+
+    scores = []
+    for i, (feature, repeat, seed) in enumerate(tasks):
+        rng = np.random.default_rng(seed)
+        np.take(X[:, feature], rng.permutation(len(X)), out=buffer[:, feature])
+        scores.append(_score(model, X_permuted, y, scoring))
+        if i + 1 == len(tasks) or tasks[i + 1][0] != feature:
+            buffer[:, feature] = X[:, feature]
+    return scores
+
+def permutation_importance(trained_model, X, y, n_repeats=5, scoring='accuracy', max_samples=None,
+                           n_jobs=None, random_state=None):
+    """
+    Model-agnostic feature importance: the drop in score when the values of a feature are shuffled.
+
+    The baseline score is computed once. The features x repeats are split into one batch per
+    worker, and each worker permutes the columns of its batch in place in a single reusable
+    copy of the features, instead of copying the full feature matrix for every permutation.
+
+    Args:
+    - trained_model (model): The trained machine learning model.
+    - X (DataFrame or ndarray): The held-out features.
+    - y (Series or ndarray): The held-out target variable.
+    - n_repeats (int): Number of permutations of each feature.
+    - scoring (str): 'accuracy' or 'roc_auc'.
+    - max_samples (int or float, optional): Number (int) or fraction (float) of rows to subsample
+      without replacement, for large held-out sets. Defaults to all the rows.
+    - n_jobs (int, optional): Number of worker processes, -1 to use all cores. Defaults to sequential.
+    - random_state (int, optional): Seed of the subsample and the permutations. The importances do not
+      depend on `n_jobs`.
+
+    Returns:
+    - importances (DataFrame): 'Feature', 'Importance' (mean drop in score) and 'Std' for each feature,
+      and the drop in score of each repeat in an (n_features, n_repeats) array under `attrs['importances']`.
+    """
+    if scoring not in PERMUTATION_SCORINGS:
+        raise ValueError(f"Unknown scoring '{scoring}'. Expected one of {PERMUTATION_SCORINGS}.")
+    columns = X.columns if isinstance(X, pd.DataFrame) else None
+    X = np.asarray(X)
+    y = np.asarray(y)
+    seed_sequence = np.random.SeedSequence(random_state)
+
+    if max_samples is not None:
+        n_samples = int(max_samples * len(X)) if isinstance(max_samples, float) else int(max_samples)
+        if n_samples < len(X):
+            rows = np.sort(np.random.default_rng(seed_sequence.spawn(1)[0]).choice(len(X), n_samples, replace=False))
+            X, y = X[rows], y[rows]
+    baseline = _score(trained_model, pd.DataFrame(X, columns=columns, copy=False) if columns is not None else X,
+                      y, scoring)
+
+    # One seed per (feature, repeat), so the permutations do not depend on how the tasks are batched
+    n_features = X.shape[1]
+    seeds = seed_sequence.spawn(n_features * n_repeats + 1)[1:]
+    tasks = [(feature, repeat, seeds[feature * n_repeats + repeat])
+             for feature in range(n_features) for repeat in range(n_repeats)]
+    n_batches = min(effective_n_jobs(n_jobs), len(tasks))
+    batches = [list(batch) for batch in np.array_split(np.arange(len(tasks)), n_batches)]
+
+    batch_scores = Parallel(n_jobs=n_jobs)(
+        delayed(_permutation_scores)(trained_model, X, y, columns, [tasks[i] for i in batch], scoring)
+        for batch in batches)
+    scores = np.concatenate(batch_scores).reshape(n_features, n_repeats)
+    importances = baseline - scores
+
+    feature_names = list(columns) if columns is not None else [f'feature_{i}' for i in range(n_features)]
+    importance_df = pd.DataFrame({'Feature': feature_names, 'Importance': importances.mean(axis=1),
+                                  'Std': importances.std(axis=1)})
+    importance_df.attrs['importances'] = importances
+    importance_df.attrs['baseline_score'] = baseline
+    return importance_df
+
+def calculate_feature_importance(trained_model, feature_names, save_path=None, X=None, y=None, n_repeats=5,
+                                 scoring='accuracy', max_samples=None, n_jobs=None, random_state=None):
     """
     Calculate and plot feature importance for a trained model.
 
+    Models with a `feature_importances_` attribute (tree ensembles) use it. For the other models,
+    e.g. logistic regression, the permutation importance is computed on the held-out `X` and `y`.
+
     Args:
     - trained_model (model): The trained machine learning model.
     - feature_names (list): List of feature names corresponding to the training data.
     - save_path (str, optional): Path to save the feature importance plot. Defaults to None.
+    - X (DataFrame or ndarray, optional): Held-out features for the permutation importance.
+    - y (Series or ndarray, optional): Held-out target variable for the permutation importance.
+    - n_repeats, scoring, max_samples, n_jobs, random_state: Settings of the permutation importance
+      (see `permutation_importance`).
 
     Returns:
-    - None: Displays the plot and optionally saves it, and prints/logs the top 5 important features.
+    - fig (matplotlib.figure.Figure): The feature importance plot, optionally saved to `save_path`.
+    - feature_importance_df (DataFrame): The feature importances, sorted in descending order.
+      Both are None if the importances cannot be computed. The top 5 features are printed and logged.
     """
     try:
-        if not hasattr(trained_model, 'feature_importances_'):
-            logging.warning(f"The trained model does not have a feature_importances_ attribute.")
-            print(f"The trained model does not have a feature_importances_ attribute.")
-            return None, None
-
-        # Feature importances
-        feature_importances = trained_model.feature_importances_
+        if hasattr(trained_model, 'feature_importances_'):
+            # Feature importances
+            feature_importances = trained_model.feature_importances_
 
-        # Create DataFrame of feature importances
-        feature_importance_df = pd.DataFrame({'Feature': feature_names, 'Importance': feature_importances})
+            # Create DataFrame of feature importances
+            feature_importance_df = pd.DataFrame({'Feature': feature_names, 'Importance': feature_importances})
+        elif X is not None and y is not None:
+            feature_importance_df = permutation_importance(trained_model, X, y, n_repeats=n_repeats, scoring=scoring,
+                                                           max_samples=max_samples, n_jobs=n_jobs,
+                                                           random_state=random_state)
+            feature_importance_df['Feature'] = list(feature_names)
+        else:
+            logger.warning("The trained model does not have a feature_importances_ attribute and no held-out data was given.")
+            echo("The trained model does not have a feature_importances_ attribute and no held-out data was given.")
+            return None, None
 
         # Sort feature importances in descending order
         feature_importance_df = feature_importance_df.sort_values(by='Importance', ascending=False)
 
-        # Plot feature importances
-        plt.figure(figsize=(10, 6))
-        sns.barplot(x='Importance', y='Feature', data=feature_importance_df)
-        plt.title('Feature importances')
-        plt.xlabel('Importance')
-        plt.ylabel('Feature')
-
-        # Save the plot if save_path is provided
-        if save_path:
-            plt.savefig(save_path)
-            logging.info(f"Feature importance plot saved at: {save_path}")
-            print(f"Feature importance plot saved at: {save_path}")
-        # Display the plot
-        plt.show()
+        # Plot feature importances, without pyplot so that nothing blocks or stays open on a server
+        fig = visualize_feature_importance(feature_importance_df, save_path)
 
         # Print top 5 most important features
-        print("Top 5 most important features:")
-        logging.info("Top 5 most important features:\n%s", feature_importance_df.head())
-        print(feature_importance_df.head())
+        echo("Top 5 most important features:")
+        logger.info("Top 5 most important features:\n%s", feature_importance_df.head())
+        echo("%s", feature_importance_df.head())
 
-        return plt.gcf(), feature_importance_df
+        return fig, feature_importance_df
     except AttributeError as ae:
-        logging.error(f"AttributeError occurred: {ae}")
-        print(f"AttributeError occurred: {ae}")
+        logger.error("AttributeError occurred: %s", ae)
+        echo("AttributeError occurred: %s", ae)
+        return None, None
     except Exception as e:
-        logging.error(f"An unexpected error occurred: {e}")
-        print(f"An unexpected error occurred: {e}")
\ No newline at end of file
+        logger.error("An unexpected error occurred: %s", e)
+        echo("An unexpected error occurred: %s", e)
+        return None, None
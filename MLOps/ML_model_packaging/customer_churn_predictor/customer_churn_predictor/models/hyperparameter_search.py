@@ -0,0 +1,74 @@
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (enables the halving search classes)
+from sklearn.model_selection import HalvingGridSearchCV, HalvingRandomSearchCV
+from sklearn.base import clone
+from customer_churn_predictor.models.define_models import parse_hyperparameters
+import logging
+from customer_churn_predictor.utils.logging import echo
+
+logger = logging.getLogger(__name__)
+
+def search_hyperparameters(models, param_grids, X_train, y_train, mode='grid', n_candidates='exhaust',
+                           factor=3, min_resources='exhaust', cv=5, scoring='roc_auc', n_jobs=-1, random_state=None):
+    """
+    Search the hyperparameters of each model with successive halving.
+
+    All candidate configurations are first evaluated with cross-validation on a small share of
+    the training data. Only the best 1/`factor` of them are evaluated again with `factor` times
+    more data, and so on, so hopeless configurations are dropped early. The cross-validation
+    fits of each round run in parallel on `n_jobs` cores.
+
+    Args:
+    - models (dict): A dictionary of model names and their corresponding untrained model instances.
+    - param_grids (dict): Hyperparameter values to search, keyed by estimator class name
+      (e.g. {'RandomForestClassifier': {'n_estimators': [50, 100, 200]}}). Models without
+      an entry keep their hyperparameters.
+    - X_train (DataFrame): The training features.
+    - y_train (Series): The true labels for the training data.
+    - mode (str): 'grid' to evaluate every combination, or 'random' to sample `n_candidates` of them.
+    - n_candidates (int or str): Number of sampled configurations in 'random' mode.
+    - factor (int): The proportion of candidates kept in each round (1/`factor`).
+    - min_resources (int or str): Number of training rows of the first round. 'exhaust' chooses it so
+      that the last round uses all the training data; 'smallest' starts with very few rows, which
+      may leave a fold with a single class, and so without a ROC AUC.
+    - cv (int): Number of cross-validation folds.
+    - scoring (str): The scikit-learn scoring metric to maximize.
+    - n_jobs (int): Number of parallel jobs, -1 to use all cores.
+    - random_state (int, optional): Seed for sampling the candidates and the data subsets.
+
+    Returns:
+    - best_models (dict): A dictionary of model names and untrained model instances with the best hyperparameters.
+    - search_results (dict): A dictionary of model names and their 'best_params' and 'best_score'.
+    """
+    best_models = {}
+    search_results = {}
+    try:
+        for name, model in models.items():
+            param_grid = parse_hyperparameters(param_grids.get(type(model).__name__))
+            if not param_grid:
+                best_models[name] = model
+                continue
+
+            if mode == 'grid':
+                search = HalvingGridSearchCV(model, param_grid, factor=factor, min_resources=min_resources, cv=cv,
+                                             scoring=scoring, n_jobs=n_jobs, refit=False, random_state=random_state)
+            elif mode == 'random':
+                search = HalvingRandomSearchCV(model, param_grid, n_candidates=n_candidates, factor=factor,
+                                               min_resources=min_resources, cv=cv, scoring=scoring, n_jobs=n_jobs,
+                                               refit=False, random_state=random_state)
+            else:
+                raise ValueError(f"Unknown search mode '{mode}'. Expected 'grid' or 'random'.")
+            search.fit(X_train, y_train)
+
+            # The winner is returned untrained, to be trained on the full training data
+            best_models[name] = clone(model).set_params(**search.best_params_)
+            search_results[name] = {'best_params': search.best_params_, 'best_score': search.best_score_}
+            logger.info("Hyperparameter search for %s: best %s %.4f with %s (%d candidates, %d rounds)",
+                         name, scoring, search.best_score_, search.best_params_, search.n_candidates_[0],
+                         search.n_iterations_)
+            echo("Best hyperparameters for %s: %s (%s: %.4f)", name, search.best_params_, scoring, search.best_score_)
+
+        return best_models, search_results
+    except Exception as e:
+        logger.error("An unexpected error occurred during hyperparameter search: %s", e)
+        echo("An unexpected error occurred during hyperparameter search: %s", e)
+        return None, None
\ No newline at end of file
@@ -0,0 +1,85 @@
+import numpy as np
+import logging
+import os
+from customer_churn_predictor.data.load_data import load_data_in_chunks
+from customer_churn_predictor.data.preprocess import ChurnPreprocessor
+from customer_churn_predictor.features.build_features import stream_features
+from customer_churn_predictor.models.model_serialization import load_model, load_preprocessor
+from customer_churn_predictor.utils.logging import echo
+
+logger = logging.getLogger(__name__)
+
+def load_warm_start_models(models, models_dir):
+    """
+    Replace untrained models with the models last saved in a directory, to continue training them.
+
+    Models are looked up as '<model name>_model.pkl', as saved by the pipeline and the training scripts.
+
+    Args:
+    - models (dict): A dictionary of model names and their corresponding untrained model instances.
+    - models_dir (str): The directory of the saved models.
+
+    Returns:
+    - models (dict): The models, with the saved ones in place of the untrained ones.
+    - preprocessor (ChurnPreprocessor): The preprocessor saved with the models, or None if no model was saved.
+      All the models must be trained on features from the same preprocessor, so the untrained
+      models are trained with it as well.
+    """
+    warm_models = dict(models)
+    preprocessor = None
+    for name in models:
+        model_filepath = os.path.join(models_dir, f"{name}_model.pkl")
+        if not os.path.exists(model_filepath):
+            continue
+        model = load_model(model_filepath)
+        if model is None:
+            continue
+        warm_models[name] = model
+        if preprocessor is None:
+            preprocessor = load_preprocessor(model_filepath)
+        logger.info("Model %s warm started from %s", name, model_filepath)
+    return warm_models, preprocessor
+
+def train_models_incrementally(models, data_path, preprocessor=None, chunksize=100_000, engine='c'):
+    """
+    Train models out of core, on a stream of chunks of a CSV file, with `partial_fit`.
+
+    Only one chunk of raw data and features is held in memory at a time. Models that were
+    already trained (e.g. loaded with `load_warm_start_models`) are updated with the new rows
+    instead of being refitted on the full history.
+
+    Args:
+    - models (dict): A dictionary of model names and model instances supporting `partial_fit`
+      (e.g. from `define_models(config, incremental=True)`).
+    - data_path (str): Path to the CSV file of the training rows.
+    - preprocessor (ChurnPreprocessor, optional): The fitted preprocessor of warm started models.
+      If None, a new preprocessor is fitted on the first chunk.
+    - chunksize (int): The number of rows per chunk.
+    - engine (str): The CSV parser, 'c' or 'pyarrow' (see `load_data_in_chunks`).
+
+    Returns:
+    - trained_models (dict): A dictionary of model names and their corresponding trained model instances.
+    - preprocessor (ChurnPreprocessor): The preprocessor the features were built with.
+    - n_rows (int): The number of rows the models were trained on.
+    """
+    try:
+        if preprocessor is None:
+            first_chunk = next(load_data_in_chunks(data_path, chunksize=chunksize, engine=engine))
+            preprocessor = ChurnPreprocessor().fit(first_chunk)
+            logger.info("Preprocessor fitted on the first %d rows of %s", len(first_chunk), data_path)
+        # partial_fit needs all the classes up front, as a chunk may not contain all of them
+        classes = np.arange(len(preprocessor.classes_))
+
+        n_rows = 0
+        for X, y in stream_features(data_path, preprocessor, chunksize=chunksize, engine=engine):
+            for model in models.values():
+                model.partial_fit(X, y, classes=classes)
+            n_rows += len(X)
+            logger.info("Models updated with %d rows (%d in total).", len(X), n_rows)
+
+        logger.info("Models trained incrementally on %d rows of %s", n_rows, data_path)
+        return models, preprocessor, n_rows
+    except Exception as e:
+        logger.error("An unexpected error occurred while training models incrementally: %s", e)
+        echo("An unexpected error occurred while training models incrementally: %s", e)
+        return None, None, None
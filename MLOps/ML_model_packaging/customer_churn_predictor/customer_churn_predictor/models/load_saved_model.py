@@ -1,31 +1,42 @@
 import joblib
 import pandas as pd
 import logging
+from customer_churn_predictor.models.model_artifact import artifact_to_model, is_artifact
+from customer_churn_predictor.utils.logging import echo
 
-def load_model(filepath):
+logger = logging.getLogger(__name__)
+
+def load_model(filepath, mmap_mode='r'):
     """
     Load a model from a pickle file.
 
+    The arrays of the file are memory-mapped read-only by default. For model artifacts (saved with
+    `save_model(..., artifact=True)`), all the processes serving the same file then share one
+    page-cached copy of the tree nodes.
+
     Args:
     - filepath (str): Path to the pickle file.
+    - mmap_mode (str, optional): 'r' to memory-map the arrays, None to read them into memory.
 
     Returns:
     - model: The loaded model.
     """
     try:
-        model = joblib.load(filepath)
-        logging.info(f"Model loaded successfully from {filepath}")
-        print(f"Model loaded successfully from {filepath}")
+        model = joblib.load(filepath, mmap_mode=mmap_mode)
+        if is_artifact(model):
+            model = artifact_to_model(model)
+        logger.info("Model loaded successfully from %s", filepath)
+        echo("Model loaded successfully from %s", filepath)
         return {'loaded_model': model}
     except FileNotFoundError:
-        logging.error(f"Error: The file {filepath} was not found.")
-        print(f"Error: The file {filepath} was not found.")
+        logger.error("Error: The file %s was not found.", filepath)
+        echo("Error: The file %s was not found.", filepath)
         return None
     except joblib.JobsLibException as e:
-        logging.error(f"Error loading the model from {filepath}: {e}")
-        print(f"Error loading the model from {filepath}: {e}")
+        logger.error("Error loading the model from %s: %s", filepath, e)
+        echo("Error loading the model from %s: %s", filepath, e)
         return None
     except Exception as e:
-        logging.error(f"An unexpected error occurred while loading the model: {e}")
-        print(f"An unexpected error occurred while loading the model: {e}")
+        logger.error("An unexpected error occurred while loading the model: %s", e)
+        echo("An unexpected error occurred while loading the model: %s", e)
         return None
\ No newline at end of file
@@ -0,0 +1,343 @@
+from types import SimpleNamespace
+import numpy as np
+
+# The models are compiled to plain NumPy arrays and predicted with NumPy only: loading an
+# artifact does not unpickle any scikit-learn object, so serving does not import scikit-learn.
+
+# Marker of the memory-mappable model artifacts written by `save_model(..., artifact=True)`
+ARTIFACT_FORMAT = 'customer_churn_predictor.model_artifact'
+ARTIFACT_VERSION = 1
+
+# Tree levels traversed between two checks for the rows that reached a leaf
+LEVELS_PER_PASS = 4
+
+def _is_tree_model(model):
+    """Whether a model is a fitted scikit-learn decision tree or forest of decision trees classifier."""
+    if hasattr(model, 'tree_'):
+        return True
+    estimators = getattr(model, 'estimators_', None)
+    return isinstance(estimators, list) and len(estimators) > 0 and all(hasattr(tree, 'tree_') for tree in estimators)
+
+def _is_linear_model(model):
+    """Whether a model is a fitted scikit-learn binary logistic regression."""
+    from sklearn.linear_model import LogisticRegression
+    return isinstance(model, LogisticRegression) and hasattr(model, 'coef_') and len(model.classes_) == 2
+
+def _feature_names(model):
+    """The feature names a model was fitted with, as an object array (empty if fitted without names)."""
+    return np.asarray(getattr(model, 'feature_names_in_', []), dtype=object)
+
+def _validate_features(model, X, dtype=None):
+    """
+    Features as a 2-D array in the column order of training.
+
+    Args:
+    - model: A compiled model, with `n_features_in_` and optionally `feature_names_in_`.
+    - X (DataFrame or ndarray): The features.
+    - dtype (type, optional): The dtype of the array. Defaults to the dtype of X, or float64 for non-float features.
+
+    Returns:
+    - X (ndarray): The features.
+    """
+    feature_names = getattr(model, 'feature_names_in_', None)
+    # Only reorder the columns when needed, which costs more than the prediction of a single row
+    if feature_names is not None and hasattr(X, 'columns') and not np.array_equal(X.columns.to_numpy(), feature_names):
+        X = X[feature_names]
+    X = np.asarray(X, dtype=dtype)
+    if dtype is None and X.dtype.kind != 'f':
+        X = X.astype(np.float64)
+    if X.ndim != 2 or X.shape[1] != model.n_features_in_:
+        raise ValueError(f"X has {X.shape[-1]} features, but the model expects {model.n_features_in_} features.")
+    return X
+
+def model_to_artifact(model):
+    """
+    Convert a trained model to the dictionary saved as a model artifact.
+
+    The nodes of all the trees of a decision tree or random forest are flattened into a few
+    contiguous NumPy arrays, which joblib writes uncompressed so they can be memory-mapped.
+    The children are stored both as tree-local ids (-1 for leaves, as in scikit-learn) and as
+    global ids into the flat arrays, so that all the trees can be traversed at once. Leaves
+    have feature 0. A binary logistic regression is stored as its coefficients and intercept.
+    Other models are stored as they are, and still need scikit-learn to be loaded.
+
+    Args:
+    - model: The trained model.
+
+    Returns:
+    - artifact (dict): The artifact.
+    """
+    artifact = {'format': ARTIFACT_FORMAT, 'version': ARTIFACT_VERSION}
+    if _is_linear_model(model):
+        artifact.update(kind='linear', classes=np.asarray(model.classes_), n_features_in=int(model.n_features_in_),
+                        feature_names_in=_feature_names(model), coef=model.coef_, intercept=model.intercept_)
+        return artifact
+    if not _is_tree_model(model):
+        artifact.update(kind='estimator', model=model)
+        return artifact
+
+    trees = [model] if hasattr(model, 'tree_') else model.estimators_
+    node_counts = [tree.tree_.node_count for tree in trees]
+    offsets = np.concatenate([[0], np.cumsum(node_counts)]).astype(np.int64)
+
+    children_left = np.concatenate([tree.tree_.children_left for tree in trees]).astype(np.int32)
+    children_right = np.concatenate([tree.tree_.children_right for tree in trees]).astype(np.int32)
+    is_leaf = children_left == -1
+    tree_offsets = np.repeat(offsets[:-1], node_counts)
+    node_ids = np.arange(offsets[-1])
+    # Global ids of the (left, right) children of each node, leaves looping on themselves
+    children = np.stack([np.where(is_leaf, node_ids, children_left + tree_offsets),
+                         np.where(is_leaf, node_ids, children_right + tree_offsets)], axis=1).astype(np.int32)
+
+    threshold = np.concatenate([tree.tree_.threshold for tree in trees])
+    # Largest float32 not above each threshold: the features are compared as float32, as in
+    # scikit-learn, and `x <= threshold` then holds exactly when `x <= threshold32` does
+    threshold32 = threshold.astype(np.float32)
+    rounded_up = threshold32.astype(np.float64) > threshold
+    threshold32[rounded_up] = np.nextafter(threshold32[rounded_up], np.float32(-np.inf))
+
+    values = np.concatenate([tree.tree_.value[:, 0, :] for tree in trees])
+    artifact.update(
+        kind='tree' if hasattr(model, 'tree_') else 'forest',
+        classes=np.asarray(model.classes_),
+        n_features_in=int(model.n_features_in_),
+        feature_names_in=_feature_names(model),
+        offsets=offsets,
+        children_left=children_left,
+        children_right=children_right,
+        children=children,
+        is_leaf=is_leaf,
+        feature=np.where(is_leaf, 0, np.concatenate([tree.tree_.feature for tree in trees])).astype(np.int32),
+        threshold=threshold,
+        threshold32=threshold32,
+        # Side of the split taken by missing values (the child with the most training samples
+        # if the feature had no missing values when the tree was fitted)
+        missing_go_to_left=np.concatenate([getattr(tree.tree_, 'missing_go_to_left', np.zeros(tree.tree_.node_count, dtype=np.uint8))
+                                           for tree in trees]).astype(bool),
+        # Class probabilities at each node, as predicted by the tree when the node is a leaf
+        value=values / values.sum(axis=1, keepdims=True),
+    )
+    return artifact
+
+class MappedTreeEnsemble:
+    """
+    Decision tree or random forest classifier predicting from the flat node arrays of a model artifact.
+
+    The arrays are used as they are loaded, typically memory-mapped read-only, so every process
+    serving the same artifact shares one page-cached copy of the nodes instead of holding its
+    own. Rows are routed down all the trees at once, one vectorized step per tree level for the
+    rows that have not reached a leaf yet, and the predictions are the same as those of the
+    scikit-learn model the artifact was made from.
+
+    The `estimators_` (forest) or `tree_` (single tree) attributes expose the node arrays of each
+    tree with the names of scikit-learn's `Tree`, so `ModelExplainer` can explain the model.
+    """
+
+    def __init__(self, artifact):
+        """
+        Wrap the arrays of a tree model artifact.
+
+        Args:
+        - artifact (dict): The artifact, from `model_to_artifact` or loaded from an artifact file.
+        """
+        self.kind = artifact['kind']
+        self.classes_ = np.asarray(artifact['classes'])
+        self.n_features_in_ = artifact['n_features_in']
+        if len(artifact['feature_names_in']):
+            self.feature_names_in_ = np.asarray(artifact['feature_names_in'], dtype=object)
+        self._offsets = np.asarray(artifact['offsets'])
+        self._children = artifact['children']
+        self._is_leaf = artifact['is_leaf']
+        self._feature = artifact['feature']
+        self._threshold32 = artifact['threshold32']
+        self._missing_go_to_left = artifact['missing_go_to_left']
+        self._value = artifact['value']
+
+        # Per-tree views of the flat arrays, without copies
+        trees = []
+        for start, stop in zip(self._offsets[:-1], self._offsets[1:]):
+            tree = SimpleNamespace(node_count=int(stop - start),
+                                   children_left=artifact['children_left'][start:stop],
+                                   children_right=artifact['children_right'][start:stop],
+                                   feature=self._feature[start:stop],
+                                   threshold=artifact['threshold'][start:stop],
+                                   value=self._value[start:stop].reshape(stop - start, 1, -1))
+            trees.append(SimpleNamespace(tree_=tree))
+        if self.kind == 'tree':
+            self.tree_ = trees[0].tree_
+        else:
+            self.estimators_ = trees
+            self.n_estimators = len(trees)
+
+    def _leaves(self, X):
+        """Global ids of the leaf reached by every row in every tree, as an (n_rows, n_trees) array."""
+        X = _validate_features(self, X, np.float32)
+        n_rows, n_trees = len(X), len(self._offsets) - 1
+        X_flat = X.ravel()
+        has_missing = bool(np.isnan(X_flat).any())
+        children = self._children.reshape(-1)
+        index_dtype = np.int32 if X.size < 2 ** 31 else np.int64
+
+        # One entry per (row, tree), starting at the root of the tree
+        leaves = np.empty(n_rows * n_trees, dtype=np.int32)
+        active = np.arange(n_rows * n_trees, dtype=index_dtype)
+        nodes = np.tile(self._offsets[:-1].astype(np.int32), n_rows)
+        row_starts = np.repeat(np.arange(n_rows, dtype=index_dtype) * X.shape[1], n_trees)
+        while active.size:
+            # One vectorized step per level. Leaves loop on themselves, so the entries that
+            # reached a leaf are only dropped every few levels, which costs less than every level
+            for _ in range(LEVELS_PER_PASS):
+                values = X_flat[row_starts + self._feature[nodes]]
+                go_right = values > self._threshold32[nodes]
+                if has_missing:
+                    go_right |= np.isnan(values) & ~self._missing_go_to_left[nodes]
+                nodes = children[2 * nodes + go_right]
+            done = self._is_leaf[nodes]
+            leaves[active[done]] = nodes[done]
+            running = ~done
+            active, nodes, row_starts = active[running], nodes[running], row_starts[running]
+        return leaves.reshape(n_rows, n_trees)
+
+    def apply(self, X):
+        """
+        Return the index of the leaf each row ends up in, like scikit-learn's `apply`.
+
+        Args:
+        - X (DataFrame or ndarray): The features.
+
+        Returns:
+        - leaves (ndarray): Tree-local node ids, of shape (n_rows, n_trees) for a forest and (n_rows,) for a tree.
+        """
+        leaves = self._leaves(X) - self._offsets[:-1]
+        return leaves[:, 0] if self.kind == 'tree' else leaves
+
+    def predict_proba(self, X):
+        """
+        Predict class probabilities, averaged over the trees.
+
+        Args:
+        - X (DataFrame or ndarray): The features.
+
+        Returns:
+        - probabilities (ndarray): An (n_rows, n_classes) array, in the order of `classes_`.
+        """
+        leaves = self._leaves(X)
+        probabilities = np.zeros((len(leaves), len(self.classes_)))
+        for tree_leaves in leaves.T:
+            probabilities += self._value[tree_leaves]
+        return probabilities / leaves.shape[1]
+
+    def predict(self, X):
+        """
+        Predict the class of each row.
+
+        Args:
+        - X (DataFrame or ndarray): The features.
+
+        Returns:
+        - predictions (ndarray): The predicted classes.
+        """
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+class CompiledLogisticRegression:
+    """
+    Binary logistic regression predicting from the coefficients of a model artifact.
+
+    The probabilities are computed with the same operations as scikit-learn, so they are
+    identical, without scikit-learn's input validation on every call. The `coef_`,
+    `intercept_` and `classes_` attributes have the names and shapes of scikit-learn's, so
+    `ModelExplainer` can explain the model.
+    """
+
+    def __init__(self, artifact):
+        """
+        Wrap the coefficients of a logistic regression artifact.
+
+        Args:
+        - artifact (dict): The artifact, from `model_to_artifact` or loaded from an artifact file.
+        """
+        self.classes_ = np.asarray(artifact['classes'])
+        self.n_features_in_ = artifact['n_features_in']
+        if len(artifact['feature_names_in']):
+            self.feature_names_in_ = np.asarray(artifact['feature_names_in'], dtype=object)
+        self.coef_ = np.asarray(artifact['coef'])
+        self.intercept_ = np.asarray(artifact['intercept'])
+
+    def decision_function(self, X):
+        """
+        Compute the log-odds of the positive class.
+
+        Args:
+        - X (DataFrame or ndarray): The features.
+
+        Returns:
+        - scores (ndarray): One score per row.
+        """
+        return (_validate_features(self, X) @ self.coef_.T + self.intercept_).reshape(-1)
+
+    def predict_proba(self, X):
+        """
+        Predict class probabilities.
+
+        Args:
+        - X (DataFrame or ndarray): The features.
+
+        Returns:
+        - probabilities (ndarray): An (n_rows, 2) array, in the order of `classes_`.
+        """
+        # SciPy's logistic function rather than NumPy's exp, whose vectorized implementation
+        # may round differently from the C library used by scikit-learn
+        from scipy.special import expit
+        probabilities = expit(self.decision_function(X))
+        return np.stack([1 - probabilities, probabilities], axis=1)
+
+    def predict(self, X):
+        """
+        Predict the class of each row.
+
+        Args:
+        - X (DataFrame or ndarray): The features.
+
+        Returns:
+        - predictions (ndarray): The predicted classes.
+        """
+        return self.classes_[(self.decision_function(X) > 0).astype(np.intp)]
+
+def artifact_to_model(artifact):
+    """
+    Build the model of a loaded artifact.
+
+    Args:
+    - artifact (dict): The artifact.
+
+    Returns:
+    - model: A `MappedTreeEnsemble` for tree models, a `CompiledLogisticRegression` for a logistic
+      regression, the stored model otherwise.
+    """
+    if artifact.get('version') != ARTIFACT_VERSION:
+        raise ValueError(f"Unsupported model artifact version {artifact.get('version')}.")
+    if artifact['kind'] == 'estimator':
+        return artifact['model']
+    if artifact['kind'] == 'linear':
+        return CompiledLogisticRegression(artifact)
+    return MappedTreeEnsemble(artifact)
+
+def compile_model(model):
+    """
+    Compile a trained model to a minimal inference object predicting with NumPy only.
+
+    Args:
+    - model: A trained binary LogisticRegression, DecisionTreeClassifier or RandomForestClassifier.
+
+    Returns:
+    - compiled_model: A `CompiledLogisticRegression` or `MappedTreeEnsemble` with `predict` and
+      `predict_proba` methods returning the same predictions as the model.
+    """
+    artifact = model_to_artifact(model)
+    if artifact['kind'] == 'estimator':
+        raise TypeError(f"Compiling {type(model).__name__} models is not supported.")
+    return artifact_to_model(artifact)
+
+def is_artifact(obj):
+    """Whether a loaded object is a model artifact."""
+    return isinstance(obj, dict) and obj.get('format') == ARTIFACT_FORMAT
@@ -1,41 +1,93 @@
 import joblib
 import logging
+import os
+from customer_churn_predictor.models.model_artifact import artifact_to_model, is_artifact, model_to_artifact
+from customer_churn_predictor.utils.logging import echo
 
-def save_model(model, filepath):
+logger = logging.getLogger(__name__)
+
+def preprocessor_path(model_filepath):
+    """
+    Path of the preprocessor file saved next to a model file.
+
+    Args:
+    - model_filepath (str): The path of the model file.
+
+    Returns:
+    - filepath (str): The path of the preprocessor file, e.g. 'models/LR_model_preprocessor.pkl'
+      for 'models/LR_model.pkl'.
+    """
+    root, extension = os.path.splitext(model_filepath)
+    return f"{root}_preprocessor{extension or '.pkl'}"
+
+def save_model(model, filepath, preprocessor=None, artifact=False):
     """
     Save a trained model to a specified file path using joblib.
 
     Args:
     - model: The trained model to be saved.
     - filepath (str): The path where the model will be saved.
+    - preprocessor (ChurnPreprocessor, optional): The fitted preprocessor used to build the training
+      features. It is saved next to the model, at `preprocessor_path(filepath)`.
+    - artifact (bool): Save the model as a memory-mappable artifact (see `model_artifact`): the nodes of
+      decision trees and random forests are saved as flat uncompressed arrays, which processes loading
+      the model with `mmap_mode='r'` share instead of each holding a private copy.
 
     Returns:
     - None
     """
     try:
-        joblib.dump(model, filepath)
-        logging.info(f"Model saved successfully at {filepath}")
-        print(f"Model saved successfully at {filepath}")
+        joblib.dump(model_to_artifact(model) if artifact else model, filepath)
+        logger.info("Model saved successfully at %s", filepath)
+        echo("Model saved successfully at %s", filepath)
+        if preprocessor is not None:
+            joblib.dump(preprocessor, preprocessor_path(filepath))
+            logger.info("Preprocessor saved successfully at %s", preprocessor_path(filepath))
     except Exception as e:
-        logging.error(f"An unexpected error occurred while saving the model: {e}")
-        print(f"An unexpected error occurred while saving the model: {e}")
+        logger.error("An unexpected error occurred while saving the model: %s", e)
+        echo("An unexpected error occurred while saving the model: %s", e)
 
-def load_model(filepath):
+def load_model(filepath, mmap_mode=None):
     """
     Load a trained model from a specified file path using joblib.
 
     Args:
     - filepath (str): The path to the saved model file.
+    - mmap_mode (str, optional): 'r' to memory-map the arrays of the file read-only instead of reading them.
 
     Returns:
-    - model: The loaded model.
+    - model: The loaded model. Tree models saved as artifacts are loaded as a `MappedTreeEnsemble`.
     """
     try:
-        model = joblib.load(filepath)
-        logging.info(f"Model loaded successfully from {filepath}")
-        print(f"Model loaded successfully from {filepath}")
+        model = joblib.load(filepath, mmap_mode=mmap_mode)
+        if is_artifact(model):
+            model = artifact_to_model(model)
+        logger.info("Model loaded successfully from %s", filepath)
+        echo("Model loaded successfully from %s", filepath)
         return model
     except Exception as e:
-        logging.error(f"An unexpected error occurred while loading the model: {e}")
-        print(f"An unexpected error occurred while loading the model: {e}")
+        logger.error("An unexpected error occurred while loading the model: %s", e)
+        echo("An unexpected error occurred while loading the model: %s", e)
+        return None
+
+def load_preprocessor(model_filepath):
+    """
+    Load the preprocessor saved next to a model file, if there is one.
+
+    Args:
+    - model_filepath (str): The path to the saved model file.
+
+    Returns:
+    - preprocessor (ChurnPreprocessor): The fitted preprocessor, or None if no preprocessor was saved with the model.
+    """
+    filepath = preprocessor_path(model_filepath)
+    if not os.path.exists(filepath):
+        return None
+    try:
+        preprocessor = joblib.load(filepath)
+        logger.info("Preprocessor loaded successfully from %s", filepath)
+        return preprocessor
+    except Exception as e:
+        logger.error("An unexpected error occurred while loading the preprocessor: %s", e)
+        echo("An unexpected error occurred while loading the preprocessor: %s", e)
         return None
\ No newline at end of file
@@ -1,4 +1,7 @@
 import logging
+from customer_churn_predictor.utils.logging import echo
+
+logger = logging.getLogger(__name__)
 
 def predict_models(trained_models, X_test):
     """
@@ -15,10 +18,10 @@ def predict_models(trained_models, X_test):
     try:
         for name, model in trained_models.items():
             predictions[name] = model.predict(X_test)
-        logging.info("Predictions made successfully for all models.")
+        logger.info("Predictions made successfully for all models.")
         return predictions
 
     except Exception as e:
-        logging.error(f"An unexpected error occurred while making predictions: {e}")
-        print(f"An unexpected error occurred while making predictions: {e}")
+        logger.error("An unexpected error occurred while making predictions: %s", e)
+        echo("An unexpected error occurred while making predictions: %s", e)
         return None
\ No newline at end of file
@@ -1,6 +1,9 @@
 import pandas as pd
 import requests
 import logging
+from customer_churn_predictor.utils.logging import echo
+
+logger = logging.getLogger(__name__)
 
 def predict_via_api(data, model_url):
     """
@@ -21,8 +24,8 @@ def predict_via_api(data, model_url):
         # Convert dict to a list of lists assuming it is a single record
         data = [list(data.values())]
     else:
-        logging.error("Error: Data should be a dictionary or a pandas DataFrame.")
-        print("Error: Data should be a dictionary or a pandas DataFrame.")
+        logger.error("Error: Data should be a dictionary or a pandas DataFrame.")
+        echo("Error: Data should be a dictionary or a pandas DataFrame.")
         return None
 
     # Prepare the payload for the request
@@ -37,20 +40,20 @@ def predict_via_api(data, model_url):
         # Check if the request was successful
         if response.status_code == 200:
             predictions = response.json()
-            logging.info("Predictions received successfully.")
-            print("Predictions received successfully.")
+            logger.info("Predictions received successfully.")
+            echo("Predictions received successfully.")
             return predictions
         else:
-            logging.error(f"Error: Received unexpected status code {response.status_code}.")
-            print(f"Error: Received unexpected status code {response.status_code}.")
-            print(f"Response content: {response.content.decode()}")
+            logger.error("Error: Received unexpected status code %s.", response.status_code)
+            echo("Error: Received unexpected status code %s.", response.status_code)
+            echo("Response content: %s", response.content.decode())
             return None
 
     except requests.exceptions.RequestException as e:
-        logging.error(f"Error: An exception occurred while making the API request: {e}")
-        print(f"Error: An exception occurred while making the API request: {e}")
+        logger.error("Error: An exception occurred while making the API request: %s", e)
+        echo("Error: An exception occurred while making the API request: %s", e)
         return None
     except Exception as e:
-        logging.error(f"An unexpected error occurred: {e}")
-        print(f"An unexpected error occurred: {e}")
+        logger.error("An unexpected error occurred: %s", e)
+        echo("An unexpected error occurred: %s", e)
         return None
\ No newline at end of file
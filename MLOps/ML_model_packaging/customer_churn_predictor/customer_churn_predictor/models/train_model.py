@@ -1,8 +1,38 @@
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import logging
+import os
+import time
+from customer_churn_predictor.utils.logging import echo
 
-def train_models(models, X_train, y_train):
+logger = logging.getLogger(__name__)
+
+TRAINING_BACKENDS = ('serial', 'threads', 'processes', 'loky')
+# Estimators whose fitting is parallelized over `n_jobs`. Other estimators may have an `n_jobs`
+# parameter without effect on fitting, e.g. LogisticRegression, which warns that it is deprecated.
+PARALLEL_FIT_ESTIMATORS = ('RandomForestClassifier', 'ExtraTreesClassifier', 'BaggingClassifier')
+
+def _fit_model(name, model, X_train, y_train, cpu_clock=time.process_time):
+    """
+    Fit a single model and measure its wall and CPU time.
+
+    Args:
+    - name (str): The model name.
+    - model: The untrained model instance.
+    - X_train (DataFrame): The training features.
+    - y_train (Series): The true labels for the training data.
+    - cpu_clock (callable): Clock used to measure the CPU time.
+
+    Returns:
+    - name (str): The model name.
+    - model: The trained model instance.
+    - timing (dict): The 'wall_time' and 'cpu_time' of the fit, in seconds.
+    """
+    wall_start, cpu_start = time.perf_counter(), cpu_clock()
+    model.fit(X_train, y_train)
+    timing = {'wall_time': time.perf_counter() - wall_start, 'cpu_time': cpu_clock() - cpu_start}
+    return name, model, timing
+
+def train_models(models, X_train, y_train, backend='serial', n_jobs=None, return_timings=False):
     """
     Train a set of machine learning models on the provided training data.
 
@@ -10,19 +40,60 @@ def train_models(models, X_train, y_train):
     - models (dict): A dictionary of model names and their corresponding untrained model instances.
     - X_train (DataFrame): The training features.
     - y_train (Series): The true labels for the training data.
+    - backend (str): How the models are trained: 'serial' (one after another), 'threads' (thread pool),
+      'processes' (process pool) or 'loky' (joblib's loky process pool).
+    - n_jobs (int, optional): Passed to the models whose fitting it parallelizes (`PARALLEL_FIT_ESTIMATORS`,
+      e.g. random forest). Left unchanged if None.
+    - return_timings (bool): Also return the per-model wall and CPU time.
 
     Returns:
     - trained_models (dict): A dictionary of model names and their corresponding trained model instances.
+    - timings (dict): Only if `return_timings` is True. A dictionary of model names and their
+      'wall_time' and 'cpu_time' in seconds. With the 'threads' backend the CPU time only counts
+      the thread the model was fitted in.
     """
-    trained_models = {}
     try:
-        for name, model in models.items():
-            model.fit(X_train, y_train)
+        if backend not in TRAINING_BACKENDS:
+            raise ValueError(f"Unknown training backend '{backend}'. Expected one of {TRAINING_BACKENDS}.")
+
+        if n_jobs is not None:
+            for model in models.values():
+                if type(model).__name__ in PARALLEL_FIT_ESTIMATORS:
+                    model.set_params(n_jobs=n_jobs)
+
+        max_workers = max(1, min(len(models), os.cpu_count() or 1))
+        if backend == 'serial':
+            results = [_fit_model(name, model, X_train, y_train) for name, model in models.items()]
+        elif backend == 'threads':
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(_fit_model, name, model, X_train, y_train, time.thread_time)
+                           for name, model in models.items()]
+                results = [future.result() for future in futures]
+        elif backend == 'processes':
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(_fit_model, name, model, X_train, y_train)
+                           for name, model in models.items()]
+                results = [future.result() for future in futures]
+        else:
+            from joblib import Parallel, delayed
+            results = Parallel(n_jobs=max_workers, backend='loky')(
+                delayed(_fit_model)(name, model, X_train, y_train) for name, model in models.items())
+
+        trained_models = {}
+        timings = {}
+        for name, model, timing in results:
             trained_models[name] = model
-            logging.info(f"Model {name} trained successfully.")
+            timings[name] = timing
+            logger.info("Model %s trained successfully in %.3fs wall time, %.3fs CPU time.",
+                         name, timing['wall_time'], timing['cpu_time'])
+
+        if return_timings:
+            return trained_models, timings
         return trained_models
 
     except Exception as e:
-        logging.error(f"An unexpected error occurred while training models: {e}")
-        print(f"An unexpected error occurred while training models: {e}")
+        logger.error("An unexpected error occurred while training models: %s", e)
+        echo("An unexpected error occurred while training models: %s", e)
+        if return_timings:
+            return None, None
         return None
\ No newline at end of file
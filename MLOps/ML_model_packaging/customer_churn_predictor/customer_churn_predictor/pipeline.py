@@ -1,93 +1,320 @@
-from customer_churn_predictor.data.load_data import load_data
-from customer_churn_predictor.data.preprocess import preprocess_data
-from customer_churn_predictor.visualization.visualize import visualize_categorical_distribution, visualize_numerical_distribution
-from customer_churn_predictor.features.build_features import feature_engineering
+from customer_churn_predictor.data.load_data import load_data_in_chunks
+from customer_churn_predictor.data.processed_cache import PROCESSING_MODULES, load_processed_data
+from customer_churn_predictor.visualization.report import ReportRenderer, distribution_figures
+from customer_churn_predictor.visualization.visualize import aggregate_file_distributions
 from customer_churn_predictor.models.define_models import define_models
+from customer_churn_predictor.models.hyperparameter_search import search_hyperparameters
 from customer_churn_predictor.models.train_model import train_models
 from customer_churn_predictor.models.evaluate_model import evaluate_models
-from customer_churn_predictor.data.split_data import perform_train_test_split
+from customer_churn_predictor.data.split_data import perform_train_test_split, make_cv_folds
+from customer_churn_predictor.models.cross_validation import cross_validate_models
 from customer_churn_predictor.models.feature_importance import calculate_feature_importance
 from customer_churn_predictor.models.predict_model import predict_models
 from customer_churn_predictor.models.model_serialization import save_model
-from customer_churn_predictor.config.config import Config
+from customer_churn_predictor.config.config import Config, ensure_output_directory
+from customer_churn_predictor.utils.hashing import file_hash
+from customer_churn_predictor.utils.profiling import StageProfiler
+from customer_churn_predictor.utils.step_graph import Step, StepGraph
+import numpy as np
 import os
 import logging
+from customer_churn_predictor.utils.logging import echo
 
-def run_pipeline(config, data_path):
+logger = logging.getLogger(__name__)
+
+
+# Raw data columns plotted in the distribution figures of the report
+CATEGORICAL_FEATURES = ['gender', 'SeniorCitizen', 'Partner', 'Dependents']
+NUMERICAL_FEATURES = ['tenure', 'MonthlyCharges']
+
+def _files_exist(output):
+    """`Step.check` of the steps whose output lists the files they wrote."""
+    def check(outputs):
+        return all(os.path.exists(path) for path in outputs[output])
+    return check
+
+def build_pipeline_graph(config, search=False, cross_validate=False, renderer=None):
     """
-    Runs the full data pipeline including loading data, preprocessing, feature engineering,
-    model training, evaluation, and saving the results.
+    Build the step graph of the pipeline.
 
-    Parameters:
+    Each stage of the pipeline is a step of the graph, with the data it needs as inputs. The
+    figures, cross-validation, evaluation, feature importance, predictions and saved models
+    only depend on the trained models and the data, so they run concurrently. The initial value
+    values of the graph are the 'data_path' of the raw CSV file and its 'data_hash' (`file_hash`).
+
+    Args:
     - config (Config): Configuration object with pipeline settings.
-    - data_path (str): Path to the dataset file.
+    - search (bool): Search the hyperparameters of the models before training them.
+    - cross_validate (bool): Cross-validate the models on the training set.
+    - renderer (ReportRenderer, optional): Renderer of the distribution figures. No figures are rendered if None.
 
     Returns:
-    None
+    - graph (StepGraph): The step graph.
     """
-    try:
-        logging.info("Pipeline started.")
+    random_state = config.get('random_state')
+    figures_dir = config.get('figures_dir')
+    models_dir = config.get('models_dir')
+    graph = StepGraph()
+
+    def processed(data_path, data_hash):
+        # Memoized by the processed data cache, which memory-maps the feature matrix
+        return load_processed_data(data_path, config, data_hash=data_hash)
 
-        # Load data
-        data = load_data(data_path)
+    graph.add(Step('processed', processed, inputs=('data_path', 'data_hash'), outputs=('processed_data', 'preprocessor'),
+                   modules=PROCESSING_MODULES, cache=False))
 
-        # Visualize distributions (categorical and numerical)
-        categorical_features = ['gender', 'SeniorCitizen', 'Partner', 'Dependents']
-        numerical_features = ['tenure', 'MonthlyCharges']
+    def split(processed_data):
+        return perform_train_test_split(processed_data, test_size=config.get('test_size'), random_state=random_state)
 
-        for feature in categorical_features:
-            save_path = os.path.join(config.get('figures_dir'), f'{feature}_categorical_distribution.png')
-            visualize_categorical_distribution(data, feature, save_path)
+    graph.add(Step('split', split, inputs=('processed_data',), outputs=('X_train', 'X_test', 'y_train', 'y_test'),
+                   params={'test_size': config.get('test_size'), 'random_state': random_state},
+                   modules=('customer_churn_predictor.data.split_data',), cache=False))
 
-        for feature in numerical_features:
-            save_path = os.path.join(config.get('figures_dir'), f'{feature}_numerical_distribution.png')
-            visualize_numerical_distribution(data, feature, save_path)
+    # Define models with the hyperparameters from the configuration, optionally replaced with
+    # the winners of a parallel successive halving search
+    search_config = config.get('search') or {}
 
-        # Preprocess data
-        preprocessed_data = preprocess_data(data)
+    def define(X_train=None, y_train=None):
+        models = define_models(config)
+        if search:
+            models, _ = search_hyperparameters(models, search_config.get('param_grids') or {}, X_train, y_train,
+                                               mode=search_config.get('mode', 'grid'),
+                                               n_candidates=search_config.get('n_candidates', 'exhaust'),
+                                               factor=search_config.get('factor', 3),
+                                               min_resources=search_config.get('min_resources', 'exhaust'),
+                                               cv=search_config.get('cv', 5),
+                                               scoring=search_config.get('scoring', 'roc_auc'),
+                                               n_jobs=search_config.get('n_jobs', -1),
+                                               random_state=random_state)
+        return models
 
-        # Feature engineering
-        processed_data = feature_engineering(preprocessed_data)
+    graph.add(Step('define_models', define, inputs=('X_train', 'y_train') if search else (), outputs=('models',),
+                   params={'models': config.get('models'), 'search': search_config if search else None,
+                           'random_state': random_state},
+                   modules=('customer_churn_predictor.models.define_models',
+                            'customer_churn_predictor.models.hyperparameter_search')))
 
+    if cross_validate:
+        cv_config = config.get('cross_validation') or {}
 
-        # Split data into training and testing sets
-        X_train, X_test, y_train, y_test = perform_train_test_split(processed_data, test_size=config.get('test_size'),
-                                                      random_state=config.get('random_state'))
+        def cross_validation(models, X_train, y_train, data_path):
+            groups = None
+            if cv_config.get('group_column'):
+                # Only the group column of the raw data is parsed
+                group_column = cv_config['group_column']
+                groups = np.concatenate([chunk[group_column].to_numpy() for chunk in
+                                         load_data_in_chunks(data_path, usecols=[group_column])])[X_train.index]
+            folds = make_cv_folds(y_train, n_splits=cv_config.get('n_splits', 5),
+                                  stratified=cv_config.get('stratified', True), groups=groups,
+                                  random_state=random_state)
+            return cross_validate_models(models, X_train, y_train, folds, n_jobs=cv_config.get('n_jobs', -1))
 
-        # Define models
-        models = define_models()
+        graph.add(Step('cross_validation', cross_validation, inputs=('models', 'X_train', 'y_train', 'data_path'),
+                       outputs=('cv_results',), params={'cross_validation': cv_config, 'random_state': random_state},
+                       modules=('customer_churn_predictor.models.cross_validation',
+                                'customer_churn_predictor.data.split_data')))
 
-        # Train model
-        trained_models = train_models(models, X_train, y_train)
+    # Train models, concurrently if a parallel backend is configured. The backend does not
+    # change the trained models, so it is not a parameter of the step.
+    training_config = config.get('training') or {}
 
-        # Evaluate model
-        evaluate_models(trained_models, X_test, y_test)
+    def train(models, X_train, y_train):
+        return train_models(models, X_train, y_train, backend=training_config.get('backend', 'serial'),
+                            n_jobs=training_config.get('n_jobs'))
 
-        # Calculate and plot feature importance for each model
+    graph.add(Step('train', train, inputs=('models', 'X_train', 'y_train'), outputs=('trained_models',),
+                   modules=('customer_churn_predictor.models.train_model',)))
+
+    # Evaluate the models, with bootstrap confidence intervals of the metrics if configured
+    evaluation_config = config.get('evaluation') or {}
+
+    def evaluate(trained_models, X_test, y_test):
+        return evaluate_models(trained_models, X_test, y_test,
+                               bootstrap_resamples=evaluation_config.get('bootstrap_resamples', 0),
+                               confidence=evaluation_config.get('confidence', 0.95),
+                               bootstrap_n_jobs=evaluation_config.get('n_jobs'), random_state=random_state)
+
+    graph.add(Step('evaluate', evaluate, inputs=('trained_models', 'X_test', 'y_test'), outputs=('evaluation',),
+                   params={'evaluation': evaluation_config, 'random_state': random_state},
+                   modules=('customer_churn_predictor.models.evaluate_model',)))
+
+    # Calculate and plot feature importance for each model, with the permutation importance for models without built-in importances
+    importance_config = config.get('feature_importance') or {}
+
+    def feature_importance(trained_models, X_test, y_test):
+        importances, figures = {}, []
         for model_name, trained_model in trained_models.items():
-            print(f"\nFeature importance for model: {model_name}")
-            save_path = os.path.join(config.get('figures_dir'), f'{model_name}_feature_importance.png') # Define the path to save the plot
-            calculate_feature_importance(trained_model, X_train.columns, save_path)
+            echo("\nFeature importance for model: %s", model_name)
+            save_path = os.path.join(ensure_output_directory(config, 'figures_dir'),
+                                     f'{model_name}_feature_importance.png')  # Define the path to save the plot
+            _, importances[model_name] = calculate_feature_importance(
+                trained_model, X_test.columns, save_path, X=X_test, y=y_test,
+                n_repeats=importance_config.get('n_repeats', 5), scoring=importance_config.get('scoring', 'accuracy'),
+                max_samples=importance_config.get('max_samples'), n_jobs=importance_config.get('n_jobs'),
+                random_state=random_state)
+            if importances[model_name] is not None:
+                figures.append(save_path)
+        return importances, figures
+
+    graph.add(Step('feature_importance', feature_importance, inputs=('trained_models', 'X_test', 'y_test'),
+                   outputs=('feature_importances', 'feature_importance_figures'),
+                   params={'feature_importance': importance_config, 'random_state': random_state,
+                           'figures_dir': figures_dir},
+                   modules=('customer_churn_predictor.models.feature_importance',
+                            'customer_churn_predictor.visualization.visualize'),
+                   check=_files_exist('feature_importance_figures')))
 
-        # Make predictions using the trained models
+    # Make predictions using the trained models
+    def predict(trained_models, X_test):
         predictions = predict_models(trained_models, X_test)
         if predictions:
             for model_name, prediction in predictions.items():
-                print(f"\nPredictions for model {model_name}: {prediction[:5]}")  # Print first 5 predictions as an example
+                echo("\nPredictions for model %s: %s", model_name, prediction[:5])  # Print first 5 predictions as an example
+        return predictions
 
-        # Save models
-        models_dir = config.get('models_dir')  # Directory to save models
-        os.makedirs(models_dir, exist_ok=True)
+    graph.add(Step('predict', predict, inputs=('trained_models', 'X_test'), outputs=('predictions',),
+                   modules=('customer_churn_predictor.models.predict_model',)))
 
+    # Save models
+    serialization_config = config.get('serialization') or {}
+
+    def save(trained_models, preprocessor):
+        ensure_output_directory(config, 'models_dir')  # Directory to save models
+        model_paths = []
         for model_name, trained_model in trained_models.items():
             # Construct a file path for each model
-            model_filepath = os.path.join(config.get('models_dir'), f"{model_name}_model.pkl")
-            save_model(trained_model, model_filepath)
+            model_filepath = os.path.join(models_dir, f"{model_name}_model.pkl")
+            save_model(trained_model, model_filepath, preprocessor=preprocessor,
+                       artifact=serialization_config.get('artifact', False))
+            if not os.path.exists(model_filepath):
+                raise RuntimeError(f"Failed to save the {model_name} model to {model_filepath}")
+            model_paths.append(model_filepath)
+        return model_paths
+
+    graph.add(Step('save_models', save, inputs=('trained_models', 'preprocessor'), outputs=('model_paths',),
+                   params={'serialization': serialization_config, 'models_dir': models_dir},
+                   modules=('customer_churn_predictor.models.model_serialization',
+                            'customer_churn_predictor.models.model_artifact'),
+                   check=_files_exist('model_paths')))
 
+    # Visualize distributions (categorical and numerical). Only the plotted columns are streamed
+    # from the CSV and aggregated. 'deferred' figures wait for the saved models, the others are
+    # rendered while the models are trained.
+    if renderer is not None and renderer.mode != 'skip':
+        def figures(data_path, model_paths=None):
+            figure_list = distribution_figures(ensure_output_directory(config, 'figures_dir'),
+                                               CATEGORICAL_FEATURES, NUMERICAL_FEATURES)
+            renderer.submit(None, figure_list, aggregates=aggregate_file_distributions(
+                data_path, CATEGORICAL_FEATURES, NUMERICAL_FEATURES))
+            return renderer.wait()
 
-        logging.info("Pipeline completed successfully.")
-        print("Pipeline completed successfully.")
+        graph.add(Step('figures', figures,
+                       inputs=('data_path', 'model_paths') if renderer.mode == 'deferred' else ('data_path',),
+                       outputs=('figures',),
+                       params={'categorical': CATEGORICAL_FEATURES, 'numerical': NUMERICAL_FEATURES,
+                               'figures_dir': figures_dir},
+                       modules=('customer_churn_predictor.visualization.report',
+                                'customer_churn_predictor.visualization.visualize'),
+                       check=_files_exist('figures')))
+    return graph
 
+def run_pipeline(config, data_path, search=None, cross_validate=None, reports=None, force=(), use_cache=None):
+    """
+    Runs the full data pipeline including loading data, preprocessing, feature engineering,
+    model training, evaluation, and saving the results.
+
+    The stages are the steps of `build_pipeline_graph`, and independent steps run concurrently.
+    The outputs of the steps are memoized in 'pipeline_cache_dir', so a rerun only runs the steps
+    whose data, code or configuration changed, and a run that failed resumes from the failed step.
+
+    Parameters:
+    - config (Config): Configuration object with pipeline settings.
+    - data_path (str): Path to the dataset file.
+    - search (bool, optional): Search the hyperparameters of the models before training them.
+      Defaults to the 'enabled' setting of the 'search' configuration block.
+    - cross_validate (bool, optional): Cross-validate the models on the training set before training them.
+      Defaults to the 'enabled' setting of the 'cross_validation' configuration block.
+    - reports (str, optional): How the distribution figures are rendered: 'parallel' (in a process pool,
+      concurrently with training), 'deferred' (after the models are saved), 'serial', 'skip' or 'auto'
+      (parallel when there are several CPUs, deferred otherwise).
+      Defaults to the 'mode' setting of the 'reports' configuration block.
+    - force (iterable): Names of steps to run again even if their outputs are memoized, e.g. ['train'].
+    - use_cache (bool, optional): Memoize the outputs of the steps and reuse them.
+      Defaults to the 'cache' setting of the 'pipeline' configuration block.
+
+    Returns:
+    - results (dict): The outputs of the steps that ran or were needed, by name, including those of the
+      final steps: 'evaluation', 'feature_importances', 'predictions', 'model_paths', and 'cv_results' and
+      'figures' when enabled.
+
+    Raises:
+    - StepFailed: If a step failed, with the name of the step. The completed steps are memoized.
+    """
+    report_config = config.get('reports') or {}
+    pipeline_config = config.get('pipeline') or {}
+    renderer = ReportRenderer(mode=reports or report_config.get('mode', 'auto'),
+                              max_workers=report_config.get('n_jobs'))
+    if search is None:
+        search = (config.get('search') or {}).get('enabled', False)
+    if cross_validate is None:
+        cross_validate = (config.get('cross_validation') or {}).get('enabled', False)
+    if use_cache is None:
+        use_cache = pipeline_config.get('cache', True)
+    profiling_config = config.get('profiling') or {}
+    profiler = StageProfiler.from_config(config) if profiling_config.get('enabled', True) else None
+    status, failed_step = 'failed', None
+    try:
+        logger.info("Pipeline started.")
+        graph = build_pipeline_graph(config, search=search, cross_validate=cross_validate, renderer=renderer)
+        # The data file is hashed once, for the keys of the steps and of the processed data cache
+        data_hash = file_hash(data_path)
+        results = graph.run({'data_path': data_path, 'data_hash': data_hash}, fingerprints={'data_path': data_hash},
+                            cache_dir=ensure_output_directory(config, 'pipeline_cache_dir') if use_cache else None,
+                            force=force, max_workers=pipeline_config.get('max_workers'), profiler=profiler)
+        status = 'succeeded'
+        cached = [name for name, run in graph.last_run.items() if run['status'] == 'cached']
+        if cached:
+            logger.info("Reused the memoized outputs of steps: %s", ', '.join(cached))
+
+        logger.info("Pipeline completed successfully.")
+        echo("Pipeline completed successfully.")
+        return results
+
+    except Exception as e:
+        failed_step = getattr(e, 'step', None)
+        logger.error("An error occurred during pipeline execution: %s", e)
+        echo("An error occurred during pipeline execution: %s", e)
+        raise
+    finally:
+        renderer.close()
+        if profiler is not None:
+            write_run_report(config, profiler, data_path=data_path, status=status, failed_step=failed_step)
+
+def write_run_report(config, profiler, **metadata):
+    """
+    Write the run report of a profiled pipeline run, and observe it in Prometheus if configured.
+
+    Errors are logged rather than raised, so that reporting never fails a run.
+
+    Args:
+    - config (Config): Configuration object, with the 'profiling' block and 'reports_dir'.
+    - profiler (StageProfiler): The profiler of the run.
+    - metadata: Values describing the run, e.g. its data path and status.
+
+    Returns:
+    - report (dict): The run report, or None if it could not be written.
+    """
+    profiling_config = config.get('profiling') or {}
+    try:
+        report_path = os.path.join(ensure_output_directory(config, 'reports_dir'),
+                                   profiling_config.get('report_file', 'run_report.json'))
+        report = profiler.write_report(report_path, **metadata)
+        if profiling_config.get('prometheus', False):
+            profiler.observe_prometheus()
+        return report
     except Exception as e:
-        logging.error(f"An error occurred during pipeline execution: {e}")
-        print(f"An error occurred during pipeline execution: {e}")
\ No newline at end of file
+        logger.error("An unexpected error occurred while writing the run report: %s", e)
+        echo("An unexpected error occurred while writing the run report: %s", e)
+        return None
+    finally:
+        profiler.close()
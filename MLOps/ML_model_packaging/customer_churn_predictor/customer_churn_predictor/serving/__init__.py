@@ -0,0 +1,7 @@
+from customer_churn_predictor.utils.lazy_imports import lazy_attributes
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'MicroBatcher': ('.micro_batching', 'MicroBatcher'),
+    'WarmModelState': ('.warm_state', 'WarmModelState'),
+})
+__all__ = ['MicroBatcher', 'WarmModelState']
@@ -0,0 +1,143 @@
+from concurrent.futures import Future
+import logging
+import queue
+import threading
+import time
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent scoring requests into micro-batches.
+
+    Callers submit a DataFrame of records and get a Future back. A background thread waits
+    for the first pending request, then keeps collecting requests until the batch holds
+    `max_batch_size` rows or `max_wait` seconds have passed. The whole batch is scored with a
+    single call of `predict_fn`, and each caller receives the rows that belong to its request.
+    If scoring a batch fails, its requests are scored one by one, so an invalid request only
+    fails its own caller. Requests whose Future was cancelled before scoring started are dropped.
+    The Future can be awaited from asyncio with `asyncio.wrap_future` or waited on with `result()`.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=256, max_wait=0.005):
+        """
+        Initialize the batcher and start its worker thread.
+
+        Args:
+        - predict_fn (callable): Scores a DataFrame of records and returns one result row per record,
+          as a NumPy array or a DataFrame.
+        - max_batch_size (int): Maximum number of rows scored in one call. A single request larger
+          than this is scored on its own.
+        - max_wait (float): Maximum time in seconds to wait for more requests once one is pending.
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, records):
+        """
+        Submit records for scoring.
+
+        Args:
+        - records (DataFrame): The records to score.
+
+        Returns:
+        - future (Future): Resolves to the scores of the submitted records.
+        """
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed.")
+        future = Future()
+        self._queue.put((records, future))
+        return future
+
+    def close(self):
+        """Stop the worker thread after the pending requests have been scored."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._worker.join()
+
+    def _collect(self, first):
+        """Collect pending requests into a batch, starting with the first one, and mark them running."""
+        batch = []
+        n_rows = 0
+        if first[1].set_running_or_notify_cancel():
+            batch.append(first)
+            n_rows += len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while n_rows < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                # Put the stop signal back so the worker exits after this batch
+                self._queue.put(None)
+                break
+            # A cancelled request, e.g. after its client disconnected, is not scored
+            if item[1].set_running_or_notify_cancel():
+                batch.append(item)
+                n_rows += len(item[0])
+        return batch
+
+    def _score(self, batch):
+        """Score a batch with one call of predict_fn and hand each caller the rows of its request."""
+        records = pd.concat([records for records, _ in batch], ignore_index=True)
+        scores = self.predict_fn(records)
+        logger.debug("Scored a micro-batch of %d requests, %d rows", len(batch), len(records))
+        start = 0
+        for request_records, future in batch:
+            stop = start + len(request_records)
+            future.set_result(scores[start:stop])
+            start = stop
+
+    def _fail(self, batch, error):
+        """Resolve the futures of a batch that are still pending with an error."""
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    def _run(self):
+        """Worker loop: build batches, score them and resolve the callers' futures."""
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            try:
+                self._process(self._collect(first))
+            except Exception:
+                # Keep the worker alive, a dead worker would leave every later request waiting
+                logger.exception("An unexpected error occurred in the micro-batcher")
+
+    def _process(self, batch):
+        """Score a batch, falling back to scoring its requests one by one if it fails."""
+        if not batch:
+            return
+        try:
+            self._score(batch)
+            return
+        except Exception as e:
+            if len(batch) == 1:
+                logger.error("An error occurred while scoring a micro-batch: %s", e)
+                self._fail(batch, e)
+                return
+            logger.warning("Micro-batch of %d requests failed (%s), scoring them one by one", len(batch), e)
+        # Score each request that is still pending on its own, so that only the requests that fail get the error
+        for item in batch:
+            if item[1].done():
+                continue
+            try:
+                self._score([item])
+            except Exception as e:
+                logger.error("An error occurred while scoring a request: %s", e)
+                self._fail([item], e)
@@ -0,0 +1,199 @@
+import logging
+import threading
+
+import pandas as pd
+
+from customer_churn_predictor.data.processed_cache import load_processed_data
+from customer_churn_predictor.data.split_data import perform_train_test_split
+from customer_churn_predictor.features.build_features import feature_engineering
+from customer_churn_predictor.models import load_saved_model
+from customer_churn_predictor.models.explain_model import ModelExplainer
+from customer_churn_predictor.models.model_serialization import load_preprocessor
+from customer_churn_predictor.utils.hashing import file_fingerprint, file_hash
+
+logger = logging.getLogger(__name__)
+
+
+class WarmModelState:
+    """
+    Process-wide cache of a loaded model, its fitted preprocessor and the processed test feature matrix.
+
+    The model is unpickled and the CSV is parsed, preprocessed and split only once. Every
+    later access is served from memory and only re-checks the files' mtime and size, so
+    the state is rebuilt when the model file or the CSV actually changes. With `use_hash`
+    enabled, a changed mtime/size is confirmed against the SHA-256 of the content, so a
+    file that is only touched or copied over with identical content does not trigger a reload.
+    """
+
+    def __init__(self, model_path, data_path, config, use_hash=False):
+        """
+        Initialize the warm state.
+
+        Args:
+        - model_path (str): Path to the saved model file.
+        - data_path (str): Path to the CSV data file.
+        - config (Config): Configuration object providing 'test_size' and 'random_state'.
+        - use_hash (bool): Confirm file changes with a content hash before reloading.
+        """
+        self.model_path = model_path
+        self.data_path = data_path
+        self.config = config
+        self.use_hash = use_hash
+        self.models = None
+        self.X_test = None
+        self.preprocessor = None
+        # Preprocessor saved with the model, if any
+        self._model_preprocessor = None
+        # Explainer of each model, built on the first explanation request
+        self._explainers = {}
+        # (fingerprint, digest) of each file at the time it was loaded
+        self._model_version = None
+        self._data_version = None
+        self._lock = threading.Lock()
+
+    def _check(self, file_path, version):
+        """
+        Check whether a file changed since it was last loaded.
+
+        Args:
+        - file_path (str): Path to the file.
+        - version (tuple or None): The (fingerprint, digest) recorded at the last load.
+
+        Returns:
+        - changed (bool): True if the file must be reloaded.
+        - version (tuple): The current (fingerprint, digest) of the file.
+        """
+        fingerprint = file_fingerprint(file_path)
+        if version is not None and version[0] == fingerprint:
+            return False, version
+        # Only hash when the cheap fingerprint changed
+        digest = file_hash(file_path) if self.use_hash else None
+        if version is not None and digest is not None and version[1] == digest:
+            return False, (fingerprint, digest)
+        return True, (fingerprint, digest)
+
+    def _load_model(self):
+        """
+        Load the model and the preprocessor saved with it from disk.
+
+        Returns:
+        - models (dict): The loaded model(s).
+        - model_preprocessor (ChurnPreprocessor): The preprocessor saved with the model, or None.
+        """
+        models = load_saved_model.load_model(self.model_path)
+        if models is None:
+            raise RuntimeError(f"Failed to load the model from {self.model_path}")
+        model_preprocessor = load_preprocessor(self.model_path)
+        logger.info("Warm state: model loaded from %s", self.model_path)
+        return models, model_preprocessor
+
+    def _load_features(self, model_preprocessor, data_hash=None):
+        """
+        Preprocess and split the data, keeping only the test features resident.
+
+        Args:
+        - model_preprocessor (ChurnPreprocessor): The preprocessor saved with the model, or None.
+        - data_hash (str, optional): The hash of the data file, if it was computed by `_check`.
+
+        Returns:
+        - X_test (DataFrame): The processed test features.
+        - preprocessor (ChurnPreprocessor): The preprocessor the features were built with.
+        """
+        # Use the preprocessor saved with the model. For models saved without one, it is fitted
+        # on the data, which is assumed to be the data the model was trained on. The processed
+        # data is read from the cache of previous runs when possible.
+        processed_data, preprocessor = load_processed_data(self.data_path, self.config, model_preprocessor, data_hash)
+        _, X_test, _, _ = perform_train_test_split(processed_data,
+                                                   test_size=self.config.get('test_size'),
+                                                   random_state=self.config.get('random_state'))
+        logger.info("Warm state: feature matrix with %d rows built from %s", len(X_test), self.data_path)
+        return X_test, preprocessor
+
+    def refresh(self):
+        """
+        Reload the model and/or the feature matrix if their source files changed.
+
+        The model, its preprocessor and the features are replaced together once every load
+        succeeded, so a failed load keeps serving the previous state and is retried on the next refresh.
+
+        Returns:
+        - reloaded (bool): True if anything was (re)loaded.
+        """
+        with self._lock:
+            model_changed, model_version = self._check(self.model_path, self._model_version)
+            data_changed, data_version = self._check(self.data_path, self._data_version)
+            models, model_preprocessor = self._load_model() if model_changed else (self.models, self._model_preprocessor)
+            # A new model may come with a new preprocessor, so the features are rebuilt as well
+            if data_changed or model_changed:
+                self.X_test, self.preprocessor = self._load_features(model_preprocessor, data_version[1])
+            if model_changed:
+                self.models, self._model_preprocessor, self._explainers = models, model_preprocessor, {}
+            # Versions are only recorded after a successful load, so a failed load is retried
+            self._model_version, self._data_version = model_version, data_version
+            return model_changed or data_changed
+
+    def get(self):
+        """
+        Return the warm model and feature matrix, reloading them first if they are stale.
+
+        Returns:
+        - models (dict): The loaded model(s), as returned by `load_saved_model.load_model`.
+        - X_test (DataFrame): The processed test features.
+        """
+        self.refresh()
+        return self.models, self.X_test
+
+    def _features(self, records):
+        """Preprocess and feature engineer raw Telco records with the warm preprocessor."""
+        features = feature_engineering(self.preprocessor.transform(records.reset_index(drop=True)))
+        if features is None:
+            raise ValueError("Feature engineering failed for the submitted records.")
+        return features
+
+    def score(self, records):
+        """
+        Compute churn probabilities for raw Telco records with every warm model.
+
+        Args:
+        - records (DataFrame): Raw records with the Telco schema (the 'Churn' column is not needed).
+
+        Returns:
+        - probabilities (DataFrame): One row per record and one column of churn probabilities per model.
+        """
+        models, _ = self.get()
+        features = self._features(records)
+
+        probabilities = {}
+        for name, model in models.items():
+            # Keep the columns in the order the model was trained with
+            columns = getattr(model, 'feature_names_in_', features.columns)
+            probabilities[name] = model.predict_proba(features[columns])[:, 1]
+        return pd.DataFrame(probabilities)
+
+    def explain(self, records):
+        """
+        Explain the churn predictions of every warm model for raw Telco records.
+
+        The explainers precompute their arrays once per loaded model, and a batch of records is
+        explained with a few vectorized operations per model (see `ModelExplainer`).
+
+        Args:
+        - records (DataFrame): Raw records with the Telco schema (the 'Churn' column is not needed).
+
+        Returns:
+        - explanations (DataFrame): One row per record. The (model name, feature) columns hold the
+          contribution of each feature and the (model name, 'base_value') column the base value,
+          in log-odds for logistic regression and in churn probability for the tree models.
+        """
+        models, _ = self.get()
+        features = self._features(records)
+
+        explanations = {}
+        for name, model in models.items():
+            explainer = self._explainers.get(name)
+            if explainer is None or explainer.model is not model:
+                explainer = self._explainers[name] = ModelExplainer(model)
+            contributions = explainer.explain(features)
+            contributions['base_value'] = explainer.base_value
+            explanations[name] = contributions
+        return pd.concat(explanations, axis=1)
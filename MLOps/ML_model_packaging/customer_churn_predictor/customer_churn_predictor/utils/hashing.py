@@ -0,0 +1,34 @@
+import hashlib
+import os
+
+
+def file_fingerprint(file_path):
+    """
+    Cheap fingerprint of a file based on its modification time and size.
+
+    Args:
+    - file_path (str): Path to the file.
+
+    Returns:
+    - fingerprint (tuple): (mtime in nanoseconds, size in bytes).
+    """
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_hash(file_path, block_size=1 << 20):
+    """
+    Compute the SHA-256 hash of a file, reading it in blocks.
+
+    Args:
+    - file_path (str): Path to the file.
+    - block_size (int): Number of bytes read per block.
+
+    Returns:
+    - digest (str): The hexadecimal SHA-256 digest of the file content.
+    """
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
@@ -0,0 +1,35 @@
+import importlib
+import sys
+
+
+def lazy_attributes(package_name, attributes):
+    """
+    Build the module-level `__getattr__` and `__dir__` (PEP 562) of a package exposing lazily imported attributes.
+
+    An attribute is only imported the first time it is accessed, then cached in the package, so
+    importing the package does not import the heavy dependencies (scikit-learn, matplotlib,
+    seaborn) of the modules that are not used.
+
+    Args:
+    - package_name (str): The `__name__` of the package.
+    - attributes (dict): Attribute names mapped to (module, attribute) pairs. The module is
+      relative to the package, and an attribute of None exposes the module itself.
+
+    Returns:
+    - __getattr__ (function): The `__getattr__` of the package.
+    - __dir__ (function): The `__dir__` of the package, listing the lazy attributes.
+    """
+    def __getattr__(name):
+        if name not in attributes:
+            raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+        module_name, attribute = attributes[name]
+        value = importlib.import_module(module_name, package_name)
+        if attribute is not None:
+            value = getattr(value, attribute)
+        setattr(sys.modules[package_name], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package_name])) | set(attributes))
+
+    return __getattr__, __dir__
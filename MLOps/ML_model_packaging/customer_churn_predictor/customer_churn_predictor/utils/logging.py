@@ -1,27 +1,210 @@
+import atexit
+import copy
+from datetime import datetime, timezone
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
 
-def setup_logging(proj_root, log_file_name='logging_file.log'):
+# Log file configured by `setup_logging` in this process, and the listener writing to it
+_configured_log_file = None
+_listener = None
+_queue_handler = None
+
+# Whether `echo` prints to stdout. Library code reports progress with `echo` rather than `print`,
+# so that services and batch jobs can silence it with CHURN_ECHO=0 or `set_echo(False)`.
+_echo_enabled = os.environ.get('CHURN_ECHO', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+# Attributes of every `logging.LogRecord`, the others are the `extra` of the logging call
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+def set_echo(enabled):
+    """
+    Enable or disable the console output of `echo` in this process.
+
+    Args:
+    - enabled (bool): Whether `echo` prints to stdout.
+    """
+    global _echo_enabled
+    _echo_enabled = bool(enabled)
+
+def echo(message, *args):
+    """
+    Print a progress message to stdout, unless the console output is disabled.
+
+    The message is %-formatted with the arguments only when it is printed, as with logging calls.
+
+    Args:
+    - message (str): The message, or a %-format string of the arguments.
+    - args: The arguments of the format string.
+    """
+    if _echo_enabled:
+        print(message % args if args else message)
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format log records as JSON lines, e.g. for a log collector.
+
+    Each line holds the UTC time, level, logger name and message of the record, the attributes
+    passed as `extra` to the logging call and the traceback of the exception, if any.
+    """
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class RateLimitFilter(logging.Filter):
+    """
+    Rate limit the records of each logger, e.g. of a logging call in a per-request hot path.
+
+    Each logger has a token bucket refilled at `rate` records per second, up to `burst` records.
+    Records are dropped while the bucket of their logger is empty, except warnings and errors,
+    which always pass. The next record of the logger that passes carries the number of dropped
+    records as its `suppressed` attribute.
+    """
+
+    def __init__(self, rate, burst=None):
+        """
+        Args:
+        - rate (float): Records per second let through for each logger.
+        - burst (int, optional): Records let through at once. Defaults to one second of records.
+        """
+        super().__init__()
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1))
+        # Logger name -> [tokens, time of the last refill, dropped records]
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(record.name)
+            if bucket is None:
+                bucket = self._buckets[record.name] = [self.burst, now, 0]
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] < 1 and record.levelno < logging.WARNING:
+                bucket[2] += 1
+                return False
+            bucket[0] = max(bucket[0] - 1, 0)
+            if bucket[2]:
+                record.suppressed, bucket[2] = bucket[2], 0
+        return True
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler leaving most of the formatting of the records to the listener thread."""
+
+    def prepare(self, record):
+        # The message is rendered before the record is queued, as its arguments may be mutated
+        # after the logging call. The records stay in this process, so unlike the base class, the
+        # rest of the formatting, e.g. the timestamp, the JSON entry and the exception, is left
+        # to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+def stop_logging():
+    """
+    Stop the background thread writing the log records, after it wrote the queued records.
+
+    It is registered to run at exit, and may be called earlier, e.g. before forking workers.
+    """
+    global _configured_log_file, _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        logging.getLogger().removeHandler(_queue_handler)
+    _configured_log_file = _listener = _queue_handler = None
+
+def _write_directly_after_fork():
+    """
+    Write the records of a forked child process to the log file directly.
+
+    The child does not inherit the listener thread, and worker processes exit without running the
+    `atexit` handlers, so records queued by a worker could never be written.
+    """
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    root_logger = logging.getLogger()
+    root_logger.removeHandler(_queue_handler)
+    for handler in _listener.handlers:
+        for log_filter in _queue_handler.filters:
+            handler.addFilter(log_filter)
+        root_logger.addHandler(handler)
+    _listener = _queue_handler = None
+
+def setup_logging(proj_root, log_file_name='logging_file.log', level=logging.INFO, json_format=False,
+                  rate_limit=None, echo_enabled=None):
     """
     Sets up logging for the project.
 
+    The loggers only put their records on a queue, and a background thread formats them and writes
+    them to the log file, so logging calls do not wait for the disk. Messages are %-formatted
+    by the background thread as well, and not at all for the records below the level.
+
+    Logging is only set up once per process and log file: later calls, e.g. from every
+    `CustomerChurnPredictor` built by a worker, return without touching the filesystem.
+
     Args:
     - proj_root (str): The root directory of the project.
     - log_file_name (str): The name of the log file.
+    - level (int or str): The level of the root logger, e.g. logging.INFO or 'WARNING'.
+    - json_format (bool): Write JSON lines (see `JsonFormatter`) instead of text lines.
+    - rate_limit (dict, optional): Keyword arguments of a `RateLimitFilter` applied to the records
+      of each logger, e.g. {'rate': 10, 'burst': 50}.
+    - echo_enabled (bool, optional): Enable or disable the console output of `echo`. Unchanged if None.
     """
+    global _configured_log_file, _listener, _queue_handler
+    if echo_enabled is not None:
+        set_echo(echo_enabled)
     try:
-        # Ensure the logs directory exists within the project root
+        # Define the log file path
         log_dir = os.path.join(proj_root, 'logs')
+        log_file_path = os.path.join(log_dir, log_file_name)
+        if log_file_path == _configured_log_file:
+            return
+        stop_logging()
+
+        # Ensure the logs directory exists within the project root
         os.makedirs(log_dir, exist_ok=True)
 
-        # Define the log file path
-        log_file_path = os.path.join(log_dir, log_file_name)
+        # The file is written by the listener thread, the loggers only enqueue their records
+        file_handler = logging.FileHandler(log_file_path, delay=True)
+        file_handler.setFormatter(JsonFormatter() if json_format else
+                                  logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s'))
+        _queue_handler = _DeferredQueueHandler(queue.SimpleQueue())
+        if rate_limit:
+            _queue_handler.addFilter(RateLimitFilter(**rate_limit))
+        _listener = logging.handlers.QueueListener(_queue_handler.queue, file_handler, respect_handler_level=True)
+        _listener.start()
 
-        # Configure logging settings
-        logging.basicConfig(filename=log_file_path, level=logging.INFO,
-                            format='%(asctime)s - %(levelname)s - %(message)s')
-        logging.info(f"Logging setup complete. Logs will be saved to {log_file_path}")
-        print(f"Logging is set up. Logs will be saved to {log_file_path}")
+        root_logger = logging.getLogger()
+        root_logger.addHandler(_queue_handler)
+        root_logger.setLevel(level.upper() if isinstance(level, str) else level)
+        _configured_log_file = log_file_path
+        logging.getLogger(__name__).info("Logging setup complete. Logs will be saved to %s", log_file_path)
+        echo("Logging is set up. Logs will be saved to %s", log_file_path)
     except Exception as e:
-        print(f"Error setting up logging: {e}")
-        logging.error(f"Failed to set up logging: {e}")
\ No newline at end of file
+        echo("Error setting up logging: %s", e)
+        logging.getLogger(__name__).error("Failed to set up logging: %s", e)
+
+atexit.register(stop_logging)
+os.register_at_fork(after_in_child=_write_directly_after_fork)
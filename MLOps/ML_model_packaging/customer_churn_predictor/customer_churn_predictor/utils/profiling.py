@@ -0,0 +1,288 @@
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import json
+import logging
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+PROFILERS = ('cprofile', 'pyinstrument')
+
+# Prometheus histograms of the stages, created once per process as metrics can only be registered once
+_prometheus_metrics = None
+
+def _rss_mb():
+    """Current resident memory of the process in MB, or None where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def _peak_rss_mb():
+    """Peak resident memory of the process so far in MB, or None without the resource module."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+def count_rows(*values):
+    """
+    Number of rows of the largest table among values, e.g. the inputs of a stage.
+
+    Args:
+    - values: DataFrames, Series, arrays or other values. Values without a shape are ignored.
+
+    Returns:
+    - rows (int): The largest number of rows, or None if no value has a shape.
+    """
+    rows = [value.shape[0] for value in values if getattr(value, 'shape', None)]
+    return max(rows) if rows else None
+
+class StageProfiler:
+    """
+    Profiler of the stages of a pipeline run.
+
+    Each stage records its wall time, the CPU time of the process and of the thread running it,
+    the resident memory of the process before and after it and its peak so far, and the rows
+    per second when the number of rows is known. These are a few clock and /proc reads per
+    stage, so profiling is always on. Optionally, the peak of the Python allocations of each stage
+    is traced with tracemalloc, and stages are profiled with cProfile or pyinstrument, which
+    both slow the stages down.
+
+    Stages may run concurrently, e.g. in a `StepGraph`. The process CPU time and memory of a
+    stage then include those of the stages running at the same time, and the tracemalloc peak
+    is the peak of all of them; the thread CPU time and the profiles only cover the stage itself.
+    """
+
+    def __init__(self, trace_memory=False, profile=(), profiler='cprofile', profiles_dir=None):
+        """
+        Initialize the profiler.
+
+        Args:
+        - trace_memory (bool): Trace the peak Python allocations of each stage with tracemalloc.
+        - profile (bool or iterable): Stages to profile, or True to profile all of them.
+        - profiler (str): 'cprofile' or 'pyinstrument', which must be installed.
+        - profiles_dir (str, optional): Directory of the profiles, required to profile stages.
+        """
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler '{profiler}'. Expected one of {PROFILERS}.")
+        self.trace_memory = trace_memory
+        self.profile = profile if profile is True else set(profile or ())
+        self.profiler = profiler
+        self.profiles_dir = profiles_dir
+        self.stages = []
+        self._lock = threading.Lock()
+        self._started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self._start_cpu = time.process_time()
+        # Only stop tracing in `close` if the profiler started it
+        self._started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a profiler from the 'profiling' configuration block.
+
+        Args:
+        - config (Config): Configuration object, with the 'profiling' block and 'reports_dir'.
+
+        Returns:
+        - profiler (StageProfiler): The profiler.
+        """
+        profiling_config = config.get('profiling') or {}
+        return cls(trace_memory=profiling_config.get('trace_memory', False),
+                   profile=profiling_config.get('profile') or (),
+                   profiler=profiling_config.get('profiler', 'cprofile'),
+                   profiles_dir=os.path.join(config.get('reports_dir'), 'profiles'))
+
+    def _should_profile(self, name):
+        return self.profile is True or name in self.profile
+
+    def _start_profile(self, name):
+        """Start profiling the current thread, returning the profiler, or None if the stage is not profiled."""
+        if not self._should_profile(name):
+            return None
+        if self.profiles_dir is None:
+            raise ValueError("profiles_dir is required to profile stages.")
+        if self.profiler == 'pyinstrument':
+            from pyinstrument import Profiler
+            profiler = Profiler(async_mode='disabled')
+            profiler.start()
+        else:
+            import cProfile
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError as e:
+                # From Python 3.12 a cProfile profiler covers every thread, so concurrent stages
+                # cannot each have their own
+                logger.warning("Stage %s is not profiled: %s", name, e)
+                return None
+        return profiler
+
+    def _save_profile(self, name, profiler):
+        """Stop a profiler and save its profile, returning its path."""
+        os.makedirs(self.profiles_dir, exist_ok=True)
+        if self.profiler == 'pyinstrument':
+            profiler.stop()
+            path = os.path.join(self.profiles_dir, f'{name}.html')
+            with open(path, 'w') as file:
+                file.write(profiler.output_html())
+        else:
+            profiler.disable()
+            # Read with `python -m pstats <path>` or snakeviz
+            path = os.path.join(self.profiles_dir, f'{name}.prof')
+            profiler.dump_stats(path)
+        return path
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        Profile a stage.
+
+        Args:
+        - name (str): Name of the stage.
+        - rows (int, optional): Number of rows processed by the stage, for its throughput.
+
+        Yields:
+        - record (dict): The record of the stage, which the stage may complete, e.g. with its 'rows'.
+        """
+        record = {'stage': name, 'status': 'ran', 'rows': rows}
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        rss_start = _rss_mb()
+        profiler = self._start_profile(name)
+        start, start_cpu, start_thread_cpu = time.perf_counter(), time.process_time(), time.thread_time()
+        try:
+            yield record
+        except BaseException:
+            record['status'] = 'failed'
+            raise
+        finally:
+            record['wall_seconds'] = time.perf_counter() - start
+            record['cpu_seconds'] = time.process_time() - start_cpu
+            record['thread_cpu_seconds'] = time.thread_time() - start_thread_cpu
+            if profiler is not None:
+                record['profile'] = self._save_profile(name, profiler)
+            record['rss_start_mb'], record['rss_end_mb'] = rss_start, _rss_mb()
+            record['peak_rss_mb'] = _peak_rss_mb()
+            if self.trace_memory:
+                record['tracemalloc_peak_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            if record['rows'] and record['wall_seconds'] > 0:
+                record['rows_per_second'] = record['rows'] / record['wall_seconds']
+            with self._lock:
+                self.stages.append(record)
+
+    def skip(self, name, status='cached'):
+        """
+        Record a stage that did not run, e.g. because its outputs were memoized.
+
+        Args:
+        - name (str): Name of the stage.
+        - status (str): Why the stage did not run, e.g. 'cached' or 'skipped'.
+        """
+        with self._lock:
+            self.stages.append({'stage': name, 'status': status, 'wall_seconds': 0.0})
+
+    def report(self, **metadata):
+        """
+        Build the run report.
+
+        Args:
+        - metadata: Values describing the run, e.g. its data path and status.
+
+        Returns:
+        - report (dict): The run metadata, totals and the records of the stages in the order they ended.
+        """
+        return {
+            'started_at': self._started_at.isoformat(timespec='seconds'),
+            'wall_seconds': time.perf_counter() - self._start,
+            'cpu_seconds': time.process_time() - self._start_cpu,
+            'peak_rss_mb': _peak_rss_mb(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            **metadata,
+            'stages': list(self.stages),
+        }
+
+    def write_report(self, path, **metadata):
+        """
+        Write the run report as JSON.
+
+        Args:
+        - path (str): Path of the report file.
+        - metadata: Values describing the run, see `report`.
+
+        Returns:
+        - report (dict): The written report.
+        """
+        report = self.report(**metadata)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(f"{path}.tmp", 'w') as file:
+            json.dump(report, file, indent=2, default=str)
+        os.replace(f"{path}.tmp", path)
+        logger.info("Run report written to %s", path)
+        return report
+
+    def close(self):
+        """Stop tracing the Python allocations, if the profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def log_to_mlflow(self, prefix='stage'):
+        """
+        Log the wall time, CPU time, peak memory and throughput of the stages as metrics of the active MLflow run.
+
+        Args:
+        - prefix (str): Prefix of the metric names, e.g. 'stage_train_wall_seconds'.
+        """
+        import mlflow
+        metrics = {}
+        for record in self.stages:
+            for key in ('wall_seconds', 'cpu_seconds', 'peak_rss_mb', 'tracemalloc_peak_mb', 'rows_per_second'):
+                if record.get(key) is not None:
+                    metrics[f"{prefix}_{record['stage']}_{key}"] = record[key]
+        mlflow.log_metrics(metrics)
+
+    def observe_prometheus(self, registry=None):
+        """
+        Observe the wall and CPU time of the stages that ran in Prometheus histograms labelled by stage.
+
+        The histograms are `churn_pipeline_stage_wall_seconds` and `churn_pipeline_stage_cpu_seconds`,
+        served by the `/metrics` endpoint of the process, e.g. a Flask app running the pipeline.
+
+        Args:
+        - registry (CollectorRegistry, optional): Registry of the histograms, the default registry if None.
+          The histograms are created on the first call, later calls reuse them.
+        """
+        global _prometheus_metrics
+        from prometheus_client import REGISTRY, Histogram
+        if _prometheus_metrics is None:
+            buckets = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600)
+            registry = registry or REGISTRY
+            _prometheus_metrics = (
+                Histogram('churn_pipeline_stage_wall_seconds', 'Wall time of the pipeline stages', ['stage'],
+                          buckets=buckets, registry=registry),
+                Histogram('churn_pipeline_stage_cpu_seconds', 'CPU time of the process during the pipeline stages',
+                          ['stage'], buckets=buckets, registry=registry))
+        wall, cpu = _prometheus_metrics
+        for record in self.stages:
+            if record['status'] == 'ran':
+                wall.labels(record['stage']).observe(record['wall_seconds'])
+                cpu.labels(record['stage']).observe(record['cpu_seconds'])
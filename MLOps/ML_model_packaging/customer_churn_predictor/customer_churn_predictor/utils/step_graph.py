@@ -0,0 +1,340 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+import importlib
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+
+import joblib
+
+from customer_churn_predictor.utils.hashing import file_hash
+from customer_churn_predictor.utils.profiling import count_rows
+
+logger = logging.getLogger(__name__)
+
+# File of a cache directory recording the state of the last run, e.g. the step that failed
+RUN_STATE_FILE = 'run_state.json'
+
+class StepFailed(RuntimeError):
+    """A step of a `StepGraph` raised an exception or returned no outputs."""
+
+    def __init__(self, step, error):
+        super().__init__(f"Step '{step}' failed: {error}")
+        self.step = step
+        self.error = error
+
+@dataclass(frozen=True)
+class Step:
+    """
+    A node of a `StepGraph`: a function of named inputs producing named outputs.
+
+    The function is called with the inputs as keyword arguments. It returns the value of its
+    output if it has one, or a tuple of the values of its outputs. Returning None for a step
+    with outputs is a failure, as the functions of the package return None when they fail.
+
+    Attributes:
+    - name (str): Name of the step.
+    - func (callable): The function of the step.
+    - inputs (tuple): Names of the inputs, outputs of other steps or initial values of the run.
+    - outputs (tuple): Names of the outputs.
+    - params (dict): Settings the outputs depend on besides the inputs, e.g. a configuration block.
+    - modules (tuple): Modules whose code the outputs depend on, besides the module of `func`.
+    - cache (bool): Memoize the outputs to disk. Disabled for cheap steps with large outputs.
+    - check (callable, optional): Called with the dict of memoized outputs, returns whether they can
+      be reused, e.g. whether the files they list still exist.
+    """
+    name: str
+    func: object
+    inputs: tuple = ()
+    outputs: tuple = ()
+    params: dict = field(default_factory=dict)
+    modules: tuple = ()
+    cache: bool = True
+    check: object = None
+
+def code_version(step):
+    """
+    Version of the code of a step, as a hash of the source of its function and modules.
+
+    Args:
+    - step (Step): The step.
+
+    Returns:
+    - version (str): The hexadecimal digest.
+    """
+    module_name = getattr(inspect.getmodule(step.func), '__name__', None)
+    modules = sorted(set(step.modules) | ({module_name} if module_name else set()))
+    try:
+        source = inspect.getsource(step.func)
+    except (OSError, TypeError):
+        source = repr(step.func)
+    return joblib.hash([source] + [file_hash(importlib.import_module(module).__file__) for module in modules])
+
+class StepGraph:
+    """
+    Runner of a graph of steps, with concurrency, memoization and resumption.
+
+    Steps whose inputs are available run concurrently in a thread pool; the steps of the
+    package release the GIL in NumPy and scikit-learn, or run their own worker processes.
+    The outputs of each step are memoized in the cache directory, keyed by a fingerprint of
+    its inputs, parameters and code. The fingerprint of an output of another step is derived
+    from the fingerprint of that step, so the keys of every step are computed before the run,
+    without hashing any intermediate data. A step only runs if its outputs are needed and not
+    memoized, so a rerun skips the unchanged steps, and the memoized outputs of a step are only
+    loaded if a step that runs needs them. After a failure, the steps that completed are
+    memoized, so running again resumes from the step that failed.
+    """
+
+    def __init__(self, steps=()):
+        """
+        Initialize the graph.
+
+        Args:
+        - steps (iterable): The steps, see `add`.
+        """
+        self.steps = {}
+        self._producers = {}
+        # Status and wall time of each step in the last run
+        self.last_run = {}
+        for step in steps:
+            self.add(step)
+
+    def add(self, step):
+        """
+        Add a step to the graph.
+
+        Args:
+        - step (Step): The step. Its name and outputs must be unique in the graph.
+        """
+        if step.name in self.steps:
+            raise ValueError(f"Duplicate step '{step.name}'.")
+        for output in step.outputs:
+            if output in self._producers:
+                raise ValueError(f"Output '{output}' of step '{step.name}' is already produced by step "
+                                 f"'{self._producers[output]}'.")
+            self._producers[output] = step.name
+        self.steps[step.name] = step
+
+    def _order(self, initial):
+        """The names of the steps in a topological order, checking that every input is available."""
+        order, state = [], {}
+
+        def visit(name, path):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Cycle in the step graph: {' -> '.join(path + [name])}")
+            state[name] = 'visiting'
+            for item in self.steps[name].inputs:
+                if item in self._producers:
+                    visit(self._producers[item], path + [name])
+                elif item not in initial:
+                    raise ValueError(f"Input '{item}' of step '{name}' is neither an initial value nor an output.")
+            state[name] = 'done'
+            order.append(name)
+
+        for name in self.steps:
+            visit(name, [])
+        return order
+
+    def keys(self, initial, fingerprints=None):
+        """
+        Compute the memoization keys of the steps.
+
+        Args:
+        - initial (dict): The initial values of the run.
+        - fingerprints (dict, optional): Fingerprints of initial values, e.g. the hash of the file of a
+          path. Other initial values are hashed.
+
+        Returns:
+        - keys (dict): The hexadecimal key of each step.
+        """
+        fingerprints = fingerprints or {}
+        keys = {}
+        for name in self._order(initial):
+            step = self.steps[name]
+            inputs = [(item, keys[self._producers[item]]) if item in self._producers else
+                      (item, fingerprints[item] if item in fingerprints else joblib.hash(initial[item]))
+                      for item in step.inputs]
+            keys[name] = joblib.hash([name, step.outputs, code_version(step), step.params, inputs])
+        return keys
+
+    def _memo_path(self, cache_dir, name, key):
+        return os.path.join(cache_dir, name, f"{key}.joblib")
+
+    def _read_memo(self, cache_dir, step, key):
+        """The memoized outputs of a step, or None if they do not exist or cannot be reused."""
+        path = self._memo_path(cache_dir, step.name, key)
+        if not os.path.exists(path):
+            return None
+        try:
+            outputs = joblib.load(path)
+        except Exception as e:
+            logger.warning("Could not read the memoized outputs of step %s: %s", step.name, e)
+            return None
+        if step.check is not None and not step.check(outputs):
+            logger.info("The memoized outputs of step %s are stale.", step.name)
+            return None
+        return outputs
+
+    def _write_memo(self, cache_dir, step, key, outputs):
+        """Memoize the outputs of a step, replacing its previous entries."""
+        path = self._memo_path(cache_dir, step.name, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            joblib.dump(outputs, f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+            for entry in os.listdir(os.path.dirname(path)):
+                if entry != os.path.basename(path):
+                    os.remove(os.path.join(os.path.dirname(path), entry))
+        except Exception as e:
+            logger.warning("Could not memoize the outputs of step %s: %s", step.name, e)
+
+    @staticmethod
+    def read_run_state(cache_dir):
+        """
+        Read the state of the last run memoized in a cache directory.
+
+        Args:
+        - cache_dir (str): The cache directory.
+
+        Returns:
+        - state (dict): 'failed_step' and 'error' of the last run (None if it succeeded), or an empty dict.
+        """
+        try:
+            with open(os.path.join(cache_dir, RUN_STATE_FILE)) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_run_state(self, cache_dir, failure):
+        state = {'failed_step': failure.step if failure else None, 'error': str(failure.error) if failure else None,
+                 'steps': self.last_run}
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(os.path.join(cache_dir, RUN_STATE_FILE), 'w') as file:
+                json.dump(state, file, indent=2, default=str)
+        except OSError as e:
+            logger.warning("Could not write the run state: %s", e)
+
+    def run(self, initial, fingerprints=None, targets=None, cache_dir=None, force=(), max_workers=None,
+            profiler=None):
+        """
+        Run the steps needed for the targets.
+
+        Args:
+        - initial (dict): The initial values, by input name.
+        - fingerprints (dict, optional): Fingerprints of initial values, see `keys`.
+        - targets (list, optional): Names of the steps to bring up to date. Defaults to the memoized steps
+          and the steps whose outputs no other step uses. The other steps only run when a step needs them.
+        - cache_dir (str, optional): Directory of the memoized outputs. Nothing is memoized if None.
+        - force (iterable): Names of steps to run even if their outputs are memoized.
+        - max_workers (int, optional): Number of steps running at once. Defaults to ThreadPoolExecutor's default.
+        - profiler (StageProfiler, optional): Profiler of the steps, with the rows of their largest input,
+          or of their largest output for the steps reading files.
+
+        Returns:
+        - values (dict): The initial values and the outputs of the steps that ran or were loaded,
+          including all the outputs of the targets.
+
+        Raises:
+        - StepFailed: If a step failed. The steps running at the same time are completed and memoized first.
+        """
+        order = self._order(initial)
+        unknown = [name for name in list(force) + list(targets or []) if name not in self.steps]
+        if unknown:
+            raise ValueError(f"Unknown steps: {unknown}")
+        if targets is None:
+            used = {item for step in self.steps.values() for item in step.inputs}
+            targets = [name for name in order if self.steps[name].cache or not used.intersection(self.steps[name].outputs)]
+        keys = self.keys(initial, fingerprints) if cache_dir else {}
+        if cache_dir:
+            previous = self.read_run_state(cache_dir)
+            if previous.get('failed_step') in self.steps:
+                logger.info("Resuming the run that failed in step %s.", previous['failed_step'])
+
+        # Walk back from the targets: a needed step runs unless its outputs are memoized, and
+        # the producers of the inputs of a step that runs are needed in turn
+        memos, to_run, needed = {}, set(), set(targets)
+        for name in reversed(order):
+            if name not in needed:
+                continue
+            step = self.steps[name]
+            if cache_dir and step.cache and name not in force:
+                memos[name] = self._read_memo(cache_dir, step, keys[name])
+                if memos[name] is not None:
+                    continue
+            to_run.add(name)
+            needed.update(self._producers[item] for item in step.inputs if item in self._producers)
+
+        values = dict(initial)
+        for name, outputs in memos.items():
+            if outputs is not None:
+                values.update(outputs)
+        self.last_run = {name: {'status': 'cached', 'seconds': 0.0} for name, outputs in memos.items()
+                         if outputs is not None}
+        if profiler is not None:
+            for name in self.last_run:
+                profiler.skip(name, 'cached')
+        lock = threading.Lock()
+
+        def run_step(step):
+            start = time.perf_counter()
+            inputs = {item: values[item] for item in step.inputs}
+            try:
+                with profiler.stage(step.name, rows=count_rows(*inputs.values())) if profiler else nullcontext({}) as record:
+                    result = step.func(**inputs)
+                    if step.outputs and result is None:
+                        raise RuntimeError("the step returned no outputs")
+                    outputs = dict(zip(step.outputs, result if len(step.outputs) > 1 else (result,)))
+                    # The rows a step produced, e.g. from a file path
+                    if record.get('rows') is None:
+                        record['rows'] = count_rows(*outputs.values())
+            except Exception:
+                self.last_run[step.name] = {'status': 'failed', 'seconds': time.perf_counter() - start}
+                raise
+            if cache_dir and step.cache:
+                self._write_memo(cache_dir, step, keys[step.name], outputs)
+            with lock:
+                values.update(outputs)
+                self.last_run[step.name] = {'status': 'ran', 'seconds': time.perf_counter() - start}
+            logger.info("Step %s completed in %.2f s.", step.name, self.last_run[step.name]['seconds'])
+
+        pending = [name for name in order if name in to_run]
+        running, failure = {}, None
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending or running:
+                if failure is None:
+                    # A step is ready once none of the producers of its inputs is left to run
+                    waiting = set(pending) | set(running.values())
+                    for name in [name for name in pending
+                                 if not waiting.intersection(self._producers.get(item) for item in self.steps[name].inputs)]:
+                        pending.remove(name)
+                        running[executor.submit(run_step, self.steps[name])] = name
+                else:
+                    for name in pending:
+                        self.last_run[name] = {'status': 'skipped', 'seconds': 0.0}
+                        if profiler is not None:
+                            profiler.skip(name, 'skipped')
+                    pending = []
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        logger.error("Step %s failed: %s", name, error)
+                        if failure is None:
+                            failure = StepFailed(name, error)
+                            failure.__cause__ = error
+
+        if cache_dir:
+            self._write_run_state(cache_dir, failure)
+        if failure is not None:
+            raise failure
+        return values
@@ -1 +1,8 @@
-from .visualize import visualize_categorical_distribution, visualize_numerical_distribution
\ No newline at end of file
+from customer_churn_predictor.utils.lazy_imports import lazy_attributes
+
+# Imported on first access (PEP 562), as they import matplotlib and seaborn
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'visualize_categorical_distribution': ('.visualize', 'visualize_categorical_distribution'),
+    'visualize_numerical_distribution': ('.visualize', 'visualize_numerical_distribution'),
+})
+__all__ = ['visualize_categorical_distribution', 'visualize_numerical_distribution']
@@ -0,0 +1,125 @@
+from joblib.externals.loky import ProcessPoolExecutor
+import logging
+import os
+from customer_churn_predictor.visualization.visualize import (aggregate_distributions, visualize_categorical_distribution,
+                                                               visualize_numerical_distribution)
+
+logger = logging.getLogger(__name__)
+
+# 'parallel' renders the figures in a process pool while the pipeline goes on, 'deferred' renders
+# them in the pipeline process once the models are saved, 'serial' renders them right away
+# and 'skip' does not render them. 'auto' is 'parallel' when there is more than one CPU to
+# render on, and 'deferred' otherwise, as a worker would then only compete with training.
+REPORT_MODES = ('auto', 'parallel', 'deferred', 'serial', 'skip')
+
+def distribution_figures(figures_dir, categorical_features, numerical_features):
+    """
+    List the distribution figures of a report.
+
+    Args:
+    - figures_dir (str): Directory of the figures.
+    - categorical_features (list): Features plotted with `visualize_categorical_distribution`.
+    - numerical_features (list): Features plotted with `visualize_numerical_distribution`.
+
+    Returns:
+    - figures (list): (kind, feature, save_path) triples, kind being 'categorical' or 'numerical'.
+    """
+    return ([('categorical', feature, os.path.join(figures_dir, f'{feature}_categorical_distribution.png'))
+             for feature in categorical_features] +
+            [('numerical', feature, os.path.join(figures_dir, f'{feature}_numerical_distribution.png'))
+             for feature in numerical_features])
+
+def _render_figure(kind, aggregate, feature, save_path):
+    """Render and save one distribution figure from its aggregate, then release it."""
+    if kind == 'categorical':
+        fig = visualize_categorical_distribution(None, feature, save_path, counts=aggregate)
+    else:
+        fig = visualize_numerical_distribution(None, feature, save_path, histogram=aggregate)
+    fig.clear()
+    return save_path
+
+class ReportRenderer:
+    """
+    Report rendering stage of the pipeline.
+
+    Figures are submitted with the raw data they plot, and rendered according to the mode
+    (see `REPORT_MODES`). The distributions are aggregated when the figures are submitted, so
+    rendering only draws the aggregates. In 'parallel' mode each figure is a task of a process
+    pool, which only receives its aggregate, so rendering overlaps with preprocessing and
+    training instead of delaying them. `wait` returns once all the submitted figures are saved.
+    """
+
+    def __init__(self, mode='auto', max_workers=None):
+        """
+        Initialize the renderer. The process pool is only started when figures are submitted.
+
+        Args:
+        - mode (str): One of `REPORT_MODES`. 'auto' is resolved to 'parallel' or 'deferred'.
+        - max_workers (int, optional): Number of worker processes in 'parallel' mode. Defaults to the number of CPUs.
+        """
+        if mode not in REPORT_MODES:
+            raise ValueError(f"Unknown report mode '{mode}'. Expected one of {REPORT_MODES}.")
+        if mode == 'auto':
+            mode = 'parallel' if (os.cpu_count() or 1) > 1 else 'deferred'
+        self.mode = mode
+        self.max_workers = max_workers
+        self._executor = None
+        self._futures = []
+        self._deferred = []
+        self._rendered = []
+
+    def submit(self, data, figures, aggregates=None):
+        """
+        Submit figures for rendering.
+
+        Args:
+        - data (DataFrame): The raw data, with the plotted features and the 'Churn' column.
+          Not used if `aggregates` is given.
+        - figures (list): (kind, feature, save_path) triples, e.g. from `distribution_figures`.
+        - aggregates (dict, optional): Precomputed aggregates of the features, e.g. from
+          `aggregate_file_distributions` for a file too large to load.
+        """
+        if self.mode == 'skip':
+            logger.info("Report rendering skipped for %d figures.", len(figures))
+            return
+        if aggregates is None:
+            aggregates = aggregate_distributions(data, [feature for kind, feature, _ in figures if kind == 'categorical'],
+                                                 [feature for kind, feature, _ in figures if kind == 'numerical'])
+        tasks = [(kind, aggregates[feature], feature, save_path) for kind, feature, save_path in figures]
+        if self.mode == 'serial':
+            self._rendered.extend(_render_figure(*task) for task in tasks)
+        elif self.mode == 'deferred':
+            self._deferred.extend(tasks)
+        else:
+            if self._executor is None:
+                # joblib's loky workers are fresh interpreters rather than forks of a process that may
+                # be running threads (e.g. a web server), and unlike multiprocessing's spawn they do
+                # not re-run the caller's main module
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            self._futures.extend(self._executor.submit(_render_figure, *task) for task in tasks)
+
+    def wait(self):
+        """
+        Render the deferred figures and wait for the figures rendered in the process pool.
+
+        Returns:
+        - saved_paths (list): The paths of the figures rendered since the last call.
+        """
+        saved_paths = self._rendered + [_render_figure(*task) for task in self._deferred]
+        self._rendered, self._deferred = [], []
+        try:
+            saved_paths.extend(future.result() for future in self._futures)
+        finally:
+            self.close()
+        if saved_paths:
+            logger.info("Report rendered: %d figures.", len(saved_paths))
+        return saved_paths
+
+    def close(self):
+        """Shut the process pool down, cancelling the figures that are not rendered yet."""
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
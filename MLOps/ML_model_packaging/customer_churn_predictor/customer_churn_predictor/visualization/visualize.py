@@ -1,64 +1,251 @@
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+import numpy as np
+import pandas as pd
 import seaborn as sns
 import logging
+from customer_churn_predictor.data.load_data import load_data_in_chunks
+from customer_churn_predictor.utils.logging import echo
 
-def visualize_categorical_distribution(data, feature, save_path=None):
+logger = logging.getLogger(__name__)
+
+# The figures are built with the object-oriented API instead of pyplot: they are not registered
+# with a GUI backend or pyplot's global figure manager, so rendering never blocks on a display
+# and a figure is freed as soon as it is no longer referenced. Saving uses the Agg renderer.
+#
+# The distributions are aggregated with NumPy/pandas before plotting: categorical features as
+# counts per category and churn label, numerical features as a histogram per churn label. Only
+# the aggregates are drawn, so the plotting cost does not depend on the number of rows, and the
+# aggregates of chunks of a large file can be summed without loading it in memory.
+
+# Numerical histograms are counted on bins this many times finer than the plotted bins. The
+# plotted bars sum the fine bins, and the density curve is a Gaussian KDE of the fine bins.
+KDE_OVERSAMPLING = 8
+
+def categorical_counts(data, feature, target='Churn'):
+    """
+    Count the rows of each category of a feature by churn label.
+
+    Args:
+    - data (pd.DataFrame): Input DataFrame containing the feature and the target.
+    - feature (str): Name of the categorical feature.
+    - target (str): Name of the target column.
+
+    Returns:
+    - counts (pd.DataFrame): One row per category and one column per churn label.
+    """
+    return data.groupby([feature, target], observed=True).size().unstack(fill_value=0)
+
+def numerical_histogram(data, feature, bins=30, value_range=None, target='Churn'):
+    """
+    Histogram of a numerical feature by churn label, on `bins * KDE_OVERSAMPLING` fine bins.
+
+    All the labels are counted in a single `np.bincount` over (label, bin) codes. Missing values
+    and values outside `value_range` are left out.
+
+    Args:
+    - data (pd.DataFrame): Input DataFrame containing the feature and the target.
+    - feature (str): Name of the numerical feature.
+    - bins (int): Number of plotted bins.
+    - value_range (tuple, optional): (min, max) of the bins. Defaults to the range of the feature in `data`,
+      and must be given to sum the histograms of several chunks.
+    - target (str): Name of the target column.
+
+    Returns:
+    - histogram (pd.DataFrame): One row per fine bin, indexed by the bin intervals, and one column per churn label.
+    """
+    values = data[feature].to_numpy(dtype=np.float64, na_value=np.nan)
+    if value_range is None:
+        value_range = (np.nanmin(values), np.nanmax(values))
+    low, high = value_range
+    if high <= low:
+        high = low + 1.0
+    n_bins = bins * KDE_OVERSAMPLING
+
+    labels, label_names = pd.factorize(data[target], sort=True)
+    keep = (labels >= 0) & (values >= low) & (values <= high)
+    bin_codes = np.minimum(((values[keep] - low) * (n_bins / (high - low))).astype(np.int64), n_bins - 1)
+    counts = np.bincount(labels[keep] * n_bins + bin_codes, minlength=len(label_names) * n_bins)
+
+    index = pd.IntervalIndex.from_breaks(np.linspace(low, high, n_bins + 1))
+    return pd.DataFrame(counts.reshape(len(label_names), n_bins).T, index=index, columns=label_names)
+
+def aggregate_distributions(data, categorical_features, numerical_features, bins=30, ranges=None, target='Churn'):
+    """
+    Aggregate the distributions of several features, from a DataFrame or from chunks of one.
+
+    Args:
+    - data (pd.DataFrame or iterable): Input DataFrame, or an iterable of DataFrame chunks
+      (e.g. from `load_data_in_chunks`).
+    - categorical_features (list): Features aggregated with `categorical_counts`.
+    - numerical_features (list): Features aggregated with `numerical_histogram`.
+    - bins (int): Number of plotted bins of the numerical features.
+    - ranges (dict, optional): (min, max) of each numerical feature. Required for chunks.
+    - target (str): Name of the target column.
+
+    Returns:
+    - aggregates (dict): The counts or histogram of each feature.
+    """
+    chunks = [data] if isinstance(data, pd.DataFrame) else data
+    if not isinstance(data, pd.DataFrame) and numerical_features and ranges is None:
+        raise ValueError("The ranges of the numerical features are required to aggregate chunks.")
+    ranges = ranges or {}
+
+    aggregates = {}
+    for chunk in chunks:
+        chunk_aggregates = {feature: categorical_counts(chunk, feature, target) for feature in categorical_features}
+        chunk_aggregates.update({feature: numerical_histogram(chunk, feature, bins, ranges.get(feature), target)
+                                 for feature in numerical_features})
+        for feature, aggregate in chunk_aggregates.items():
+            # Categories or labels missing from a chunk count as zero
+            aggregates[feature] = (aggregate if feature not in aggregates else
+                                   aggregates[feature].add(aggregate, fill_value=0).astype(np.int64))
+    return aggregates
+
+def aggregate_file_distributions(file_path, categorical_features, numerical_features, bins=30,
+                                 chunksize=100_000, target='Churn'):
+    """
+    Aggregate the distributions of features of a CSV file, reading it in chunks.
+
+    The file is read twice, only parsing the needed columns: once for the ranges of the
+    numerical features, and once for the counts.
+
+    Args:
+    - file_path (str): Path to the CSV file.
+    - categorical_features (list): Features aggregated with `categorical_counts`.
+    - numerical_features (list): Features aggregated with `numerical_histogram`.
+    - bins (int): Number of plotted bins of the numerical features.
+    - chunksize (int): The number of rows per chunk.
+    - target (str): Name of the target column.
+
+    Returns:
+    - aggregates (dict): The counts or histogram of each feature.
+    """
+    ranges = {}
+    if numerical_features:
+        for chunk in load_data_in_chunks(file_path, chunksize=chunksize, usecols=list(numerical_features)):
+            for feature in numerical_features:
+                low, high = chunk[feature].min(), chunk[feature].max()
+                if feature in ranges:
+                    low, high = min(low, ranges[feature][0]), max(high, ranges[feature][1])
+                ranges[feature] = (float(low), float(high))
+    columns = list(dict.fromkeys([*categorical_features, *numerical_features, target]))
+    return aggregate_distributions(load_data_in_chunks(file_path, chunksize=chunksize, usecols=columns),
+                                   categorical_features, numerical_features, bins=bins, ranges=ranges, target=target)
+
+def _binned_kde(counts):
+    """Gaussian KDE of binned counts with Scott's bandwidth, in counts per fine bin."""
+    n = counts.sum()
+    if n < 2:
+        return counts.astype(np.float64)
+    centers = np.arange(len(counts))
+    mean = np.average(centers, weights=counts)
+    std = np.sqrt(np.average((centers - mean) ** 2, weights=counts))
+    # Bandwidth in fine bins, with the width of a bin as a floor for a constant feature
+    sigma = max(std * n ** (-1 / 5), 1.0)
+    radius = int(min(4 * sigma, (len(counts) - 1) // 2))
+    kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma) ** 2)
+    return np.convolve(counts, kernel / kernel.sum(), mode='same')
+
+def visualize_categorical_distribution(data, feature, save_path=None, counts=None):
     """
     Visualize distribution of a categorical feature.
 
     Args:
-    - data (pd.DataFrame): Input DataFrame containing the dataset.
+    - data (pd.DataFrame): Input DataFrame containing the dataset. Not used if `counts` is given.
     - feature (str): Name of the categorical feature to visualize.
     - save_path (str, optional): Path to save the plot. If None, the plot will not be saved.
+    - counts (pd.DataFrame, optional): Precomputed counts, from `categorical_counts` or `aggregate_distributions`.
 
     Returns:
     - fig (matplotlib.figure.Figure): The matplotlib figure object of the plot.
     """
-    plt.figure(figsize=(10, 6))
-    sns.countplot(x=feature, hue='Churn', data=data)
-    plt.title(f'Distribution of {feature} by Churn')
-    plt.xlabel(feature)
-    plt.ylabel('Count')
-    plt.legend(title='Churn', loc='upper right')
-    plt.xticks(rotation=45)
-    fig = plt.gcf()  # Get the current figure
+    if counts is None:
+        counts = categorical_counts(data, feature)
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    # Grouped bars, one group per category and one bar per churn label
+    positions = np.arange(len(counts))
+    width = 0.8 / len(counts.columns)
+    for i, (label, color) in enumerate(zip(counts.columns, sns.color_palette(n_colors=len(counts.columns)))):
+        ax.bar(positions + (i - (len(counts.columns) - 1) / 2) * width, counts[label].to_numpy(), width,
+               color=color, label=str(label))
+    ax.set_xticks(positions, [str(category) for category in counts.index])
+    ax.set_title(f'Distribution of {feature} by Churn')
+    ax.set_xlabel(feature)
+    ax.set_ylabel('Count')
+    ax.legend(title='Churn', loc='upper right')
+    ax.tick_params(axis='x', labelrotation=45)
     # Save the plot if save_path is provided
     if save_path:
-        plt.savefig(save_path)
-        logging.info(f"Categorical distribution plot saved at: {save_path}")
-        print(f"Categorical distribution plot saved at: {save_path}")
-    # Display the plot
-    plt.show()
-    plt.close()  # Close the plot to free memory
+        fig.savefig(save_path)
+        logger.info("Categorical distribution plot saved at: %s", save_path)
+        echo("Categorical distribution plot saved at: %s", save_path)
 
     return fig
 
-def visualize_numerical_distribution(data, feature, save_path=None):
+def visualize_numerical_distribution(data, feature, save_path=None, histogram=None, bins=30):
     """
     Visualize distribution of a numerical feature.
 
     Args:
-    - data (pd.DataFrame): Input DataFrame containing the dataset.
+    - data (pd.DataFrame): Input DataFrame containing the dataset. Not used if `histogram` is given.
     - feature (str): Name of the numerical feature to visualize.
     - save_path (str, optional): Path to save the plot. If None, the plot will not be saved.
+    - histogram (pd.DataFrame, optional): Precomputed histogram, from `numerical_histogram` or `aggregate_distributions`.
+    - bins (int): Number of bins, when the histogram is computed from `data`.
+
+    Returns:
+    - fig (matplotlib.figure.Figure): The matplotlib figure object of the plot.
+    """
+    if histogram is None:
+        histogram = numerical_histogram(data, feature, bins)
+    fine_edges = np.append(histogram.index.left, histogram.index.right[-1])
+    n_bins = len(histogram) // KDE_OVERSAMPLING
+    edges = fine_edges[::KDE_OVERSAMPLING]
+    centers = (fine_edges[:-1] + fine_edges[1:]) / 2
+
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    for label, color in zip(histogram.columns, sns.color_palette(n_colors=len(histogram.columns))):
+        fine_counts = histogram[label].to_numpy()
+        counts = fine_counts.reshape(n_bins, KDE_OVERSAMPLING).sum(axis=1)
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', color=color, alpha=0.5,
+               edgecolor='white', linewidth=0.5, label=str(label))
+        # Density curve, on the scale of the counts of the plotted bins
+        ax.plot(centers, _binned_kde(fine_counts) * KDE_OVERSAMPLING, color=color)
+    ax.set_title(f'Distribution of {feature} by Churn')
+    ax.set_xlabel(feature)
+    ax.set_ylabel('Count')
+    ax.legend(title='Churn', loc='upper right')
+    # Save the plot if save_path is provided
+    if save_path:
+        fig.savefig(save_path)
+        logger.info("Numerical distribution plot saved at: %s", save_path)
+        echo("Numerical distribution plot saved at: %s", save_path)
+
+    return fig
+
+def visualize_feature_importance(feature_importance_df, save_path=None):
+    """
+    Visualize the feature importances of a model as a bar plot.
+
+    Args:
+    - feature_importance_df (pd.DataFrame): 'Feature' and 'Importance' columns, sorted by importance.
+    - save_path (str, optional): Path to save the plot. If None, the plot will not be saved.
 
     Returns:
     - fig (matplotlib.figure.Figure): The matplotlib figure object of the plot.
     """
-    plt.figure(figsize=(10, 6))
-    sns.histplot(data=data, x=feature, hue='Churn', kde=True, bins=30)
-    plt.title(f'Distribution of {feature} by Churn')
-    plt.xlabel(feature)
-    plt.ylabel('Count')
-    plt.legend(title='Churn', loc='upper right')
-    fig = plt.gcf()  # Get the current figure
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    sns.barplot(x='Importance', y='Feature', data=feature_importance_df, ax=ax)
+    ax.set_title('Feature importances')
+    ax.set_xlabel('Importance')
+    ax.set_ylabel('Feature')
     # Save the plot if save_path is provided
     if save_path:
-        plt.savefig(save_path)
-        logging.info(f"Numerical distribution plot saved at: {save_path}")
-        print(f"Numerical distribution plot saved at: {save_path}")
-    # Display the plot
-    plt.show()
-    plt.close()  # Close the plot to free memory
-
-    return fig
\ No newline at end of file
+        fig.savefig(save_path)
+        logger.info("Feature importance plot saved at: %s", save_path)
+        echo("Feature importance plot saved at: %s", save_path)
+
+    return fig
@@ -8,7 +8,8 @@ import mlflow.sklearn
 import argparse
 from customer_churn_predictor import customer_churn_predictor
 from customer_churn_predictor.data.load_data import load_data
-from customer_churn_predictor.data.preprocess import preprocess_data
+from customer_churn_predictor.data.preprocess import ChurnPreprocessor
+from customer_churn_predictor.data.processed_cache import processed_cache_key, read_processed_cache, write_processed_cache
 from customer_churn_predictor.visualization.visualize import visualize_categorical_distribution, visualize_numerical_distribution
 from customer_churn_predictor.features.build_features import feature_engineering
 from customer_churn_predictor.models.define_models import define_models
@@ -16,9 +17,14 @@ from customer_churn_predictor.models.train_model import train_models
 from customer_churn_predictor.models.evaluate_model import evaluate_models
 from customer_churn_predictor.data.split_data import perform_train_test_split
 from customer_churn_predictor.models.feature_importance import calculate_feature_importance
-from customer_churn_predictor.config.config import Config
+from customer_churn_predictor.config.config import Config, ensure_output_directory
+from customer_churn_predictor.pipeline import write_run_report
+from customer_churn_predictor.utils.logging import echo
+from customer_churn_predictor.utils.profiling import StageProfiler, count_rows
 import logging
 
+logger = logging.getLogger(__name__)
+
 def run_pipeline(config, data_path):
     """
     Runs the full data pipeline including loading data, preprocessing, feature engineering,
@@ -36,87 +42,145 @@ def run_pipeline(config, data_path):
 
     mlflow.set_experiment("Customer_Churn_Prediction")  # Set the experiment name
 
+    # Wall time, CPU time, memory and rows per second of each stage
+    profiling_config = config.get('profiling') or {}
+    profiler = StageProfiler.from_config(config)
+    status = 'failed'
+
     # Start run
     with mlflow.start_run():
         try:
-            logging.info("Pipeline started.")
-
-            # Load data
-            data = load_data(data_path)
+            logger.info("Pipeline started.")
 
-            # Visualize distributions (categorical and numerical)
             categorical_features = ['gender', 'SeniorCitizen', 'Partner', 'Dependents']
             numerical_features = ['tenure', 'MonthlyCharges']
+            ensure_output_directory(config, 'figures_dir')
+            figure_paths = ([(feature, os.path.join(config.get('figures_dir'), f'{feature}_categorical_distribution.png'), visualize_categorical_distribution)
+                             for feature in categorical_features] +
+                            [(feature, os.path.join(config.get('figures_dir'), f'{feature}_numerical_distribution.png'), visualize_numerical_distribution)
+                             for feature in numerical_features])
+
+            with profiler.stage('load') as record:
+                # Reuse the processed data of a previous run on the same file, code and configuration
+                cache_key = processed_cache_key(data_path, config)
+                processed_data, preprocessor = read_processed_cache(config, cache_key)
+
+                # On a cache hit the raw data is unchanged, so the figures of the previous run are
+                # logged instead of being rendered again, and the raw data is not loaded. The figures
+                # are only reused if they were rendered for the same cache key, i.e. the same CSV file.
+                figures_key_path = os.path.join(config.get('figures_dir'), 'distribution_figures.key')
+                figures_key = None
+                if os.path.exists(figures_key_path):
+                    with open(figures_key_path) as f:
+                        figures_key = f.read().strip()
+                figures_exist = (processed_data is not None and figures_key == cache_key and
+                                 all(os.path.exists(save_path) for _, save_path, _ in figure_paths))
+                data = None if figures_exist else load_data(data_path)
+                record['rows'] = count_rows(processed_data if data is None else data)
 
-            for feature in categorical_features:
-                save_path = os.path.join(config.get('figures_dir'), f'{feature}_categorical_distribution.png')
-                fig = visualize_categorical_distribution(data, feature, save_path)
-                mlflow.log_figure(fig, f'{feature}_categorical_distribution.png')  # Log the plot as an artifact
-
-            for feature in numerical_features:
-                save_path = os.path.join(config.get('figures_dir'), f'{feature}_numerical_distribution.png')
-                fig = visualize_numerical_distribution(data, feature, save_path)
-                mlflow.log_figure(fig, f'{feature}_numerical_distribution.png')  # Log the plot as an artifact
-
-            # Preprocess data
-            preprocessed_data = preprocess_data(data)
-
-            # Feature engineering
-            processed_data = feature_engineering(preprocessed_data)
+            # Visualize distributions (categorical and numerical)
+            with profiler.stage('figures', rows=count_rows(data)):
+                if figures_exist:
+                    for _, save_path, _ in figure_paths:
+                        mlflow.log_artifact(save_path)  # Log the existing plot as an artifact
+                else:
+                    for feature, save_path, visualize in figure_paths:
+                        fig = visualize(data, feature, save_path)
+                        mlflow.log_figure(fig, os.path.basename(save_path))  # Log the plot as an artifact
+                    with open(figures_key_path, 'w') as f:
+                        f.write(cache_key)
+
+            if processed_data is None:
+                with profiler.stage('preprocess', rows=count_rows(data)):
+                    # Preprocess data
+                    preprocessor = ChurnPreprocessor()
+                    preprocessed_data = preprocessor.fit_transform(data)
+
+                    # Feature engineering
+                    processed_data = feature_engineering(preprocessed_data)
+                    write_processed_cache(config, cache_key, processed_data, preprocessor)
 
             # Split data into training and testing sets
-            X_train, X_test, y_train, y_test = perform_train_test_split(processed_data, test_size=config.get('test_size'),
-                                                                        random_state=config.get('random_state'))
+            with profiler.stage('split', rows=count_rows(processed_data)):
+                X_train, X_test, y_train, y_test = perform_train_test_split(processed_data, test_size=config.get('test_size'),
+                                                                            random_state=config.get('random_state'))
             mlflow.log_param("test_size", config.get('test_size'))
             mlflow.log_param("random_state", config.get('random_state'))
 
             # Define models
-            models = define_models()
+            models = define_models(config)
 
             # Train model
-            trained_models = train_models(models, X_train, y_train)
+            with profiler.stage('train', rows=count_rows(X_train)):
+                trained_models = train_models(models, X_train, y_train)
             # Log the trained models as artifacts in MLflow
             for model_name, model in trained_models.items():
                 mlflow.sklearn.log_model(model, model_name)
-                logging.info(f"Model {model_name} logged as an artifact in MLflow.")
-                print(f"Model {model_name} logged as an artifact in MLflow.")
+                logger.info("Model %s logged as an artifact in MLflow.", model_name)
+                echo("Model %s logged as an artifact in MLflow.", model_name)
 
             # Evaluate model and log metrics
-            evaluation_results = evaluate_models(trained_models, X_test, y_test)
-            for model_name, metrics in evaluation_results.items():
-                # Log accuracy
-                mlflow.log_metric(f"{model_name}_accuracy", metrics["accuracy"])
+            evaluation_config = config.get('evaluation') or {}
+            with profiler.stage('evaluate', rows=count_rows(X_test)):
+                evaluation_results = evaluate_models(trained_models, X_test, y_test,
+                                                     bootstrap_resamples=evaluation_config.get('bootstrap_resamples', 0),
+                                                     confidence=evaluation_config.get('confidence', 0.95),
+                                                     bootstrap_n_jobs=evaluation_config.get('n_jobs'),
+                                                     random_state=config.get('random_state'))
+            for model_name, result in evaluation_results.items():
+                # Log accuracy, precision, recall, F1 score and ROC AUC
+                for metric_name, value in result.metrics().items():
+                    mlflow.log_metric(f"{model_name}_{metric_name}", value)
+                # Log the bounds of the bootstrap confidence intervals, if any
+                for metric_name, (lower, upper) in (result.confidence_intervals or {}).items():
+                    mlflow.log_metric(f"{model_name}_{metric_name}_ci_lower", lower)
+                    mlflow.log_metric(f"{model_name}_{metric_name}_ci_upper", upper)
 
                 # Save classification report and confusion matrix
                 class_report_path = os.path.join(config.get('figures_dir'), f'{model_name}_classification_report.txt')
                 conf_matrix_path = os.path.join(config.get('figures_dir'), f'{model_name}_confusion_matrix.txt')
 
                 with open(class_report_path, 'w') as f:
-                    f.write(str(metrics["classification_report"]))
+                    f.write(result.classification_report())
                 with open(conf_matrix_path, 'w') as f:
-                    f.write(str(metrics["confusion_matrix"]))
+                    f.write(str(result.confusion_matrix))
 
                 # Log classification report
                 mlflow.log_artifact(class_report_path)
                 # Log confusion matrix
                 mlflow.log_artifact(conf_matrix_path)
 
-            # Calculate and plot feature importance for each model
-            for model_name, trained_model in trained_models.items():
-                print(f"\nFeature importance for model: {model_name}")
-                save_path = os.path.join(config.get('figures_dir'), f'{model_name}_feature_importance.png')  # Define the path to save the plot
-                fig, feature_importance_df = calculate_feature_importance(trained_model, X_train.columns, save_path)
-                if fig and feature_importance_df is not None:  # Check if feature importance was successfully calculated
-                    mlflow.log_figure(fig, f'{model_name}_feature_importance.png') # Log the feature importance plot as an artifact
-
-            logging.info("Pipeline completed successfully.")
-            print("Pipeline completed successfully.")
+            # Calculate and plot feature importance for each model, with the permutation importance for models without built-in importances
+            importance_config = config.get('feature_importance') or {}
+            with profiler.stage('feature_importance', rows=count_rows(X_test)):
+                for model_name, trained_model in trained_models.items():
+                    echo("\nFeature importance for model: %s", model_name)
+                    save_path = os.path.join(config.get('figures_dir'), f'{model_name}_feature_importance.png')  # Define the path to save the plot
+                    fig, feature_importance_df = calculate_feature_importance(
+                        trained_model, X_train.columns, save_path, X=X_test, y=y_test,
+                        n_repeats=importance_config.get('n_repeats', 5), scoring=importance_config.get('scoring', 'accuracy'),
+                        max_samples=importance_config.get('max_samples'), n_jobs=importance_config.get('n_jobs'),
+                        random_state=config.get('random_state'))
+                    if fig and feature_importance_df is not None:  # Check if feature importance was successfully calculated
+                        mlflow.log_figure(fig, f'{model_name}_feature_importance.png') # Log the feature importance plot as an artifact
+
+            logger.info("Pipeline completed successfully.")
+            echo("Pipeline completed successfully.")
+            status = 'succeeded'
 
         except Exception as e:
-            logging.error(f"An error occurred during pipeline execution: {e}")
-            print(f"An error occurred during pipeline execution: {e}")
+            logger.error("An error occurred during pipeline execution: %s", e)
+            echo("An error occurred during pipeline execution: %s", e)
             mlflow.log_param("error", str(e))  # Log the error
 
+        # Log the stage metrics and the run report of the profiler
+        if profiling_config.get('enabled', True):
+            if profiling_config.get('mlflow', True):
+                profiler.log_to_mlflow()
+            report = write_run_report(config, profiler, data_path=data_path, status=status)
+            if report is not None:
+                mlflow.log_dict(report, 'run_report.json')
+
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="Run ML Pipeline with MLflow Tracking")
@@ -0,0 +1,57 @@
+import argparse
+from customer_churn_predictor import customer_churn_predictor
+from customer_churn_predictor.models.define_models import define_models
+from customer_churn_predictor.models.incremental_training import load_warm_start_models, train_models_incrementally
+from customer_churn_predictor.models.model_serialization import save_model
+import os
+
+def main():
+    """
+    Main function to train models incrementally for customer churn prediction.
+    Parses command-line arguments for data path, configuration path, models directory and warm start.
+    """
+    # Setup argument parser
+    parser = argparse.ArgumentParser(description="Train models incrementally, out of core, for customer churn prediction.")
+    parser.add_argument('--data_path', type=str, required=True, help="Path to the CSV data file (e.g. only the new rows when warm starting).")
+    parser.add_argument('--config_path', type=str, help="Optional path to a custom configuration file.")
+    parser.add_argument('--models_dir', type=str, required=True, help="Directory to save the trained models.")
+    parser.add_argument('--warm_start', action='store_true',
+                        help="Continue training the models last saved in the models directory instead of starting from scratch.")
+    parser.add_argument('--chunksize', type=int, help="Optional number of rows per chunk (overrides the configuration).")
+
+    # Parse arguments
+    args = parser.parse_args()
+
+    # Initialize the churn predictor with optional custom config path
+    churn_predictor = customer_churn_predictor.CustomerChurnPredictor(custom_config_path=args.config_path)
+    incremental_config = churn_predictor.config.get('incremental') or {}
+
+    # Define the models, replacing them with the saved ones when warm starting
+    models = define_models(churn_predictor.config, incremental=True)
+    preprocessor = None
+    if args.warm_start:
+        models, preprocessor = load_warm_start_models(models, args.models_dir)
+
+    # Train the models on the stream of chunks
+    trained_models, preprocessor, n_rows = train_models_incrementally(
+        models, args.data_path, preprocessor=preprocessor,
+        chunksize=args.chunksize or incremental_config.get('chunksize', 100_000),
+        engine=incremental_config.get('engine', 'c'))
+    if trained_models is None:
+        return
+    print(f"Models trained incrementally on {n_rows} rows.")
+
+    # Ensure the directory for saving models exists
+    os.makedirs(args.models_dir, exist_ok=True)
+
+    # Save trained models
+    serialization_config = churn_predictor.config.get('serialization') or {}
+    for model_name, trained_model in trained_models.items():
+        model_filepath = os.path.join(args.models_dir, f"{model_name}_model.pkl")
+        save_model(trained_model, model_filepath, preprocessor=preprocessor,
+                   artifact=serialization_config.get('artifact', False))
+
+    print("Incremental model training completed successfully.")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import argparse
+import sys
 from customer_churn_predictor import customer_churn_predictor
 from customer_churn_predictor import pipeline
+from customer_churn_predictor.utils.step_graph import StepFailed
 
 def main():
     """
@@ -11,18 +13,40 @@ def main():
     parser = argparse.ArgumentParser(description="Run the customer churn prediction pipeline.")
     parser.add_argument('--data_path', type=str, required=True, help="Path to the CSV data file.")
     parser.add_argument('--config_path', type=str, help="Optional path to a custom configuration file.")
+    parser.add_argument('--search', action='store_true', default=None,
+                        help="Search the hyperparameters of the models before training them.")
+    parser.add_argument('--cv', action='store_true', default=None,
+                        help="Cross-validate the models on the training set before training them.")
+    parser.add_argument('--reports', choices=['auto', 'parallel', 'deferred', 'serial', 'skip'],
+                        help="Render the report figures concurrently with training, after it, inline, or not at all.")
+    parser.add_argument('--force', nargs='+', default=(), metavar='STEP',
+                        help="Steps to run again even if their memoized outputs are up to date, e.g. train.")
+    parser.add_argument('--no_cache', action='store_true',
+                        help="Run every step without reusing or memoizing the outputs of previous runs.")
+    parser.add_argument('--profile', nargs='*', metavar='STEP',
+                        help="Profile steps with the configured profiler (cProfile by default), all of them if no step is given.")
 
     # Parse arguments
     args = parser.parse_args()
 
     # Initialize the churn predictor with optional custom config path
     if args.config_path:
-        churn_predictor = customer_churn_predictor.CustomerChurnPredictor(config_path=args.config_path)
+        churn_predictor = customer_churn_predictor.CustomerChurnPredictor(custom_config_path=args.config_path)
     else:
         churn_predictor = customer_churn_predictor.CustomerChurnPredictor()
 
-    # Run the pipeline
-    pipeline.run_pipeline(churn_predictor.config, data_path=args.data_path)
+    if args.profile is not None:
+        config = churn_predictor.config
+        config.set('profiling', {**(config.get('profiling') or {}), 'profile': args.profile or True})
+
+    # Run the pipeline. After a failure, running it again resumes from the failed step.
+    try:
+        pipeline.run_pipeline(churn_predictor.config, data_path=args.data_path, search=args.search,
+                              cross_validate=args.cv, reports=args.reports, force=args.force,
+                              use_cache=False if args.no_cache else None)
+    except StepFailed as e:
+        print(f"{e}\nRun the pipeline again to resume from step '{e.step}'.")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
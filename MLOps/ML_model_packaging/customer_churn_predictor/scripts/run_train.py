@@ -3,7 +3,9 @@ from customer_churn_predictor import customer_churn_predictor
 from customer_churn_predictor import pipeline
 from customer_churn_predictor.models.train_model import train_models
 from customer_churn_predictor.models.model_serialization import save_model
+from customer_churn_predictor.data.processed_cache import load_processed_data
 import os
+import sys
 
 def main():
     """
@@ -15,20 +17,21 @@ def main():
     parser.add_argument('--data_path', type=str, required=True, help="Path to the CSV data file.")
     parser.add_argument('--config_path', type=str, help="Optional path to a custom configuration file.")
     parser.add_argument('--models_dir', type=str, required=True, help="Directory to save the trained models.")
+    parser.add_argument('--backend', type=str, choices=['serial', 'threads', 'processes', 'loky'],
+                        help="Optional backend for training the models concurrently (overrides the configuration).")
+    parser.add_argument('--n_jobs', type=int, help="Optional number of jobs for the models that support it (overrides the configuration).")
 
     # Parse arguments
     args = parser.parse_args()
 
     # Initialize the churn predictor with optional custom config path
     if args.config_path:
-        churn_predictor = customer_churn_predictor.CustomerChurnPredictor(config_path=args.config_path)
+        churn_predictor = customer_churn_predictor.CustomerChurnPredictor(custom_config_path=args.config_path)
     else:
         churn_predictor = customer_churn_predictor.CustomerChurnPredictor()
 
-    # Run the pipeline up to the training step
-    data = pipeline.load_data(args.data_path)
-    preprocessed_data = pipeline.preprocess_data(data)
-    processed_data = pipeline.feature_engineering(preprocessed_data)
+    # Run the pipeline up to the training step, reusing the cached processed data of a previous run
+    processed_data, preprocessor = load_processed_data(args.data_path, churn_predictor.config)
     X_train, X_test, y_train, y_test = pipeline.perform_train_test_split(
         processed_data,
         test_size=churn_predictor.config.get('test_size'),
@@ -36,16 +39,28 @@ def main():
     )
 
     # Define and train models
-    models = pipeline.define_models()
-    trained_models = train_models(models, X_train, y_train)
+    models = pipeline.define_models(churn_predictor.config)
+    training_config = churn_predictor.config.get('training') or {}
+    trained_models, timings = train_models(models, X_train, y_train,
+                                           backend=args.backend or training_config.get('backend', 'serial'),
+                                           n_jobs=args.n_jobs if args.n_jobs is not None else training_config.get('n_jobs'),
+                                           return_timings=True)
+    if trained_models is None:
+        # train_models has already reported the error
+        print("Model training failed.")
+        sys.exit(1)
+    for model_name, timing in timings.items():
+        print(f"{model_name} trained in {timing['wall_time']:.2f}s (CPU time {timing['cpu_time']:.2f}s)")
 
     # Ensure the directory for saving models exists
     os.makedirs(args.models_dir, exist_ok=True)
 
     # Save trained models
+    serialization_config = churn_predictor.config.get('serialization') or {}
     for model_name, trained_model in trained_models.items():
         model_filepath = os.path.join(args.models_dir, f"{model_name}_model.pkl")
-        save_model(trained_model, model_filepath)
+        save_model(trained_model, model_filepath, preprocessor=preprocessor,
+                   artifact=serialization_config.get('artifact', False))
 
 
     print("Model training completed successfully.")
@@ -35,6 +35,7 @@ setup(
         'console_scripts': [
             'run_pipeline=scripts.run_pipeline:main',
             'run_train=scripts.run_train:main',
+            'run_incremental_train=scripts.run_incremental_train:main',
         ]
     },
 )
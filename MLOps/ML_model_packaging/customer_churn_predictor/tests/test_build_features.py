@@ -1,5 +1,6 @@
 import unittest
 from customer_churn_predictor.features.build_features import feature_engineering
+import numpy as np
 import pandas as pd
 
 class TestFeatureEngineering(unittest.TestCase):
@@ -15,5 +16,21 @@ class TestFeatureEngineering(unittest.TestCase):
         self.assertIsNotNone(engineered_data)
         self.assertFalse(engineered_data.empty)
 
+    def test_engineered_features(self):
+        preprocessed_data = pd.DataFrame({'tenure': [12.0, 24.0], 'MonthlyCharges': [50.0, 80.0]}, index=[5, 7])
+
+        engineered_data = feature_engineering(preprocessed_data)
+        self.assertEqual(list(engineered_data.columns),
+                         ['tenure', 'MonthlyCharges', 'Tenure_MonthlyCharges_interaction',
+                          'tenure^2', 'tenure MonthlyCharges', 'MonthlyCharges^2'])
+        self.assertEqual(engineered_data['tenure^2'].dtype, np.float32)
+        np.testing.assert_allclose(engineered_data['tenure MonthlyCharges'], [600.0, 1920.0])
+        np.testing.assert_allclose(engineered_data['MonthlyCharges^2'], [2500.0, 6400.0])
+        # The index is kept and the input is not modified
+        self.assertEqual(list(engineered_data.index), [5, 7])
+        self.assertEqual(list(preprocessed_data.columns), ['tenure', 'MonthlyCharges'])
+        # Existing features are not duplicated
+        self.assertEqual(feature_engineering(engineered_data).shape, engineered_data.shape)
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+from customer_churn_predictor.config import config as config_module
+from customer_churn_predictor.config.config import Config, FrozenConfig, ensure_output_directory
+
+class TestConfig(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.config_path = os.path.join(self.tmp_dir.name, 'config.yaml')
+        with open(self.config_path, 'w') as file:
+            file.write("test_size: 0.3\nmodels:\n  LogisticRegression:\n    C: 1.0\n")
+        # Run in the temporary directory, where the output directories would be created
+        cwd = os.getcwd()
+        os.chdir(self.tmp_dir.name)
+        self.addCleanup(os.chdir, cwd)
+
+    def test_parsed_files_are_cached_until_modified(self):
+        Config(default_config_path=self.config_path)
+        with mock.patch.object(config_module, '_parse_yaml', wraps=config_module._parse_yaml) as parse_yaml:
+            config = Config(default_config_path=self.config_path)
+            parse_yaml.assert_not_called()
+            # Instances do not share the cached values
+            config.get('models')['LogisticRegression']['C'] = 2.0
+            self.assertEqual(Config(default_config_path=self.config_path).get('models')['LogisticRegression']['C'], 1.0)
+
+            with open(self.config_path, 'w') as file:
+                file.write("test_size: 0.25\n")
+            os.utime(self.config_path, ns=(0, 0))
+            self.assertEqual(Config(default_config_path=self.config_path).get('test_size'), 0.25)
+            parse_yaml.assert_called_once()
+
+    def test_no_directories_created(self):
+        config = Config(default_config_path=self.config_path)
+
+        self.assertEqual(os.listdir(self.tmp_dir.name), ['config.yaml'])
+        figures_dir = ensure_output_directory(config, 'figures_dir')
+        self.assertTrue(os.path.isdir(figures_dir))
+        self.assertEqual(figures_dir, os.path.join(self.tmp_dir.name, 'churn_predictor_outputs', 'reports', 'figures'))
+
+        # A directory deleted while the process runs is created again
+        os.rmdir(figures_dir)
+        ensure_output_directory(config, 'figures_dir')
+        self.assertTrue(os.path.isdir(figures_dir))
+
+    def test_environment_overrides(self):
+        environ = {'CHURN_CONFIG__TEST_SIZE': '0.1', 'CHURN_CONFIG__MODELS__LogisticRegression__C': '0.5',
+                   'CHURN_CONFIG__SEARCH__ENABLED': 'true', 'CHURN_DATA_PATH': 'data.csv'}
+        with mock.patch.dict(os.environ, environ):
+            config = Config(default_config_path=self.config_path)
+
+        self.assertEqual(config.get('test_size'), 0.1)
+        self.assertEqual(config.get('models'), {'LogisticRegression': {'C': 0.5}})
+        self.assertEqual(config.get('search'), {'enabled': True})
+        self.assertNotIn('data_path', config.config)
+
+    def test_snapshot(self):
+        config = Config(default_config_path=self.config_path)
+        snapshot = config.snapshot()
+
+        self.assertIsInstance(snapshot.get('models'), FrozenConfig)
+        with self.assertRaises(TypeError):
+            snapshot['test_size'] = 0.5
+        config.set('test_size', 0.5)
+        self.assertEqual(snapshot.get('test_size'), 0.3)
+        self.assertEqual(pickle.loads(pickle.dumps(snapshot)), snapshot)
+        self.assertEqual(snapshot.to_dict(), {**config.to_dict(), 'test_size': 0.3})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.metrics import accuracy_score
+from customer_churn_predictor.data.split_data import make_cv_folds
+from customer_churn_predictor.models.cross_validation import cross_validate_models
+
+class TestCrossValidation(unittest.TestCase):
+    def test_cross_validate_models(self):
+        rng = np.random.default_rng(0)
+        X = rng.standard_normal((300, 4))
+        y = (X[:, 0] + rng.standard_normal(300) > 0).astype(int)
+        folds = make_cv_folds(y, n_splits=3)
+        models = {'Logistic regression': LogisticRegression(), 'Decision tree': DecisionTreeClassifier(max_depth=2)}
+
+        cv_results = cross_validate_models(models, X, y, folds, n_jobs=2)
+        self.assertEqual(len(cv_results), 6)
+        self.assertEqual(set(cv_results['model']), set(models))
+
+        # The scores are those of a model trained on the fold, on float32 features
+        train, test = folds[0]
+        model = LogisticRegression().fit(X[train].astype(np.float32), y[train])
+        score = cv_results.query("model == 'Logistic regression' and fold == 0")['accuracy'].item()
+        self.assertAlmostEqual(score, accuracy_score(y[test], model.predict(X[test].astype(np.float32))))
+        # The untrained models are not modified
+        self.assertFalse(hasattr(models['Logistic regression'], 'coef_'))
+
+if __name__ == '__main__':
+    unittest.main()
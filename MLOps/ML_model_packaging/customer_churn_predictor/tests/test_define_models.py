@@ -24,6 +24,19 @@ class TestModelDefinition(unittest.TestCase):
             with self.assertRaises(NotFittedError):
                 model.predict([[1, 2]])
 
+    def test_define_models_from_config(self):
+        # Hyperparameters are read from the 'models' block, keyed by estimator class name
+        config = {'models': {'LogisticRegression': {'C': 0.5, 'max_iter': 200},
+                             'DecisionTreeClassifier': {'max_depth': 'None', 'min_samples_split': 4}}}
+        models = define_models(config)
+
+        self.assertEqual(models['Logistic regression'].C, 0.5)
+        self.assertEqual(models['Logistic regression'].max_iter, 200)
+        self.assertIsNone(models['Decision tree'].max_depth)
+        self.assertEqual(models['Decision tree'].min_samples_split, 4)
+        # Models missing from the configuration use the estimator defaults
+        self.assertEqual(models['Random forest'].n_estimators, 100)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,78 @@
+import unittest
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, confusion_matrix, f1_score, precision_score, recall_score, roc_auc_score
+from sklearn.tree import DecisionTreeClassifier
+from customer_churn_predictor.models.evaluate_model import _bootstrap_chunk, bootstrap_confidence_intervals, compute_metrics, evaluate_models, roc_auc
+
+class TestEvaluateModels(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = rng.standard_normal((500, 4))
+        self.y = (self.X[:, 0] + rng.standard_normal(500) > 0.5).astype(int)
+
+    def test_compute_metrics_matches_scikit_learn(self):
+        rng = np.random.default_rng(1)
+        y_score = np.round(rng.random(500), 2)  # Rounded, to have ties
+        y_pred = (y_score > 0.5).astype(int)
+
+        result = compute_metrics(self.y, y_pred, y_score)
+        self.assertAlmostEqual(result.accuracy, accuracy_score(self.y, y_pred))
+        self.assertAlmostEqual(result.precision, precision_score(self.y, y_pred))
+        self.assertAlmostEqual(result.recall, recall_score(self.y, y_pred))
+        self.assertAlmostEqual(result.f1, f1_score(self.y, y_pred))
+        self.assertAlmostEqual(result.roc_auc, roc_auc_score(self.y, y_score))
+        np.testing.assert_array_equal(result.confusion_matrix, confusion_matrix(self.y, y_pred))
+        self.assertIn('weighted avg', result.classification_report())
+
+    def test_roc_auc(self):
+        y_score = np.round(np.random.default_rng(2).random(500), 2)
+        self.assertAlmostEqual(roc_auc(self.y == 1, y_score), roc_auc_score(self.y, y_score))
+        # Undefined with a single class
+        self.assertTrue(np.isnan(roc_auc(np.ones(10), np.arange(10))))
+
+    def test_evaluates_every_model(self):
+        models = {'Logistic regression': LogisticRegression().fit(self.X, self.y),
+                  'Decision tree': DecisionTreeClassifier(max_depth=3).fit(self.X, self.y)}
+
+        evaluation_results = evaluate_models(models, self.X, self.y, verbose=False)
+        self.assertEqual(set(evaluation_results), set(models))
+        for name, model in models.items():
+            self.assertAlmostEqual(evaluation_results[name].accuracy, accuracy_score(self.y, model.predict(self.X)))
+            self.assertAlmostEqual(evaluation_results[name].roc_auc,
+                                   roc_auc_score(self.y, model.predict_proba(self.X)[:, 1]))
+
+    def test_bootstrap_matches_resampled_metrics(self):
+        rng = np.random.default_rng(1)
+        y_score = np.round(rng.random(500), 2)
+        y_pred = (y_score > 0.5).astype(int)
+        outcome = 2 * (y_pred == self.y) + (self.y == 1)
+        distinct_scores, score_level = np.unique(y_score, return_inverse=True)
+
+        seed = np.random.SeedSequence(0)
+        metrics = _bootstrap_chunk(outcome, score_level, len(distinct_scores), 5, seed)
+        # The same resamples, drawn and scored one by one
+        indices = np.random.default_rng(seed).integers(0, 500, size=(5, 500))
+        for resample, rows in enumerate(indices):
+            self.assertAlmostEqual(metrics[resample, 0], accuracy_score(self.y[rows], y_pred[rows]))
+            self.assertAlmostEqual(metrics[resample, 1], recall_score(self.y[rows], y_pred[rows]))
+            self.assertAlmostEqual(metrics[resample, 2], roc_auc_score(self.y[rows], y_score[rows]))
+
+    def test_bootstrap_confidence_intervals(self):
+        model = LogisticRegression().fit(self.X, self.y)
+        evaluation_results = evaluate_models({'Logistic regression': model}, self.X, self.y, verbose=False,
+                                             bootstrap_resamples=200, random_state=0)
+        result = evaluation_results['Logistic regression']
+        for metric, (lower, upper) in result.confidence_intervals.items():
+            self.assertLess(lower, upper)
+            self.assertTrue(lower <= getattr(result, metric) <= upper)
+
+        # Chunks running in parallel give the same intervals as sequential chunks for the same seed
+        y_pred = model.predict(self.X)
+        self.assertEqual(bootstrap_confidence_intervals(self.y, y_pred, n_resamples=100, random_state=0,
+                                                        max_chunk_elements=500 * 10, n_jobs=2),
+                         bootstrap_confidence_intervals(self.y, y_pred, n_resamples=100, random_state=0,
+                                                        max_chunk_elements=500 * 10))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+from customer_churn_predictor.data.preprocess import ChurnPreprocessor
+from customer_churn_predictor.data.synthetic import make_synthetic_telco_data
+from customer_churn_predictor.features.build_features import feature_engineering
+from customer_churn_predictor.models.define_models import define_models
+from customer_churn_predictor.models.explain_model import ModelExplainer, format_explanations, top_contributions
+
+class TestExplainModel(unittest.TestCase):
+    def setUp(self):
+        data = make_synthetic_telco_data(600)
+        features = feature_engineering(ChurnPreprocessor().fit(data).transform(data))
+        self.y = features.pop('Churn_encoded')
+        self.X = features
+
+    def test_contributions_add_up_to_the_predictions(self):
+        for name, model in define_models().items():
+            model.fit(self.X, self.y)
+            explainer = ModelExplainer(model)
+            contributions = explainer.explain(self.X)
+            self.assertEqual(contributions.shape, self.X.shape)
+
+            total = explainer.base_value + contributions.sum(axis=1).to_numpy()
+            if explainer.output == 'log_odds':
+                # Linear contributions add up to the log-odds of churn
+                total = 1 / (1 + np.exp(-total))
+            np.testing.assert_allclose(total, model.predict_proba(self.X)[:, 1], atol=1e-6, err_msg=name)
+
+    def test_top_contributions(self):
+        model = define_models()['Decision tree'].fit(self.X, self.y)
+        contributions = ModelExplainer(model).explain(self.X.head(5))
+        top = top_contributions(contributions, k=2)
+        self.assertEqual(len(top), 5)
+        for row, row_top in zip(contributions.to_numpy(), top):
+            self.assertEqual(list(row_top.values()), sorted(row_top.values(), key=abs, reverse=True))
+            self.assertAlmostEqual(abs(next(iter(row_top.values()))), np.abs(row).max())
+
+        explanations = contributions.assign(base_value=0.5)
+        explanations.columns = [['Decision tree'] * explanations.shape[1], explanations.columns]
+        records = format_explanations(explanations, top_k=2)
+        self.assertEqual(records['Decision tree'][0], {'base_value': 0.5, 'contributions': top[0]})
+        for k in (0, -1):
+            with self.assertRaises(ValueError):
+                format_explanations(explanations, top_k=k)
+
+    def test_unsupported_model(self):
+        with self.assertRaises(ValueError):
+            ModelExplainer(define_models()['Logistic regression'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,9 @@
 import unittest
-from customer_churn_predictor.models.feature_importance import calculate_feature_importance
+import numpy as np
+import pandas as pd
+from customer_churn_predictor.models.feature_importance import calculate_feature_importance, permutation_importance
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
 from sklearn.datasets import make_classification
 
 class TestFeatureImportance(unittest.TestCase):
@@ -18,5 +21,32 @@ class TestFeatureImportance(unittest.TestCase):
         # Test the calculate_feature_importance function
         calculate_feature_importance(model, feature_names)
 
+    def test_permutation_importance_of_logistic_regression(self):
+        rng = np.random.default_rng(42)
+        X = pd.DataFrame(rng.normal(size=(400, 6)), columns=[f'feature_{i}' for i in range(6)])
+        y = (X['feature_0'] + 0.1 * rng.normal(size=400) > 0).astype(int)
+        model = LogisticRegression().fit(X, y)
+
+        fig, importance_df = calculate_feature_importance(model, X.columns, X=X, y=y, n_repeats=3, random_state=0)
+        self.assertIsNotNone(fig)
+        self.assertEqual(len(importance_df), X.shape[1])
+        # The target only depends on the first feature, and shuffling it is what hurts the model
+        self.assertEqual(importance_df['Feature'].iloc[0], 'feature_0')
+        self.assertGreater(importance_df['Importance'].iloc[0], 0.3)
+        self.assertEqual(importance_df.attrs['importances'].shape, (X.shape[1], 3))
+
+    def test_permutation_importance_does_not_depend_on_n_jobs(self):
+        X, y = make_classification(n_samples=300, n_features=5, random_state=42)
+        model = LogisticRegression().fit(X, y)
+        X_before = X.copy()
+
+        sequential = permutation_importance(model, X, y, n_repeats=4, scoring='roc_auc', max_samples=0.5,
+                                            random_state=0)
+        parallel = permutation_importance(model, X, y, n_repeats=4, scoring='roc_auc', max_samples=0.5,
+                                          n_jobs=2, random_state=0)
+        np.testing.assert_allclose(sequential.attrs['importances'], parallel.attrs['importances'])
+        # The held-out features are permuted in a copy, never in place
+        np.testing.assert_array_equal(X, X_before)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,36 @@
+import math
+import unittest
+import warnings
+from sklearn.datasets import make_classification
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.exceptions import NotFittedError
+from customer_churn_predictor.models.hyperparameter_search import search_hyperparameters
+
+class TestHyperparameterSearch(unittest.TestCase):
+    def test_search_hyperparameters(self):
+        X, y = make_classification(n_samples=600, n_features=10, n_classes=2, random_state=42)
+        models = {'Logistic regression': LogisticRegression(), 'Decision tree': DecisionTreeClassifier(random_state=0)}
+        param_grids = {'DecisionTreeClassifier': {'max_depth': [1, 3, 'None'], 'min_samples_split': [2, 20]}}
+
+        for mode in ['grid', 'random']:
+            # Every fold of every round has both classes, so every candidate gets a ROC AUC
+            with warnings.catch_warnings():
+                warnings.simplefilter('error')
+                best_models, search_results = search_hyperparameters(models, param_grids, X, y, mode=mode,
+                                                                     n_candidates=4, cv=3, n_jobs=2, random_state=42)
+            self.assertIsNotNone(best_models)
+
+            # Only models with a parameter grid are searched, and the winners are returned untrained
+            self.assertIs(best_models['Logistic regression'], models['Logistic regression'])
+            self.assertEqual(set(search_results), {'Decision tree'})
+            best_params = search_results['Decision tree']['best_params']
+            self.assertTrue(math.isfinite(search_results['Decision tree']['best_score']))
+            self.assertGreater(search_results['Decision tree']['best_score'], 0.5)
+            self.assertIn(best_params['max_depth'], [1, 3, None])
+            self.assertEqual(best_models['Decision tree'].max_depth, best_params['max_depth'])
+            with self.assertRaises(NotFittedError):
+                best_models['Decision tree'].predict(X)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
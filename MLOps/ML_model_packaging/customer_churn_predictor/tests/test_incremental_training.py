@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+from sklearn.linear_model import SGDClassifier
+from sklearn.naive_bayes import GaussianNB
+from customer_churn_predictor.data.synthetic import make_synthetic_telco_data
+from customer_churn_predictor.features.build_features import stream_features
+from customer_churn_predictor.models.define_models import define_models
+from customer_churn_predictor.models.incremental_training import load_warm_start_models, train_models_incrementally
+from customer_churn_predictor.models.model_serialization import save_model
+
+class TestIncrementalTraining(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_path = os.path.join(self.tmp_dir.name, 'history.csv')
+        self.new_data_path = os.path.join(self.tmp_dir.name, 'new_rows.csv')
+        make_synthetic_telco_data(1000).to_csv(self.data_path, index=False)
+        make_synthetic_telco_data(300, random_state=1).to_csv(self.new_data_path, index=False)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_define_incremental_models(self):
+        models = define_models({'incremental': {'models': {'SGDClassifier': {'alpha': 0.001}}}}, incremental=True)
+        self.assertIsInstance(models['SGD logistic regression'], SGDClassifier)
+        self.assertEqual(models['SGD logistic regression'].loss, 'log_loss')
+        self.assertEqual(models['SGD logistic regression'].alpha, 0.001)
+        self.assertIsInstance(models['Naive Bayes'], GaussianNB)
+
+    def test_train_in_chunks(self):
+        models = define_models(incremental=True)
+        trained_models, preprocessor, n_rows = train_models_incrementally(models, self.data_path, chunksize=300)
+
+        self.assertEqual(n_rows, 1000)
+        self.assertEqual(trained_models['Naive Bayes'].class_count_.sum(), 1000)
+        X, y = next(stream_features(self.new_data_path, preprocessor, chunksize=100))
+        for model in trained_models.values():
+            self.assertEqual(model.predict_proba(X).shape, (100, 2))
+        self.assertIsNotNone(preprocessor.classes_)
+
+    def test_warm_start_only_trains_on_new_rows(self):
+        trained_models, preprocessor, _ = train_models_incrementally(define_models(incremental=True), self.data_path)
+        for name, model in trained_models.items():
+            save_model(model, os.path.join(self.tmp_dir.name, f"{name}_model.pkl"), preprocessor=preprocessor)
+
+        models, warm_preprocessor = load_warm_start_models(define_models(incremental=True), self.tmp_dir.name)
+        self.assertEqual(warm_preprocessor.feature_names_out_, preprocessor.feature_names_out_)
+        updated_models, _, n_rows = train_models_incrementally(models, self.new_data_path, preprocessor=warm_preprocessor)
+
+        # Only the new rows are read, on top of the rows seen before
+        self.assertEqual(n_rows, 300)
+        self.assertEqual(updated_models['Naive Bayes'].class_count_.sum(), 1300)
+
+if __name__ == '__main__':
+    unittest.main()
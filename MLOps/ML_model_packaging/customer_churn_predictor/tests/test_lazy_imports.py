@@ -0,0 +1,45 @@
+import json
+import subprocess
+import sys
+import unittest
+
+HEAVY_MODULES = ['sklearn', 'matplotlib', 'seaborn']
+
+def imported_heavy_modules(statement):
+    """The heavy modules imported by a statement, run in a fresh interpreter."""
+    code = f"import json, sys\n{statement}\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+class TestLazyImports(unittest.TestCase):
+    def test_package_import_is_light(self):
+        self.assertEqual(imported_heavy_modules('import customer_churn_predictor'), [])
+
+    def test_serving_path_does_not_import_training_or_plotting(self):
+        statement = ("from customer_churn_predictor import customer_churn_predictor\n"
+                     "from customer_churn_predictor.models import predict_model, load_saved_model\n"
+                     "from customer_churn_predictor.models.explain_model import format_explanations\n"
+                     "from customer_churn_predictor.serving import MicroBatcher, WarmModelState")
+        self.assertEqual(imported_heavy_modules(statement), [])
+
+    def test_attributes_are_imported_on_access(self):
+        statement = ("import customer_churn_predictor.models as models\n"
+                     "assert 'train_models' in dir(models)\n"
+                     "models.train_models\n"
+                     "assert 'sklearn' not in sys.modules\n"
+                     "models.define_models()")
+        self.assertEqual(imported_heavy_modules(statement), ['sklearn'])
+
+    def test_function_is_not_shadowed_by_its_module(self):
+        statement = ("import customer_churn_predictor.models.hyperparameter_search\n"
+                     "from customer_churn_predictor.models import define_models\n"
+                     "assert callable(define_models), define_models")
+        imported_heavy_modules(statement)
+
+    def test_unknown_attribute(self):
+        import customer_churn_predictor.models as models
+        with self.assertRaises(AttributeError):
+            models.not_a_function
+
+if __name__ == '__main__':
+    unittest.main()
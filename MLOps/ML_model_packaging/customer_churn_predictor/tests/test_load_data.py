@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from customer_churn_predictor.data.load_data import load_data_in_chunks
+from customer_churn_predictor.data.preprocess import ChurnPreprocessor
+from customer_churn_predictor.data.synthetic import make_synthetic_telco_data
+
+class TestLoadDataInChunks(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.tmp_dir.name, 'telco.csv')
+        self.data = make_synthetic_telco_data(1000, missing_total_charges=0.01)
+        # Missing TotalCharges are written as ' ', as in the original Telco CSV
+        self.data.to_csv(self.file_path, index=False, na_rep=' ')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_typed_chunks(self):
+        chunks = list(load_data_in_chunks(self.file_path, chunksize=300))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [300, 300, 300, 100])
+        chunk = chunks[0]
+        self.assertIsInstance(chunk['Contract'].dtype, pd.CategoricalDtype)
+        self.assertIsInstance(chunk['Churn'].dtype, pd.CategoricalDtype)
+        self.assertEqual(chunk['MonthlyCharges'].dtype, np.float32)
+        self.assertEqual(chunk['TotalCharges'].dtype, np.float32)
+        # Blank TotalCharges values are parsed as missing
+        data = pd.concat(chunks, ignore_index=True)
+        self.assertEqual(data['TotalCharges'].isna().sum(), self.data['TotalCharges'].isna().sum())
+
+    def test_usecols(self):
+        chunk = next(load_data_in_chunks(self.file_path, chunksize=300, usecols=['tenure', 'Churn']))
+        self.assertEqual(sorted(chunk.columns), ['Churn', 'tenure'])
+
+    def test_pyarrow_engine(self):
+        data = pd.concat(load_data_in_chunks(self.file_path, chunksize=300, engine='pyarrow'), ignore_index=True)
+        expected = pd.concat(load_data_in_chunks(self.file_path, chunksize=300), ignore_index=True)
+        pd.testing.assert_frame_equal(data, expected)
+
+    def test_chunks_transform_like_full_data(self):
+        preprocessor = ChurnPreprocessor().fit(self.data)
+        transformed = pd.concat([preprocessor.transform(chunk) for chunk in load_data_in_chunks(self.file_path, chunksize=300)],
+                                ignore_index=True)
+        # Charges are parsed as float32
+        np.testing.assert_allclose(transformed.values, preprocessor.transform(self.data).values, atol=1e-5)
+
+    def test_unknown_categories(self):
+        data = self.data.copy()
+        data.loc[[3, 650], 'PaymentMethod'] = 'Crypto'
+        data.loc[5, 'Partner'] = 'yes'
+        data.to_csv(self.file_path, index=False, na_rep=' ')
+
+        for engine in ('c', 'pyarrow'):
+            with self.assertLogs('customer_churn_predictor.data.load_data', level='WARNING') as logs:
+                chunks = list(load_data_in_chunks(self.file_path, chunksize=300, engine=engine))
+            self.assertEqual(len(logs.records), 2)
+            self.assertIn("PaymentMethod: 1 rows with ['Crypto']", logs.output[0])
+            self.assertIn("Partner: 1 rows with ['yes']", logs.output[0])
+            loaded = pd.concat(chunks, ignore_index=True)
+            self.assertEqual(loaded['PaymentMethod'].isna().sum(), 2)
+            self.assertEqual(list(loaded['Partner'].cat.categories), ['No', 'Yes'])
+
+        with self.assertRaisesRegex(ValueError, 'Crypto'):
+            list(load_data_in_chunks(self.file_path, chunksize=300, on_unknown='raise'))
+
+    def test_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            next(load_data_in_chunks(os.path.join(self.tmp_dir.name, 'missing.csv')))
+
+if __name__ == '__main__':
+    unittest.main()
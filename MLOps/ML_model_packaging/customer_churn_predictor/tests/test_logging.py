@@ -0,0 +1,80 @@
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+from customer_churn_predictor.utils import logging as churn_logging
+from customer_churn_predictor.utils.logging import JsonFormatter, RateLimitFilter, echo, set_echo, setup_logging, stop_logging
+
+def make_record(name='customer_churn_predictor.test', level=logging.INFO, msg='message %d', args=(1,), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+class TestLogging(unittest.TestCase):
+    def test_json_formatter(self):
+        try:
+            raise ValueError("bad value")
+        except ValueError:
+            record = logging.LogRecord('churn', logging.ERROR, __file__, 1, "Failed after %d rows", (10,), sys.exc_info())
+        record.model = 'RandomForestClassifier'
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        self.assertEqual(entry['level'], 'ERROR')
+        self.assertEqual(entry['logger'], 'churn')
+        self.assertEqual(entry['message'], "Failed after 10 rows")
+        self.assertEqual(entry['model'], 'RandomForestClassifier')
+        self.assertIn("ValueError: bad value", entry['exception'])
+        self.assertTrue(entry['time'].endswith('+00:00'))
+
+    def test_rate_limit_filter(self):
+        log_filter = RateLimitFilter(rate=1e-9, burst=2)
+
+        passed = [log_filter.filter(make_record()) for _ in range(5)]
+        self.assertEqual(passed, [True, True, False, False, False])
+        # Warnings always pass, and report the dropped records
+        warning = make_record(level=logging.WARNING)
+        self.assertTrue(log_filter.filter(warning))
+        self.assertEqual(warning.suppressed, 3)
+        # Each logger has its own bucket
+        self.assertTrue(log_filter.filter(make_record(name='customer_churn_predictor.other')))
+
+    def test_echo_switch(self):
+        self.addCleanup(set_echo, churn_logging._echo_enabled)
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            set_echo(True)
+            echo("Trained %s in %.1f s", 'model', 1.25)
+            set_echo(False)
+            echo("Not printed %s", 'model')
+        self.assertEqual(stdout.getvalue(), "Trained model in 1.2 s\n")
+
+    def test_records_written_by_the_listener(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.addCleanup(stop_logging)
+        root_level = logging.getLogger().level
+        self.addCleanup(logging.getLogger().setLevel, root_level)
+
+        with mock.patch('sys.stdout', new_callable=io.StringIO):
+            setup_logging(tmp_dir.name, json_format=True, level='WARNING')
+        logger = logging.getLogger('customer_churn_predictor.test')
+        logger.info("Filtered out %s", 'info')
+        logger.warning("Scored %d rows", 100, extra={'model': 'LogisticRegression'})
+        # The message is rendered with the arguments as they were at the logging call
+        models = ['LogisticRegression']
+        logger.warning("Trained %s", models)
+        models.append('RandomForestClassifier')
+        stop_logging()
+
+        with open(os.path.join(tmp_dir.name, 'logs', 'logging_file.log')) as file:
+            entries = [json.loads(line) for line in file]
+        self.assertEqual([(entry['message'], entry.get('model')) for entry in entries],
+                         [("Scored 100 rows", 'LogisticRegression'), ("Trained ['LogisticRegression']", None)])
+        self.assertNotIn(churn_logging._queue_handler, logging.getLogger().handlers)
+
+if __name__ == '__main__':
+    unittest.main()
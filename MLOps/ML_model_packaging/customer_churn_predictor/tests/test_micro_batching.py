@@ -0,0 +1,90 @@
+import threading
+import unittest
+import numpy as np
+import pandas as pd
+from customer_churn_predictor.serving.micro_batching import MicroBatcher
+
+class TestMicroBatcher(unittest.TestCase):
+    def test_coalesces_concurrent_requests(self):
+        batch_sizes = []
+
+        def predict_fn(records):
+            batch_sizes.append(len(records))
+            return records['value'].to_numpy() * 2
+
+        batcher = MicroBatcher(predict_fn, max_batch_size=64, max_wait=0.05)
+        futures = [None] * 32
+
+        def submit(i):
+            futures[i] = batcher.submit(pd.DataFrame({'value': [i, i + 100]}))
+
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(32)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Every caller gets the scores of its own records
+        for i, future in enumerate(futures):
+            np.testing.assert_array_equal(future.result(timeout=5), [2 * i, 2 * (i + 100)])
+
+        # The requests were scored in fewer calls than there were requests
+        self.assertEqual(sum(batch_sizes), 64)
+        self.assertLess(len(batch_sizes), 32)
+        batcher.close()
+
+    def test_propagates_errors(self):
+        def predict_fn(records):
+            raise ValueError("bad records")
+
+        batcher = MicroBatcher(predict_fn, max_wait=0.001)
+        future = batcher.submit(pd.DataFrame({'value': [1]}))
+        with self.assertRaises(ValueError):
+            future.result(timeout=5)
+        batcher.close()
+
+    def test_failed_request_does_not_fail_the_batch(self):
+        calls = []
+
+        def predict_fn(records):
+            calls.append(len(records))
+            if (records['value'] < 0).any():
+                raise ValueError("bad records")
+            return records['value'].to_numpy() * 2
+
+        batcher = MicroBatcher(predict_fn, max_batch_size=64, max_wait=0.2)
+        good, bad, other = (batcher.submit(pd.DataFrame({'value': values})) for values in ([1, 2], [-1], [3]))
+        np.testing.assert_array_equal(good.result(timeout=5), [2, 4])
+        np.testing.assert_array_equal(other.result(timeout=5), [6])
+        with self.assertRaises(ValueError):
+            bad.result(timeout=5)
+        # The batch failed once, then each request was scored on its own
+        self.assertEqual(calls, [4, 2, 1, 1])
+        batcher.close()
+
+    def test_cancelled_request_is_dropped(self):
+        calls = []
+        started, release = threading.Event(), threading.Event()
+
+        def predict_fn(records):
+            calls.append(records['value'].tolist())
+            started.set()
+            release.wait(5)
+            return records['value'].to_numpy() * 2
+
+        batcher = MicroBatcher(predict_fn, max_batch_size=64, max_wait=0.01)
+        busy = batcher.submit(pd.DataFrame({'value': [0]}))
+        self.assertTrue(started.wait(5))
+        # Queued while the worker is busy, then cancelled as when a client disconnects
+        kept, cancelled = (batcher.submit(pd.DataFrame({'value': [value]})) for value in (1, 2))
+        self.assertTrue(cancelled.cancel())
+        release.set()
+        np.testing.assert_array_equal(busy.result(timeout=5), [0])
+        np.testing.assert_array_equal(kept.result(timeout=5), [2])
+        # The worker survives and keeps serving requests
+        np.testing.assert_array_equal(batcher.submit(pd.DataFrame({'value': [3]})).result(timeout=5), [6])
+        self.assertFalse(any(2 in values for values in calls))
+        batcher.close()
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,95 @@
+import os
+import pickle
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import GaussianNB
+from sklearn.tree import DecisionTreeClassifier
+from customer_churn_predictor.models.explain_model import ModelExplainer
+from customer_churn_predictor.models.model_artifact import (CompiledLogisticRegression, MappedTreeEnsemble, artifact_to_model,
+                                                           compile_model, model_to_artifact)
+from customer_churn_predictor.models.model_serialization import save_model, load_model
+
+class TestModelArtifact(unittest.TestCase):
+    def setUp(self):
+        X, y = make_classification(n_samples=500, n_features=6, random_state=0)
+        self.X = pd.DataFrame(X, columns=[f'feature_{i}' for i in range(6)])
+        self.y = y
+        # Rows with missing values go down the side learned for them, or the default side
+        self.X_missing = self.X.copy()
+        self.X_missing.iloc[::7, 2] = np.nan
+
+    def test_forest_predictions_match(self):
+        model = RandomForestClassifier(n_estimators=10, random_state=0).fit(self.X, self.y)
+        mapped = artifact_to_model(model_to_artifact(model))
+
+        self.assertIsInstance(mapped, MappedTreeEnsemble)
+        np.testing.assert_array_equal(mapped.predict_proba(self.X), model.predict_proba(self.X))
+        np.testing.assert_array_equal(mapped.predict_proba(self.X_missing), model.predict_proba(self.X_missing))
+        np.testing.assert_array_equal(mapped.predict(self.X), model.predict(self.X))
+        np.testing.assert_array_equal(mapped.apply(self.X), model.apply(self.X))
+
+    def test_tree_predictions_match_with_missing_values(self):
+        X_train = self.X.copy()
+        X_train.iloc[::5, 2] = np.nan
+        model = DecisionTreeClassifier(random_state=0).fit(X_train, self.y)
+        mapped = artifact_to_model(model_to_artifact(model))
+
+        np.testing.assert_array_equal(mapped.predict_proba(self.X_missing), model.predict_proba(self.X_missing))
+        np.testing.assert_array_equal(mapped.apply(self.X_missing), model.apply(self.X_missing))
+
+    def test_explanations_match(self):
+        model = RandomForestClassifier(n_estimators=5, random_state=0).fit(self.X, self.y)
+        mapped = artifact_to_model(model_to_artifact(model))
+
+        np.testing.assert_allclose(ModelExplainer(mapped).explain(self.X), ModelExplainer(model).explain(self.X))
+
+    def test_column_order_and_feature_count(self):
+        model = DecisionTreeClassifier(random_state=0).fit(self.X, self.y)
+        mapped = artifact_to_model(model_to_artifact(model))
+
+        np.testing.assert_array_equal(mapped.predict(self.X[self.X.columns[::-1]]), model.predict(self.X))
+        with self.assertRaises(ValueError):
+            mapped.predict(self.X.to_numpy()[:, :3])
+
+    def test_saved_artifact_is_memory_mapped(self):
+        model = RandomForestClassifier(n_estimators=5, random_state=0).fit(self.X, self.y)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = os.path.join(tmp_dir, 'Random forest_model.pkl')
+            save_model(model, model_path, artifact=True)
+            loaded = load_model(model_path, mmap_mode='r')
+
+            self.assertIsInstance(loaded._children, np.memmap)
+            self.assertIsInstance(loaded.estimators_[0].tree_.children_left, np.memmap)
+            np.testing.assert_array_equal(loaded.predict_proba(self.X), model.predict_proba(self.X))
+
+    def test_logistic_regression_predictions_match(self):
+        model = LogisticRegression().fit(self.X, self.y)
+        compiled = compile_model(model)
+
+        self.assertIsInstance(compiled, CompiledLogisticRegression)
+        for X in (self.X, self.X.astype('float32'), self.X.to_numpy()):
+            np.testing.assert_array_equal(compiled.predict_proba(X), model.predict_proba(X))
+            np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+        np.testing.assert_allclose(ModelExplainer(compiled).explain(self.X), ModelExplainer(model).explain(self.X))
+
+    def test_compiled_artifacts_hold_no_scikit_learn_objects(self):
+        for model in (LogisticRegression(), RandomForestClassifier(n_estimators=2, random_state=0)):
+            artifact = model_to_artifact(model.fit(self.X, self.y))
+            self.assertNotIn(b'sklearn', pickle.dumps(artifact))
+
+    def test_other_models_are_stored_as_they_are(self):
+        model = GaussianNB().fit(self.X, self.y)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = os.path.join(tmp_dir, 'Naive Bayes_model.pkl')
+            save_model(model, model_path, artifact=True)
+            self.assertIsInstance(load_model(model_path, mmap_mode='r'), GaussianNB)
+        with self.assertRaises(TypeError):
+            compile_model(model)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import os
+import tempfile
+import unittest
+from sklearn.linear_model import LogisticRegression
+from customer_churn_predictor.data.preprocess import ChurnPreprocessor
+from customer_churn_predictor.data.synthetic import make_synthetic_telco_data
+from customer_churn_predictor.models.model_serialization import save_model, load_model, load_preprocessor, preprocessor_path
+
+class TestModelSerialization(unittest.TestCase):
+    def test_save_model_with_preprocessor(self):
+        data = make_synthetic_telco_data(100)
+        preprocessor = ChurnPreprocessor().fit(data)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = os.path.join(tmp_dir, 'Logistic regression_model.pkl')
+            save_model(LogisticRegression(), model_path, preprocessor=preprocessor)
+
+            # The preprocessor is saved next to the model
+            self.assertTrue(os.path.exists(preprocessor_path(model_path)))
+            self.assertIsInstance(load_model(model_path), LogisticRegression)
+            loaded_preprocessor = load_preprocessor(model_path)
+            self.assertEqual(loaded_preprocessor.feature_names_out_, preprocessor.feature_names_out_)
+
+    def test_load_preprocessor_missing(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertIsNone(load_preprocessor(os.path.join(tmp_dir, 'model.pkl')))
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,54 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from customer_churn_predictor import pipeline
+from customer_churn_predictor.config.config import Config
+from customer_churn_predictor.data.synthetic import make_synthetic_telco_data
+from customer_churn_predictor.utils.step_graph import StepFailed
+
+MODEL_NAMES = {'Logistic regression', 'Decision tree', 'Random forest'}
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        cwd = os.getcwd()
+        os.chdir(self.tmp_dir.name)
+        self.addCleanup(os.chdir, cwd)
+        self.data_path = os.path.join(self.tmp_dir.name, 'data.csv')
+        make_synthetic_telco_data(300).to_csv(self.data_path, index=False)
+        self.config = Config()
+        self.config.set('models', {'RandomForestClassifier': {'n_estimators': 5, 'max_depth': 3}})
+        self.config.set('feature_importance', {'n_repeats': 1, 'n_jobs': 1})
+
+    def test_rerun_reuses_unchanged_steps(self):
+        results = pipeline.run_pipeline(self.config, self.data_path, reports='skip')
+        self.assertEqual(set(results['evaluation']), MODEL_NAMES)
+        self.assertTrue(all(os.path.exists(path) for path in results['model_paths']))
+        with open(os.path.join(self.config.get('reports_dir'), 'run_report.json')) as file:
+            report = json.load(file)
+        self.assertEqual(report['status'], 'succeeded')
+        train = next(stage for stage in report['stages'] if stage['stage'] == 'train')
+        self.assertEqual(train['rows'], 240)
+        self.assertGreater(train['rows_per_second'], 0)
+
+        with mock.patch.object(pipeline, 'train_models') as train_models:
+            results = pipeline.run_pipeline(self.config, self.data_path, reports='skip')
+            train_models.assert_not_called()
+        self.assertEqual(set(results['predictions']), MODEL_NAMES)
+
+    def test_failed_step_is_raised_and_resumed(self):
+        with mock.patch.object(pipeline, 'evaluate_models', return_value=None):
+            with self.assertRaises(StepFailed) as context:
+                pipeline.run_pipeline(self.config, self.data_path, reports='skip')
+        self.assertEqual(context.exception.step, 'evaluate')
+
+        with mock.patch.object(pipeline, 'train_models') as train_models:
+            results = pipeline.run_pipeline(self.config, self.data_path, reports='skip')
+            train_models.assert_not_called()
+        self.assertIn('evaluation', results)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
-from customer_churn_predictor.data.preprocess import preprocess_data
+from customer_churn_predictor.data.preprocess import preprocess_data, ChurnPreprocessor
+from customer_churn_predictor.data.synthetic import make_synthetic_telco_data
+import numpy as np
 import pandas as pd
 
 class TestDataPreprocess(unittest.TestCase):
@@ -32,5 +34,58 @@ class TestDataPreprocess(unittest.TestCase):
         self.assertIsNotNone(preprocessed_data)
         self.assertFalse(preprocessed_data.empty)
 
+    def test_churn_preprocessor_reuses_fit(self):
+        data = make_synthetic_telco_data(100)
+        preprocessor = ChurnPreprocessor().fit(data)
+        preprocessed_data = preprocessor.transform(data)
+
+        # A single record without the label is encoded exactly like it was in the full dataset
+        record = data.drop(columns=['Churn']).iloc[[7]]
+        preprocessed_record = preprocessor.transform(record)
+        self.assertNotIn('Churn_encoded', preprocessed_record.columns)
+        pd.testing.assert_frame_equal(preprocessed_record,
+                                      preprocessed_data.drop(columns=['Churn_encoded']).iloc[[7]])
+
+        # A record given as a dict goes through the same vectorized path
+        features = preprocessor.transform_array(record.iloc[0].to_dict())
+        self.assertEqual(features.shape, (1, len(preprocessor.feature_names_out_)))
+        np.testing.assert_array_equal(features, preprocessed_record.to_numpy())
+        pd.testing.assert_frame_equal(preprocessor.transform(record.iloc[0].to_dict()),
+                                      preprocessed_record.reset_index(drop=True))
+
+        # A mapping to arrays of values, with the label, gets a RangeIndex
+        preprocessed_columns = preprocessor.transform(data.iloc[5:8].to_dict(orient='list'))
+        pd.testing.assert_frame_equal(preprocessed_columns, preprocessed_data.iloc[5:8].reset_index(drop=True))
+
+    def test_compact_feature_types(self):
+        data = make_synthetic_telco_data(100)
+        preprocessor = ChurnPreprocessor().fit(data)
+        preprocessed_data = preprocessor.transform(data)
+
+        self.assertEqual(preprocessed_data['gender_Male'].dtype, np.uint8)
+        self.assertEqual(preprocessed_data['Contract_encoded'].dtype, np.int8)
+        self.assertEqual(preprocessed_data['MonthlyCharges'].dtype, np.float32)
+        self.assertEqual(preprocessed_data['Churn_encoded'].dtype, np.int8)
+
+        # The sparse matrix holds the same features as the dense array
+        features = preprocessor.transform_array(data)
+        sparse_features = preprocessor.transform_array(data, sparse_output=True)
+        self.assertEqual(sparse_features.format, 'csr')
+        np.testing.assert_array_equal(sparse_features.toarray(), features)
+
+    def test_categorical_input_and_unknown_categories(self):
+        data = make_synthetic_telco_data(200)
+        preprocessor = ChurnPreprocessor().fit(data)
+
+        # Categorical columns, as read by load_data, are encoded like string columns
+        categorical_data = data.astype({'Contract': 'category', 'Churn': 'category'})
+        pd.testing.assert_frame_equal(preprocessor.transform(categorical_data), preprocessor.transform(data))
+
+        new_data = data.iloc[:3].copy()
+        new_data['Contract'] = ['Three year', None, data['Contract'].iloc[2]]
+        preprocessed_data = preprocessor.transform(new_data)
+        self.assertEqual(list(preprocessed_data['Contract_encoded'].iloc[:2]), [-1, -1])
+        self.assertGreaterEqual(preprocessed_data['Contract_encoded'].iloc[2], 0)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+from customer_churn_predictor.data import processed_cache
+from customer_churn_predictor.data.processed_cache import load_processed_data, processed_cache_key
+from customer_churn_predictor.data.synthetic import make_synthetic_telco_data
+from customer_churn_predictor.utils.hashing import file_hash
+
+class TestProcessedCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_path = os.path.join(self.tmp_dir.name, 'data.csv')
+        make_synthetic_telco_data(200).to_csv(self.data_path, index=False)
+        self.config = {'processed_data_dir': self.tmp_dir.name, 'test_size': 0.2, 'random_state': 42}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_second_load_skips_parsing(self):
+        processed_data, preprocessor = load_processed_data(self.data_path, self.config)
+
+        with mock.patch.object(processed_cache, 'load_data') as load_data:
+            cached_data, cached_preprocessor = load_processed_data(self.data_path, self.config)
+            load_data.assert_not_called()
+        pd.testing.assert_frame_equal(cached_data, processed_data)
+        self.assertEqual(cached_preprocessor.feature_names_out_, preprocessor.feature_names_out_)
+
+    def test_split_settings_keep_the_cache(self):
+        # The train-test split is a separate step, so changing it still reads the cached features
+        processed_data, _ = load_processed_data(self.data_path, self.config)
+        with mock.patch.object(processed_cache, 'load_data') as load_data:
+            cached_data, _ = load_processed_data(self.data_path, dict(self.config, test_size=0.3, random_state=7))
+            load_data.assert_not_called()
+        pd.testing.assert_frame_equal(cached_data, processed_data)
+
+    def test_parquet_format(self):
+        config = dict(self.config, processed_cache={'format': 'parquet'})
+        processed_data, _ = load_processed_data(self.data_path, config)
+        cached_data, _ = load_processed_data(self.data_path, config)
+        pd.testing.assert_frame_equal(cached_data, processed_data)
+        self.assertTrue(any(name.endswith('.parquet') for name in os.listdir(self.tmp_dir.name)))
+
+    def test_key_changes_with_inputs(self):
+        key = processed_cache_key(self.data_path, self.config)
+        # Output directories and settings unrelated to the processing do not change the key, the
+        # data and the preprocessor do
+        self.assertEqual(processed_cache_key(self.data_path, dict(self.config, processed_data_dir='other')), key)
+        self.assertEqual(processed_cache_key(self.data_path, dict(self.config, models={'LogisticRegression': {'C': 2}},
+                                                                   logging={'level': 'DEBUG'})), key)
+        self.assertEqual(processed_cache_key(self.data_path, dict(self.config, test_size=0.3, random_state=0)), key)
+        _, preprocessor = load_processed_data(self.data_path, self.config)
+        self.assertNotEqual(processed_cache_key(self.data_path, self.config, preprocessor), key)
+        # A hash computed by the caller is used instead of reading the file again
+        data_hash = file_hash(self.data_path)
+        with mock.patch.object(processed_cache, 'file_hash') as mocked_file_hash:
+            self.assertEqual(processed_cache_key(self.data_path, self.config, data_hash=data_hash), key)
+            mocked_file_hash.assert_not_called()
+        make_synthetic_telco_data(200, random_state=0).to_csv(self.data_path, index=False)
+        self.assertNotEqual(processed_cache_key(self.data_path, self.config), key)
+
+    def test_disabled(self):
+        config = dict(self.config, processed_cache={'enabled': False})
+        load_processed_data(self.data_path, config)
+        self.assertEqual(os.listdir(self.tmp_dir.name), ['data.csv'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import importlib.util
+import json
+import os
+import tempfile
+import tracemalloc
+import unittest
+import numpy as np
+from customer_churn_predictor.utils.profiling import StageProfiler, count_rows
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_stage_records(self):
+        profiler = StageProfiler()
+        with profiler.stage('sum', rows=1000) as record:
+            np.arange(1000).sum()
+        with self.assertRaises(ValueError):
+            with profiler.stage('fail'):
+                raise ValueError("failed")
+        profiler.skip('cached_stage')
+
+        record, failed, cached = profiler.stages
+        self.assertEqual(record['status'], 'ran')
+        for key in ('wall_seconds', 'cpu_seconds', 'thread_cpu_seconds', 'peak_rss_mb', 'rows_per_second'):
+            self.assertGreater(record[key], 0)
+        self.assertEqual(failed['status'], 'failed')
+        self.assertNotIn('rows_per_second', failed)
+        self.assertEqual(cached['status'], 'cached')
+
+    def test_profiles_and_traced_memory(self):
+        was_tracing = tracemalloc.is_tracing()
+        profiler = StageProfiler(trace_memory=True, profile=['allocate'], profiles_dir=self.tmp_dir.name)
+        with profiler.stage('allocate'):
+            data = [bytes(1 << 20) for _ in range(4)]
+        del data
+        with profiler.stage('other'):
+            pass
+        profiler.close()
+
+        allocate, other = profiler.stages
+        self.assertGreaterEqual(allocate['tracemalloc_peak_mb'], 4)
+        self.assertTrue(os.path.exists(allocate['profile']))
+        self.assertNotIn('profile', other)
+        self.assertEqual(tracemalloc.is_tracing(), was_tracing)
+
+    def test_write_report(self):
+        profiler = StageProfiler()
+        with profiler.stage('stage'):
+            pass
+        path = os.path.join(self.tmp_dir.name, 'reports', 'run_report.json')
+        profiler.write_report(path, data_path='data.csv', status='succeeded')
+
+        with open(path) as file:
+            report = json.load(file)
+        self.assertEqual(report['status'], 'succeeded')
+        self.assertEqual([stage['stage'] for stage in report['stages']], ['stage'])
+
+    @unittest.skipUnless(importlib.util.find_spec('prometheus_client'), "prometheus_client is not installed")
+    def test_observe_prometheus(self):
+        from prometheus_client import CollectorRegistry
+        from customer_churn_predictor.utils import profiling
+        registry = CollectorRegistry()
+        self.addCleanup(setattr, profiling, '_prometheus_metrics', profiling._prometheus_metrics)
+        profiling._prometheus_metrics = None
+        profiler = StageProfiler()
+        with profiler.stage('train'):
+            pass
+        profiler.observe_prometheus(registry)
+        self.assertEqual(registry.get_sample_value('churn_pipeline_stage_wall_seconds_count', {'stage': 'train'}), 1)
+
+    def test_count_rows(self):
+        self.assertEqual(count_rows(np.zeros((5, 2)), np.zeros(3), 'data.csv'), 5)
+        self.assertIsNone(count_rows('data.csv', 3))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+import matplotlib.pyplot as plt
+from customer_churn_predictor.data.synthetic import make_synthetic_telco_data
+from customer_churn_predictor.visualization.report import ReportRenderer, distribution_figures
+
+class TestReportRenderer(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data = make_synthetic_telco_data(200)
+        self.figures = distribution_figures(self.tmp_dir.name, ['gender'], ['tenure'])
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_modes(self):
+        for mode in ('serial', 'deferred', 'parallel'):
+            renderer = ReportRenderer(mode=mode, max_workers=2)
+            renderer.submit(self.data, self.figures)
+            saved_paths = renderer.wait()
+            self.assertEqual(sorted(saved_paths), sorted(save_path for _, _, save_path in self.figures), mode)
+            for save_path in saved_paths:
+                self.assertTrue(os.path.exists(save_path))
+                os.remove(save_path)
+        # No figure is left open in pyplot's global state
+        self.assertEqual(plt.get_fignums(), [])
+
+    def test_skip(self):
+        renderer = ReportRenderer(mode='skip')
+        renderer.submit(self.data, self.figures)
+        self.assertEqual(renderer.wait(), [])
+        self.assertEqual(os.listdir(self.tmp_dir.name), [])
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            ReportRenderer(mode='background')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+from customer_churn_predictor.data.schema import validate_records
+from customer_churn_predictor.data.synthetic import make_synthetic_telco_data
+
+class TestValidateRecords(unittest.TestCase):
+    def setUp(self):
+        self.records = make_synthetic_telco_data(5).drop(columns=['Churn'])
+
+    def test_valid_records(self):
+        # Unknown categories and blank TotalCharges are handled by the preprocessor
+        self.records.loc[0, 'PaymentMethod'] = 'Crypto'
+        self.records.loc[1, 'TotalCharges'] = None
+        validate_records(self.records)
+
+    def test_invalid_records(self):
+        with self.assertRaisesRegex(ValueError, 'No records'):
+            validate_records(self.records.iloc[:0])
+        with self.assertRaisesRegex(ValueError, 'Contract'):
+            validate_records(self.records.drop(columns=['Contract']))
+        records = self.records.astype({'tenure': object})
+        records.loc[2, 'tenure'] = 'ten'
+        with self.assertRaisesRegex(ValueError, r'tenure .*\[2\]'):
+            validate_records(records)
+
+if __name__ == '__main__':
+    unittest.main()
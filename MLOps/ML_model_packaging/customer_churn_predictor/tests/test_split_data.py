@@ -1,6 +1,7 @@
 import unittest
+import numpy as np
 import pandas as pd
-from customer_churn_predictor.data.split_data import perform_train_test_split
+from customer_churn_predictor.data.split_data import perform_train_test_split, make_cv_folds
 
 class TestTrainTestSplit(unittest.TestCase):
     def test_perform_train_test_split(self):
@@ -26,5 +27,22 @@ class TestTrainTestSplit(unittest.TestCase):
         self.assertEqual(len(y_train), 4)
         self.assertEqual(len(y_test), 1)
 
+    def test_make_cv_folds(self):
+        y = np.array([0, 1] * 50)
+        folds = make_cv_folds(y, n_splits=5)
+
+        self.assertEqual(len(folds), 5)
+        # Every row is in exactly one validation fold, and the folds are stratified
+        np.testing.assert_array_equal(np.sort(np.concatenate([test for _, test in folds])), np.arange(100))
+        for train, test in folds:
+            self.assertEqual(y[test].mean(), 0.5)
+            self.assertEqual(len(np.intersect1d(train, test)), 0)
+
+    def test_make_cv_folds_by_group(self):
+        y = np.array([0, 1] * 50)
+        groups = np.repeat(np.arange(25), 4)  # e.g. 4 snapshots per customer
+        for train, test in make_cv_folds(y, n_splits=5, groups=groups):
+            self.assertEqual(len(np.intersect1d(groups[train], groups[test])), 0)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import threading
+import unittest
+from customer_churn_predictor.utils.step_graph import Step, StepFailed, StepGraph
+
+class TestStepGraph(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.cache_dir = os.path.join(self.tmp_dir.name, 'cache')
+        self.calls = []
+        self.fail = set()
+
+    def make_graph(self, barrier=None):
+        """double -> (plus_one, square) -> total, with plus_one and square waiting for each other at the barrier."""
+        def step(name, func):
+            def run(**inputs):
+                self.calls.append(name)
+                if name in self.fail:
+                    raise ValueError(f"{name} failed")
+                if barrier is not None and name in ('plus_one', 'square'):
+                    barrier.wait(timeout=5)
+                return func(**inputs)
+            return run
+
+        return StepGraph([
+            Step('double', step('double', lambda x: 2 * x), inputs=('x',), outputs=('doubled',)),
+            Step('plus_one', step('plus_one', lambda doubled: doubled + 1), inputs=('doubled',), outputs=('plus_one',)),
+            Step('square', step('square', lambda doubled: doubled ** 2), inputs=('doubled',), outputs=('square',)),
+            Step('total', step('total', lambda plus_one, square: plus_one + square), inputs=('plus_one', 'square'),
+                 outputs=('total',)),
+        ])
+
+    def test_independent_steps_run_concurrently(self):
+        # The branches only pass the barrier if they run at the same time
+        values = self.make_graph(threading.Barrier(2)).run({'x': 3})
+        self.assertEqual(values['total'], 7 + 36)
+        self.assertEqual(self.calls[0], 'double')
+        self.assertEqual(self.calls[-1], 'total')
+
+    def test_rerun_skips_memoized_steps(self):
+        self.make_graph().run({'x': 3}, cache_dir=self.cache_dir)
+        self.calls.clear()
+
+        graph = self.make_graph()
+        values = graph.run({'x': 3}, cache_dir=self.cache_dir)
+        self.assertEqual(self.calls, [])
+        self.assertEqual(values['total'], 43)
+        self.assertEqual({run['status'] for run in graph.last_run.values()}, {'cached'})
+
+        # A new input invalidates the steps that depend on it
+        self.assertEqual(self.make_graph().run({'x': 1}, cache_dir=self.cache_dir)['total'], 3 + 4)
+        self.assertEqual(sorted(self.calls), ['double', 'plus_one', 'square', 'total'])
+
+    def test_resume_from_failed_step(self):
+        self.fail = {'square'}
+        graph = self.make_graph()
+        with self.assertRaises(StepFailed) as context:
+            graph.run({'x': 3}, cache_dir=self.cache_dir)
+        self.assertEqual(context.exception.step, 'square')
+        self.assertNotIn('total', self.calls)
+        self.assertEqual(StepGraph.read_run_state(self.cache_dir)['failed_step'], 'square')
+
+        self.fail, self.calls = set(), []
+        self.assertEqual(self.make_graph().run({'x': 3}, cache_dir=self.cache_dir)['total'], 43)
+        self.assertEqual(sorted(self.calls), ['square', 'total'])
+        self.assertIsNone(StepGraph.read_run_state(self.cache_dir)['failed_step'])
+
+    def test_step_returning_none_fails(self):
+        graph = StepGraph([Step('load', lambda path: None, inputs=('path',), outputs=('data',))])
+        with self.assertRaises(StepFailed):
+            graph.run({'path': 'data.csv'})
+
+    def test_stale_outputs_and_force(self):
+        output_path = os.path.join(self.tmp_dir.name, 'output.txt')
+
+        def write():
+            self.calls.append('write')
+            with open(output_path, 'w') as file:
+                file.write('output')
+            return [output_path]
+
+        graph = StepGraph([Step('write', write, outputs=('paths',),
+                                check=lambda outputs: all(os.path.exists(path) for path in outputs['paths']))])
+        graph.run({}, cache_dir=self.cache_dir)
+        graph.run({}, cache_dir=self.cache_dir)
+        self.assertEqual(self.calls, ['write'])
+        os.remove(output_path)
+        graph.run({}, cache_dir=self.cache_dir)
+        graph.run({}, cache_dir=self.cache_dir, force=['write'])
+        self.assertEqual(self.calls, ['write'] * 3)
+
+    def test_invalid_graphs(self):
+        with self.assertRaises(ValueError):
+            StepGraph([Step('a', len, outputs=('x',)), Step('b', len, outputs=('x',))])
+        with self.assertRaises(ValueError):
+            StepGraph([Step('a', len, inputs=('missing',), outputs=('x',))]).run({})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 from sklearn.linear_model import LogisticRegression
+from sklearn.ensemble import RandomForestClassifier
 from sklearn.datasets import make_classification
 from customer_churn_predictor.models.train_model import train_models
 
@@ -25,5 +26,24 @@ class TestTrainModel(unittest.TestCase):
             self.assertTrue(hasattr(model, 'predict'))
             self.assertTrue(hasattr(model, 'score'))
 
+    def test_train_models_parallel_backends(self):
+        X, y = make_classification(n_samples=100, n_features=10, n_classes=2, random_state=42)
+
+        for backend in ['threads', 'processes', 'loky']:
+            models = {
+                'Logistic regression': LogisticRegression(),
+                'Random forest': RandomForestClassifier(n_estimators=10, random_state=42),
+            }
+            trained_models, timings = train_models(models, X, y, backend=backend, n_jobs=2, return_timings=True)
+
+            # Every model is trained, n_jobs is passed to the models that support it and timings are reported
+            self.assertEqual(set(trained_models), set(models))
+            self.assertEqual(trained_models['Random forest'].n_jobs, 2)
+            self.assertIsNone(trained_models['Logistic regression'].n_jobs)
+            self.assertEqual(len(trained_models['Random forest'].predict(X)), len(y))
+            for timing in timings.values():
+                self.assertGreaterEqual(timing['wall_time'], 0)
+                self.assertGreaterEqual(timing['cpu_time'], 0)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
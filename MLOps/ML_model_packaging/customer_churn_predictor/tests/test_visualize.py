@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from customer_churn_predictor.data.load_data import load_data
+from customer_churn_predictor.data.synthetic import make_synthetic_telco_data
+from customer_churn_predictor.visualization.visualize import (KDE_OVERSAMPLING, aggregate_distributions, aggregate_file_distributions,
+                                                              categorical_counts, numerical_histogram,
+                                                              visualize_categorical_distribution, visualize_numerical_distribution)
+
+class TestVisualize(unittest.TestCase):
+    def setUp(self):
+        self.data = make_synthetic_telco_data(1000)
+
+    def test_aggregates(self):
+        counts = categorical_counts(self.data, 'Partner')
+        self.assertEqual(counts.loc['Yes', 'No'], ((self.data['Partner'] == 'Yes') & (self.data['Churn'] == 'No')).sum())
+
+        histogram = numerical_histogram(self.data, 'tenure', bins=10)
+        self.assertEqual(histogram.shape, (10 * KDE_OVERSAMPLING, 2))
+        for label in ('No', 'Yes'):
+            expected, _ = np.histogram(self.data.loc[self.data['Churn'] == label, 'tenure'], bins=10 * KDE_OVERSAMPLING,
+                                       range=(self.data['tenure'].min(), self.data['tenure'].max()))
+            np.testing.assert_array_equal(histogram[label].to_numpy(), expected)
+
+    def test_chunked_aggregates_match(self):
+        ranges = {'MonthlyCharges': (self.data['MonthlyCharges'].min(), self.data['MonthlyCharges'].max())}
+        full = aggregate_distributions(self.data, ['Contract'], ['MonthlyCharges'], ranges=ranges)
+        chunks = (self.data.iloc[start:start + 300] for start in range(0, len(self.data), 300))
+        chunked = aggregate_distributions(chunks, ['Contract'], ['MonthlyCharges'], ranges=ranges)
+        for feature in full:
+            np.testing.assert_array_equal(chunked[feature].to_numpy(), full[feature].to_numpy())
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_path = os.path.join(tmp_dir, 'data.csv')
+            self.data.to_csv(data_path, index=False)
+            from_file = aggregate_file_distributions(data_path, ['Contract'], ['MonthlyCharges'], chunksize=300)
+            expected = aggregate_distributions(load_data(data_path), ['Contract'], ['MonthlyCharges'])
+            np.testing.assert_array_equal(from_file['Contract'].to_numpy(), expected['Contract'].to_numpy())
+            self.assertEqual(from_file['MonthlyCharges'].to_numpy().sum(), len(self.data))
+
+    def test_plots_from_data_or_aggregates(self):
+        aggregates = aggregate_distributions(self.data, ['gender'], ['tenure'])
+        for fig in (visualize_categorical_distribution(self.data, 'gender'),
+                    visualize_categorical_distribution(None, 'gender', counts=aggregates['gender']),
+                    visualize_numerical_distribution(self.data, 'tenure'),
+                    visualize_numerical_distribution(None, 'tenure', histogram=aggregates['tenure'])):
+            self.assertEqual(fig.axes[0].get_ylabel(), 'Count')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from sklearn.linear_model import LogisticRegression
+from customer_churn_predictor.data.synthetic import make_synthetic_telco_data
+from customer_churn_predictor.models.model_serialization import save_model
+from customer_churn_predictor.serving import warm_state
+from customer_churn_predictor.serving.warm_state import WarmModelState
+
+class TestWarmModelState(unittest.TestCase):
+    def setUp(self):
+        # Write a synthetic CSV and a model trained on random features
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_path = os.path.join(self.tmp_dir.name, 'data.csv')
+        self.model_path = os.path.join(self.tmp_dir.name, 'model.pkl')
+        make_synthetic_telco_data(200).to_csv(self.data_path, index=False)
+        save_model(LogisticRegression(), self.model_path)
+        self.config = {'test_size': 0.25, 'random_state': 42}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_loads_once_and_reloads_on_change(self):
+        state = WarmModelState(self.model_path, self.data_path, self.config)
+        self.assertTrue(state.refresh())
+        models, X_test = state.get()
+        self.assertIn('loaded_model', models)
+        self.assertEqual(len(X_test), 50)
+
+        # Nothing changed, so nothing is reloaded
+        self.assertFalse(state.refresh())
+
+        # Changing the model file invalidates the state
+        stat = os.stat(self.model_path)
+        os.utime(self.model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertTrue(state.refresh())
+
+    def test_hash_ignores_touch_with_same_content(self):
+        state = WarmModelState(self.model_path, self.data_path, self.config, use_hash=True)
+        state.refresh()
+        stat = os.stat(self.data_path)
+        os.utime(self.data_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertFalse(state.refresh())
+
+    def test_failed_reload_keeps_state_and_is_retried(self):
+        state = WarmModelState(self.model_path, self.data_path, self.config)
+        models, X_test = state.get()
+
+        save_model(LogisticRegression(C=0.5), self.model_path)
+        with mock.patch.object(warm_state, 'load_processed_data', side_effect=RuntimeError("corrupt data")):
+            with self.assertRaises(RuntimeError):
+                state.refresh()
+        # The previous model is still served with its own features
+        self.assertIs(state.models, models)
+        self.assertIs(state.X_test, X_test)
+
+        # The next refresh retries the load
+        self.assertTrue(state.refresh())
+        self.assertEqual(state.models['loaded_model'].C, 0.5)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
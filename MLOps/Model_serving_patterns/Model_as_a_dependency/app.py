@@ -1,11 +1,12 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request
 from customer_churn_predictor import customer_churn_predictor, pipeline
-from customer_churn_predictor.models import load_saved_model, predict_model
-from customer_churn_predictor.data.load_data import load_data
-from customer_churn_predictor.data.preprocess import preprocess_data
-from customer_churn_predictor.features.build_features import feature_engineering
-from customer_churn_predictor.data.split_data import perform_train_test_split
+from customer_churn_predictor.data.schema import validate_records
+from customer_churn_predictor.models import predict_model
+from customer_churn_predictor.models.explain_model import format_explanations
+from customer_churn_predictor.serving.micro_batching import MicroBatcher
+from customer_churn_predictor.serving.warm_state import WarmModelState
 import matplotlib.pyplot as plt
+import pandas as pd
 import io
 import base64
 
@@ -16,6 +17,12 @@ churn_predictor = customer_churn_predictor.CustomerChurnPredictor()
 data_path = 'C:/Users/israe/Documents/Codes/PycharmProjects/customer_churn_predictor/data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv'
 model_path = 'C:/Users/israe/Documents/Codes/PycharmProjects/customer_churn_predictor/models/saved_models/Logistic regression_model.pkl'
 
+# Model and fitted preprocessor for scoring new records, loaded on first use and kept in memory.
+# Concurrent POST /predict requests are coalesced into micro-batches scored with one predict_proba call.
+warm_state = WarmModelState(model_path, data_path, churn_predictor.config)
+batcher = MicroBatcher(warm_state.score)
+explain_batcher = MicroBatcher(warm_state.explain)
+
 @app.route('/')
 def home():
     return render_template('index.html')
@@ -32,18 +39,10 @@ def run_pipeline():
 @app.route('/predict', methods=['GET'])
 def run_predict():
     try:
-        # Load the saved model
-        trained_model = load_saved_model.load_model(model_path)
-        
-        # Load and preprocess the data
-        data = load_data(data_path)
-        preprocessed_data = preprocess_data(data)
-        processed_data = feature_engineering(preprocessed_data)
-        
-        # Split the data to get X_test
-        _, X_test, _, _ = perform_train_test_split(processed_data, test_size=churn_predictor.config.get('test_size'),
-                                                   random_state=churn_predictor.config.get('random_state'))
-        
+        # Get the warm model and test features. On a cold start the processed data is read
+        # from the cache in the processed data directory instead of re-parsing the CSV.
+        trained_model, X_test = warm_state.get()
+
         # Make predictions using the loaded model
         predictions = predict_model.predict_models(trained_model, X_test)
 
@@ -71,6 +70,39 @@ def run_predict():
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+@app.route('/predict', methods=['POST'])
+def score_records():
+    try:
+        # Accept one raw customer record or a list of records with the Telco schema, and optionally
+        # return the contribution of each feature to the predictions (only the top_k largest if set)
+        body = request.get_json(silent=True) or {}
+        records = body.get('records')
+        if isinstance(records, dict):
+            records = [records]
+        if not records or not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+            return jsonify({"error": "No records provided"}), 400
+        top_k = body.get('top_k')
+        if top_k is not None and (not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1):
+            return jsonify({"error": "top_k must be a positive integer"}), 400
+        # Invalid records are rejected before they are batched with the records of other requests
+        data = pd.DataFrame(records)
+        try:
+            validate_records(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Wait for the micro-batch holding these records to be scored
+        probabilities = batcher.submit(data).result()
+
+        response = {"probabilities": {model_name: probabilities[model_name].tolist() for model_name in probabilities.columns}}
+        if body.get('explain'):
+            explanations = explain_batcher.submit(data).result()
+            response["explanations"] = format_explanations(explanations, top_k=top_k)
+        return jsonify(response)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
     
 
 if __name__ == '__main__':
@@ -0,0 +1,109 @@
+"""
+Benchmark GET /predict of the model API service with and without the warm model state.
+
+The "before" app reproduces the original handler, which reloads the model and re-runs
+load_data -> preprocess_data -> feature_engineering -> perform_train_test_split on every
+request. The "after" app is the service in main.py, which keeps them warm in memory.
+
+Usage:
+    python benchmark.py --rows 7043 --requests 50
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+
+def build_artifacts(work_dir, n_rows):
+    """Write a synthetic Telco CSV and a trained logistic regression model to work_dir."""
+    from sklearn.linear_model import LogisticRegression
+    from customer_churn_predictor.data.synthetic import make_synthetic_telco_data
+    from customer_churn_predictor.data.preprocess import preprocess_data
+    from customer_churn_predictor.features.build_features import feature_engineering
+    from customer_churn_predictor.data.split_data import perform_train_test_split
+    from customer_churn_predictor.models.model_serialization import save_model
+
+    data_path = os.path.join(work_dir, 'telco.csv')
+    model_path = os.path.join(work_dir, 'Logistic regression_model.pkl')
+    make_synthetic_telco_data(n_rows).to_csv(data_path, index=False)
+    processed_data = feature_engineering(preprocess_data(make_synthetic_telco_data(n_rows)))
+    X_train, _, y_train, _ = perform_train_test_split(processed_data)
+    save_model(LogisticRegression(max_iter=1000).fit(X_train, y_train), model_path)
+    return data_path, model_path
+
+
+def build_legacy_app(data_path, model_path, config):
+    """Build an app with the original per-request reload handler."""
+    from fastapi import FastAPI
+    from customer_churn_predictor.models import load_saved_model, predict_model
+    from customer_churn_predictor.data.load_data import load_data
+    from customer_churn_predictor.data.preprocess import preprocess_data
+    from customer_churn_predictor.features.build_features import feature_engineering
+    from customer_churn_predictor.data.split_data import perform_train_test_split
+
+    legacy_app = FastAPI()
+
+    @legacy_app.get("/predict")
+    def run_predict():
+        model = load_saved_model.load_model(model_path)
+        processed_data = feature_engineering(preprocess_data(load_data(data_path)))
+        _, X_test, _, _ = perform_train_test_split(processed_data, test_size=config.get('test_size'),
+                                                   random_state=config.get('random_state'))
+        predictions = predict_model.predict_models(model, X_test)
+        return {"predictions": {name: pred.tolist() for name, pred in predictions.items()}}
+
+    return legacy_app
+
+
+def run(client, n_requests):
+    """Send n_requests GET /predict requests and return the per-request latencies in seconds."""
+    latencies = []
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        response = client.get('/predict')
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+    return latencies
+
+
+def report(label, latencies):
+    total = sum(latencies)
+    print(f"{label:<8} {len(latencies) / total:10.1f} req/s   "
+          f"p50 {statistics.median(latencies) * 1000:8.2f} ms   "
+          f"max {max(latencies) * 1000:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the model API service.")
+    parser.add_argument('--rows', type=int, default=7043, help="Number of rows in the synthetic CSV.")
+    parser.add_argument('--requests', type=int, default=50, help="Number of requests per app.")
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            data_path, model_path = build_artifacts(work_dir, args.rows)
+            os.environ['CHURN_DATA_PATH'] = data_path
+            os.environ['CHURN_MODEL_PATH'] = model_path
+            sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+            import main as service
+
+            with TestClient(build_legacy_app(data_path, model_path, service.churn_predictor.config)) as client:
+                before = run(client, args.requests)
+            with TestClient(service.app) as client:
+                after = run(client, args.requests)
+
+        print(f"GET /predict, {args.rows} rows, {args.requests} requests")
+        report('before', before)
+        report('after', after)
+        print(f"speedup  {statistics.median(before) / statistics.median(after):10.1f}x (p50)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,38 +1,80 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from typing import List, Optional, Union
+from fastapi import FastAPI, HTTPException, Request
+from pydantic import BaseModel, Field
 from customer_churn_predictor import customer_churn_predictor
-from customer_churn_predictor.models import load_saved_model, predict_model
-from customer_churn_predictor.data.load_data import load_data
-from customer_churn_predictor.data.preprocess import preprocess_data
-from customer_churn_predictor.features.build_features import feature_engineering
-from customer_churn_predictor.data.split_data import perform_train_test_split
-
-# Initialize the FastAPI app
-app = FastAPI()
+from customer_churn_predictor.data.schema import validate_records
+from customer_churn_predictor.models import predict_model
+from customer_churn_predictor.models.explain_model import format_explanations
+from customer_churn_predictor.serving.micro_batching import MicroBatcher
+from customer_churn_predictor.serving.warm_state import WarmModelState
+import pandas as pd
+import asyncio
+import os
 
 # Initialize the churn predictor
 churn_predictor = customer_churn_predictor.CustomerChurnPredictor()
-# Define paths to data and model
-data_path = 'C:/Users/israe/Documents/Codes/PycharmProjects/customer_churn_predictor/data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv'
-model_path = 'C:/Users/israe/Documents/Codes/PycharmProjects/customer_churn_predictor/models/saved_models/Logistic regression_model.pkl'
+# Define paths to data and model (can be overridden with environment variables)
+data_path = os.environ.get('CHURN_DATA_PATH', 'C:/Users/israe/Documents/Codes/PycharmProjects/customer_churn_predictor/data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv')
+model_path = os.environ.get('CHURN_MODEL_PATH', 'C:/Users/israe/Documents/Codes/PycharmProjects/customer_churn_predictor/models/saved_models/Logistic regression_model.pkl')
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the model and build the feature matrix once, when the service starts.
+    # Requests reuse them and they are only reloaded when the model file or the CSV changes.
+    app.state.warm_state = WarmModelState(model_path, data_path, churn_predictor.config)
+    app.state.warm_state.refresh()
+    # Coalesce concurrent POST /predict requests into micro-batches scored with one predict_proba call
+    app.state.batcher = MicroBatcher(app.state.warm_state.score,
+                                     max_batch_size=int(os.environ.get('CHURN_MAX_BATCH_SIZE', 256)),
+                                     max_wait=float(os.environ.get('CHURN_MAX_WAIT_MS', 5)) / 1000)
+    # Requests asking for explanations are batched the same way and explained with one vectorized call per model
+    app.state.explain_batcher = MicroBatcher(app.state.warm_state.explain,
+                                             max_batch_size=int(os.environ.get('CHURN_MAX_BATCH_SIZE', 256)),
+                                             max_wait=float(os.environ.get('CHURN_MAX_WAIT_MS', 5)) / 1000)
+    yield
+    app.state.batcher.close()
+    app.state.explain_batcher.close()
+
+# Class to define the structure of a raw customer record (Telco schema, without the 'Churn' label)
+class CustomerRecord(BaseModel):
+    customerID: Optional[str] = None
+    gender: str
+    SeniorCitizen: int = 0
+    Partner: str
+    Dependents: str
+    tenure: float
+    PhoneService: str
+    MultipleLines: str
+    InternetService: str
+    OnlineSecurity: str
+    OnlineBackup: str
+    DeviceProtection: str
+    TechSupport: str
+    StreamingTV: str
+    StreamingMovies: str
+    Contract: str
+    PaperlessBilling: str
+    PaymentMethod: str
+    MonthlyCharges: float
+    TotalCharges: Optional[Union[float, str]] = None
+
+# Class to define the structure of the POST /predict body: one record or a list of records, and
+# optionally the contribution of each feature to the predictions (only the top_k largest if set)
+class PredictRequest(BaseModel):
+    records: Union[CustomerRecord, List[CustomerRecord]]
+    explain: bool = False
+    top_k: Optional[int] = Field(default=None, gt=0)
+
+# Initialize the FastAPI app
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/predict")
-def run_predict():
+def run_predict(request: Request):
     try:
-        # Load the model
-        model = load_saved_model.load_model(model_path)
-
-        # Load and preprocess the data
-        data = load_data(data_path)
-        preprocessed_data = preprocess_data(data)
-        processed_data = feature_engineering(preprocessed_data)
-        
-        # Split the data to get X_test
-        _, X_test, _, _ = perform_train_test_split(
-            processed_data, 
-            test_size=churn_predictor.config.get('test_size'),
-            random_state=churn_predictor.config.get('random_state')
-        )
-        
+        # Get the warm model and test features
+        model, X_test = request.app.state.warm_state.get()
+
         # Make predictions using the loaded model
         predictions = predict_model.predict_models(model, X_test)
 
@@ -43,5 +85,28 @@ def run_predict():
 
         return {"predictions": serializable_predictions}
 
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict")
+async def score_records(body: PredictRequest, request: Request):
+    # Invalid records are rejected before they are batched with the records of other requests
+    records = body.records if isinstance(body.records, list) else [body.records]
+    data = pd.DataFrame([record.model_dump() for record in records])
+    try:
+        validate_records(data)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        # Wait for the micro-batch holding these records to be scored
+        probabilities = await asyncio.wrap_future(request.app.state.batcher.submit(data))
+
+        response = {"probabilities": {model_name: probabilities[model_name].tolist() for model_name in probabilities.columns}}
+        if body.explain:
+            explanations = await asyncio.wrap_future(request.app.state.explain_batcher.submit(data))
+            response["explanations"] = format_explanations(explanations, top_k=body.top_k)
+        return response
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file